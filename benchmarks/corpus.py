@@ -0,0 +1,134 @@
+# benchmarks/corpus.py
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+from docx import Document as DocxDocument
+
+# Noms fictifs : ils alimentent la table d'anonymisation du benchmark N2.
+PERSON_NAMES = (
+    "Camille Durand",
+    "Hugo Lefèvre",
+    "Inès Moreau",
+    "Lucas Garnier",
+    "Sarah Benali",
+    "Thomas Roux",
+)
+PROJECTS = ("Héraclès", "Atlas", "Minerve", "Orion", "Pégase")
+TOPICS = (
+    "la migration cloud de l'outil de gestion locative",
+    "le tableau de bord de suivi énergétique des immeubles",
+    "la mise en conformité RGPD des données locataires",
+    "l'automatisation du traitement des factures fournisseurs",
+    "le chatbot interne de support aux gestionnaires",
+    "la cartographie des processus métier de la direction financière",
+)
+ACTIVITIES = (
+    "J'ai animé un atelier avec {person} pour cadrer {topic}.",
+    "Nous avons présenté l'avancement du projet {project} au comité de pilotage.",
+    "J'ai rédigé les spécifications fonctionnelles pour {topic}.",
+    "Avec {person}, nous avons priorisé le backlog du projet {project}.",
+    "J'ai testé un prototype basé sur un modèle de langage pour {topic}.",
+    "La démonstration du projet {project} a suscité des retours de {person}.",
+    "J'ai mesuré les gains de temps obtenus grâce à {topic}.",
+)
+REFLECTIONS = (
+    "Cette étape m'a appris à mieux formaliser les besoins des utilisateurs.",
+    "La principale difficulté a été d'aligner les attentes des équipes métier.",
+    "J'ai compris l'importance d'une gouvernance des données claire.",
+    "Ce retour d'expérience servira pour les prochains sprints.",
+    "Il faudra documenter ces choix techniques pour l'équipe de maintenance.",
+)
+
+SCALES = {
+    "small": {"entries": 20, "paragraphs": 4, "sections": 50, "queries": 20},
+    "medium": {"entries": 120, "paragraphs": 6, "sections": 200, "queries": 50},
+    "large": {"entries": 500, "paragraphs": 8, "sections": 1000, "queries": 100},
+}
+
+
+def anonymization_map() -> dict[str, str]:
+    """Table d'anonymisation correspondant aux noms du corpus synthétique."""
+    return {name: f"Personne_{i}" for i, name in enumerate(PERSON_NAMES, start=1)}
+
+
+def _paragraph(rng: random.Random) -> str:
+    sentences = [
+        rng.choice(ACTIVITIES).format(
+            person=rng.choice(PERSON_NAMES),
+            topic=rng.choice(TOPICS),
+            project=rng.choice(PROJECTS),
+        )
+        for _ in range(rng.randint(2, 4))
+    ]
+    sentences.append(rng.choice(REFLECTIONS))
+    return " ".join(sentences)
+
+
+def _filename(entry_date: date, as_docx: bool) -> str:
+    # Les deux formats reconnus par DATE_IN_FILENAME_PATTERN (N2)
+    if as_docx:
+        return f"{entry_date:%d-%m-%Y}_journal.docx"
+    return f"{entry_date:%Y-%m-%d}_journal.txt"
+
+
+def generate_journal_corpus(
+    directory: str,
+    entries: int,
+    paragraphs_per_entry: int = 4,
+    docx_ratio: float = 0.3,
+    start_date: date = date(2024, 9, 2),
+    seed: int = 42,
+) -> list[Path]:
+    """
+    Génère un journal d'apprentissage synthétique en français.
+
+    Une entrée par jour ouvré à partir de `start_date`, au format `.txt` ou
+    `.docx` (proportion `docx_ratio`), avec des noms de fichiers datés
+    reconnus par N2. Le contenu est déterministe pour un `seed` donné.
+
+    Returns:
+        La liste des fichiers créés.
+    """
+    rng = random.Random(seed)  # noqa: S311
+    target = Path(directory)
+    target.mkdir(parents=True, exist_ok=True)
+    created: list[Path] = []
+    entry_date = start_date
+    for _ in range(entries):
+        while entry_date.weekday() >= 5:
+            entry_date += timedelta(days=1)
+        paragraphs = [_paragraph(rng) for _ in range(paragraphs_per_entry)]
+        as_docx = rng.random() < docx_ratio
+        path = target / _filename(entry_date, as_docx)
+        if as_docx:
+            document = DocxDocument()
+            for paragraph in paragraphs:
+                document.add_paragraph(paragraph)
+            document.save(str(path))
+        else:
+            path.write_text("\n\n".join(paragraphs), encoding="utf-8")
+        created.append(path)
+        entry_date += timedelta(days=1)
+    return created
+
+
+if __name__ == "__main__":  # pragma: no cover
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Génère un journal synthétique.")
+    parser.add_argument("directory", help="Répertoire de sortie.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--docx-ratio", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    scale = SCALES[args.scale]
+    files = generate_journal_corpus(
+        args.directory,
+        scale["entries"],
+        scale["paragraphs"],
+        docx_ratio=args.docx_ratio,
+        seed=args.seed,
+    )
+    print(f"{len(files)} entrée(s) générée(s) dans {args.directory}.")
@@ -0,0 +1,346 @@
+# benchmarks/fake_ollama_server.py
+import json
+import logging
+import re
+import threading
+import time
+from datetime import UTC, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\S+\s*")
+PART_ID_PATTERN = re.compile(r"- id : (\S+)")
+DRAFT_SENTENCES = (
+    "Au cours de ma mission, j'ai piloté la mise en place d'outils d'IA générative "
+    "au service des équipes de gestion locative. ",
+    "Cette démarche s'est appuyée sur un cadrage des besoins avec les métiers et "
+    "sur une analyse des risques liés aux données. ",
+    "Les résultats obtenus montrent un gain de temps mesurable sur le traitement "
+    "des demandes récurrentes. ",
+    "Cette expérience illustre les compétences attendues d'un expert en management "
+    "des systèmes d'information. ",
+)
+PARTS = (
+    ("1.", "Introduction générale"),
+    ("2.", "Présentation de l'entreprise et de la mission"),
+    ("3.", "Pilotage du projet de transformation"),
+    ("4.", "Conclusion générale"),
+)
+
+
+class FakeOllamaConfig:
+    """Paramètres de latence et de capacité du faux serveur Ollama."""
+
+    def __init__(
+        self,
+        time_to_first_token_s: float = 0.5,
+        tokens_per_s: float = 20.0,
+        max_concurrency: int = 1,
+        queue_timeout_s: float = 600.0,
+        draft_tokens: int = 300,
+    ):
+        """Initialise la configuration (valeurs proches d'un modèle 12B sur CPU)."""
+        self.time_to_first_token_s = time_to_first_token_s
+        self.tokens_per_s = tokens_per_s
+        self.max_concurrency = max_concurrency
+        self.queue_timeout_s = queue_timeout_s
+        self.draft_tokens = draft_tokens
+
+
+def _section(section_id: str, title: str, level: int) -> dict[str, Any]:
+    return {
+        "id": section_id,
+        "title": title,
+        "level": level,
+        "description_objectives": f"Présenter {title.lower()} et ses enjeux.",
+        "original_requirements_summary": "Respecter les attendus du titre RNCP 35284.",
+        "student_experience_keywords": ["gestion locative", "IA générative", "RGPD"],
+        "example_phrasing_or_content_type": "Analyse réflexive argumentée.",
+        "key_questions_to_answer": [f"Quels sont les apports de {title.lower()} ?"],
+    }
+
+
+def _subsections(part_id: str, part_title: str) -> list[dict[str, Any]]:
+    return [_section(f"{part_id}{i}.", f"{part_title} – volet {i}", 2) for i in (1, 2)]
+
+
+def canned_outline(prompt: str) -> dict[str, Any]:
+    """
+    Plan JSON valide pour `PlannedThesisOutlineForLLM`, adapté au prompt N3.
+
+    Phase 1 (two_phase) : parties de niveau 1 ; phase 2 : sous-sections de la
+    partie demandée ; réparation : une section seule ; sinon plan complet.
+    """
+    if "Phase 2" in prompt:
+        match = PART_ID_PATTERN.search(prompt)
+        part_id = match.group(1) if match else "1."
+        title = dict(PARTS).get(part_id, "Partie")
+        return {"outline": _subsections(part_id, title)}
+    if "Objet invalide" in prompt:
+        return _section("1.", PARTS[0][1], 1)
+    parts = [_section(part_id, title, 1) for part_id, title in PARTS]
+    if "Phase 1" in prompt:
+        return {"outline": parts}
+    outline = []
+    for part, (part_id, title) in zip(parts, PARTS, strict=True):
+        outline.append(part)
+        outline.extend(_subsections(part_id, title))
+    return {"outline": outline}
+
+
+def instance_from_schema(schema: dict[str, Any]) -> Any:
+    """Instance minimale valide d'un schéma JSON (format structuré d'Ollama)."""
+    if "outline" in schema.get("properties", {}):
+        return canned_outline("")
+    schema_type = schema.get("type")
+    if "enum" in schema:
+        return schema["enum"][0]
+    if schema_type == "object":
+        return {
+            name: instance_from_schema(prop)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if schema_type == "array":
+        return []
+    if schema_type == "integer":
+        return schema.get("maximum", schema.get("minimum", 1))
+    if schema_type == "number":
+        return float(schema.get("maximum", schema.get("minimum", 1.0)))
+    if schema_type == "boolean":
+        return True
+    return "READY_FOR_HUMAN_REVIEW" if "recommendation" in str(schema) else "Texte."
+
+
+def canned_response(
+    prompt: str, response_format: Any, draft_tokens: int, num_predict: int | None
+) -> str:
+    """Réponse du faux modèle : JSON si un format est demandé, texte sinon."""
+    if isinstance(response_format, dict):
+        return json.dumps(instance_from_schema(response_format), ensure_ascii=False)
+    if response_format == "json":
+        return json.dumps(canned_outline(prompt), ensure_ascii=False)
+    limit = min(draft_tokens, num_predict) if num_predict else draft_tokens
+    words: list[str] = []
+    index = 0
+    while len(words) < limit:
+        words.extend(DRAFT_SENTENCES[index % len(DRAFT_SENTENCES)].split())
+        index += 1
+    return " ".join(words[:limit])
+
+
+class FakeOllamaServer(ThreadingHTTPServer):
+    """Serveur HTTP parlant l'API Ollama (`/api/chat`, `/api/generate`, `/api/tags`)."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], config: FakeOllamaConfig):
+        """Démarre l'écoute sur `address` avec la configuration donnée."""
+        super().__init__(address, FakeOllamaHandler)
+        self.config = config
+        self.slots = threading.BoundedSemaphore(config.max_concurrency)
+        self.stats_lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "rejected": 0,
+            "active": 0,
+            "max_active": 0,
+            "queue_wait_s": 0.0,
+            "max_queue_wait_s": 0.0,
+            "tokens_generated": 0,
+            "preloads": 0,
+        }
+
+    @property
+    def base_url(self) -> str:
+        """URL à utiliser comme `OLLAMA_BASE_URL`."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self, **updates: float) -> None:
+        """Met à jour les compteurs (incréments, et maxima pour `max_*`)."""
+        with self.stats_lock:
+            for key, value in updates.items():
+                if key.startswith("max_"):
+                    self.stats[key] = max(self.stats[key], value)
+                else:
+                    self.stats[key] += value
+            self.stats["max_active"] = max(
+                self.stats["max_active"], self.stats["active"]
+            )
+
+    def snapshot(self) -> dict[str, Any]:
+        """Copie des compteurs courants."""
+        with self.stats_lock:
+            return dict(self.stats)
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    server: FakeOllamaServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        logger.debug("Fake Ollama: " + format, *args)
+
+    def _send_json(self, status: int, body: dict[str, Any]) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path == "/api/tags":
+            self._send_json(200, {"models": [{"name": "fake:latest"}]})
+        elif self.path == "/api/version":
+            self._send_json(200, {"version": "0.0.0-fake"})
+        elif self.path == "/fake/stats":
+            self._send_json(200, self.server.snapshot())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:  # noqa: N802
+        if self.path not in ("/api/chat", "/api/generate"):
+            self._send_json(404, {"error": "not found"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        queued_at = time.perf_counter()
+        if not self.server.slots.acquire(timeout=self.server.config.queue_timeout_s):
+            self.server.record(rejected=1)
+            self._send_json(503, {"error": "server busy"})
+            return
+        wait_s = time.perf_counter() - queued_at
+        self.server.record(
+            requests=1, active=1, queue_wait_s=wait_s, max_queue_wait_s=wait_s
+        )
+        try:
+            self._generate(request, is_chat=self.path == "/api/chat")
+        finally:
+            self.server.record(active=-1)
+            self.server.slots.release()
+
+    def _generate(self, request: dict[str, Any], is_chat: bool) -> None:
+        config = self.server.config
+        if is_chat:
+            prompt = "\n".join(
+                m.get("content", "") for m in request.get("messages", [])
+            )
+        else:
+            prompt = request.get("prompt") or ""
+            if "prompt" not in request:
+                # Requête de préchargement (`keep_alive` sans prompt) : Ollama
+                # charge le modèle et répond aussitôt
+                self.server.record(preloads=1)
+                self._send_json(
+                    200,
+                    {
+                        "model": request.get("model", "fake"),
+                        "created_at": datetime.now(UTC).isoformat(),
+                        "response": "",
+                        "done": True,
+                        "done_reason": "load",
+                    },
+                )
+                return
+        options = request.get("options") or {}
+        text = canned_response(
+            prompt,
+            request.get("format"),
+            config.draft_tokens,
+            options.get("num_predict"),
+        )
+        tokens = TOKEN_PATTERN.findall(text) or [""]
+        model = request.get("model", "fake")
+        started_at = time.perf_counter()
+        time.sleep(config.time_to_first_token_s)
+        token_delay = 1 / config.tokens_per_s if config.tokens_per_s > 0 else 0.0
+        self.server.record(tokens_generated=len(tokens))
+
+        def _chunk(content: str, done: bool) -> dict[str, Any]:
+            chunk: dict[str, Any] = {
+                "model": model,
+                "created_at": datetime.now(UTC).isoformat(),
+                "done": done,
+            }
+            if is_chat:
+                chunk["message"] = {"role": "assistant", "content": content}
+            else:
+                chunk["response"] = content
+            if done:
+                total_ns = int((time.perf_counter() - started_at) * 1e9)
+                chunk.update(
+                    done_reason="stop",
+                    total_duration=total_ns,
+                    load_duration=0,
+                    prompt_eval_count=len(prompt.split()),
+                    eval_count=len(tokens),
+                    eval_duration=total_ns,
+                )
+            return chunk
+
+        if request.get("stream", True) is False:
+            time.sleep(token_delay * len(tokens))
+            self._send_json(200, _chunk("".join(tokens), done=True))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for index, token in enumerate(tokens):
+            if index:
+                time.sleep(token_delay)
+            self._write_chunk(_chunk(token, done=False))
+        self._write_chunk(_chunk("", done=True))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, body: dict[str, Any]) -> None:
+        line = (json.dumps(body, ensure_ascii=False) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(line):X}\r\n".encode() + line + b"\r\n")
+        self.wfile.flush()
+
+
+def start_fake_ollama_server(
+    config: FakeOllamaConfig | None = None, host: str = "127.0.0.1", port: int = 0
+) -> tuple[FakeOllamaServer, threading.Thread]:
+    """Démarre le serveur dans un thread (port 0 : port libre choisi par l'OS)."""
+    server = FakeOllamaServer((host, port), config or FakeOllamaConfig())
+    thread = threading.Thread(
+        target=server.serve_forever, name="fake-ollama", daemon=True
+    )
+    thread.start()
+    logger.info("Fake Ollama server listening on %s", server.base_url)
+    return server, thread
+
+
+if __name__ == "__main__":  # pragma: no cover
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Faux serveur Ollama pour les tests de charge N3/N6/N7."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--ttft", type=float, default=0.5, help="Secondes.")
+    parser.add_argument("--tokens-per-s", type=float, default=20.0)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--queue-timeout", type=float, default=600.0)
+    parser.add_argument("--draft-tokens", type=int, default=300)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    fake_server = FakeOllamaServer(
+        (args.host, args.port),
+        FakeOllamaConfig(
+            time_to_first_token_s=args.ttft,
+            tokens_per_s=args.tokens_per_s,
+            max_concurrency=args.concurrency,
+            queue_timeout_s=args.queue_timeout,
+            draft_tokens=args.draft_tokens,
+        ),
+    )
+    print(f"Fake Ollama: export OLLAMA_BASE_URL={fake_server.base_url}")
+    fake_server.serve_forever()
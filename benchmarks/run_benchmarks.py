@@ -0,0 +1,289 @@
+# benchmarks/run_benchmarks.py
+import json
+import logging
+import platform
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores import FAISS
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from benchmarks.corpus import SCALES, anonymization_map, generate_journal_corpus
+from src.config import configure_logging, settings
+from src.invalidation import section_input_fingerprints
+from src.nodes.n2_journal_ingestor_anonymizer import (
+    N2JournalIngestorAnonymizerNode,
+    _load_raw_journal_entries_from_files,
+)
+from src.nodes.n4_section_processor_router import N4SectionProcessorRouter
+from src.state import AgentState, SectionDetail, SectionStatus
+from src.tools.t1_journal_context_retriever import JournalContextRetrieverTool
+
+logger = logging.getLogger(__name__)
+
+RESULTS_FORMAT_VERSION = 1
+# Au-delà de +20 % sur la médiane (ou la taille), la mesure est une régression.
+DEFAULT_TOLERANCE = 0.2
+FAKE_EMBEDDING_SIZE = 384
+QUERIES = (
+    "migration cloud gestion locative",
+    "atelier de cadrage avec les équipes métier",
+    "conformité RGPD des données",
+    "prototype de modèle de langage",
+    "comité de pilotage et avancement",
+)
+
+
+def time_call(func: Callable[[], Any], repeat: int = 5) -> dict[str, Any]:
+    """Exécute `func` `repeat` fois et retourne les statistiques de durée (s)."""
+    durations = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started_at)
+    durations.sort()
+    p95_index = min(len(durations) - 1, round(0.95 * (len(durations) - 1)))
+    return {
+        "runs": len(durations),
+        "min_s": durations[0],
+        "median_s": statistics.median(durations),
+        "p95_s": durations[p95_index],
+        "max_s": durations[-1],
+    }
+
+
+def make_embeddings(kind: str) -> Any:
+    """Embeddings du benchmark : "fake" (hors ligne, déterministe) ou "fastembed"."""
+    if kind == "fastembed":
+        from langchain_community.embeddings import FastEmbedEmbeddings
+
+        return FastEmbedEmbeddings(model_name=settings.embedding_model_name)
+    return DeterministicFakeEmbedding(size=FAKE_EMBEDDING_SIZE)
+
+
+def bench_n2(
+    journal_dir: str, store_dir: str, embeddings: Any, repeat: int
+) -> dict[str, Any]:
+    """Chronomètre les étapes de N2 (chargement, anonymisation, chunks, index)."""
+    node = N2JournalIngestorAnonymizerNode()
+    anon_map = anonymization_map()
+    raw_entries = _load_raw_journal_entries_from_files(journal_dir)
+    processed = node._process_entries(raw_entries, anon_map)
+    chunks = node._chunk_entries_for_embedding(processed)
+    texts = [doc.page_content for doc in chunks]
+    vectors = embeddings.embed_documents(texts)
+
+    def _index() -> None:
+        store = FAISS.from_embeddings(
+            list(zip(texts, vectors, strict=True)),
+            embeddings,
+            metadatas=[doc.metadata for doc in chunks],
+        )
+        store.save_local(store_dir)
+
+    results = {
+        "n2_load": time_call(
+            lambda: _load_raw_journal_entries_from_files(journal_dir), repeat
+        ),
+        "n2_anonymize": time_call(
+            lambda: node._process_entries(raw_entries, anon_map), repeat
+        ),
+        "n2_chunk": time_call(
+            lambda: node._chunk_entries_for_embedding(processed), repeat
+        ),
+        "n2_embed": time_call(lambda: embeddings.embed_documents(texts), repeat),
+        "n2_index": time_call(_index, repeat),
+    }
+    results["n2_load"]["entries"] = len(raw_entries)
+    results["n2_chunk"]["chunks"] = len(chunks)
+    return results
+
+
+def bench_t1(
+    store_dir: str, embeddings: Any, queries: int, repeat: int
+) -> dict[str, Any]:
+    """Latence d'une requête T1 sur le vector store construit par `bench_n2`."""
+    tool = JournalContextRetrieverTool(
+        vector_store_path=store_dir, embedding_model_name=settings.embedding_model_name
+    )
+    tool._embeddings_model = embeddings
+    tool._vector_store = FAISS.load_local(
+        store_dir, embeddings, allow_dangerous_deserialization=True
+    )
+    query_texts = [QUERIES[i % len(QUERIES)] for i in range(queries)]
+
+    def _queries() -> None:
+        for query in query_texts:
+            tool._run(query, settings.k_retrieval_count)
+
+    stats = time_call(_queries, repeat)
+    stats["queries"] = queries
+    stats["per_query_s"] = stats["median_s"] / queries
+    return {"t1_query": stats}
+
+
+def _large_state(sections: int) -> AgentState:
+    """État avec `sections` sections rédigées et approuvées, sauf la dernière."""
+    outline = [
+        SectionDetail(
+            id=str(i),
+            title=f"Section {i}",
+            level=1 + i % 3,
+            description_objectives="Objectifs de la section.",
+            original_requirements_summary="Exigences de l'école.",
+            retrieved_journal_excerpts=[
+                {"text": "Extrait.", "metadata": {"chunk_id": f"j{i}_chunk0"}}
+            ],
+            draft_v1="Contenu rédigé. " * 150,
+            final_content="Contenu rédigé. " * 150,
+            status=SectionStatus.CONTENT_APPROVED,
+        )
+        for i in range(sections)
+    ]
+    outline[-1].status = SectionStatus.PENDING
+    state = AgentState(
+        user_persona="Persona de benchmark",
+        thesis_outline=outline,
+        current_section_index_for_router=0,
+    )
+    for section in outline[:-1]:
+        section.input_fingerprints = section_input_fingerprints(state, section)
+    return state
+
+
+def bench_n4(sections: int, repeat: int) -> dict[str, Any]:
+    """Temps de routage N4 (passe d'invalidation comprise) sur un grand plan."""
+    state = _large_state(sections)
+    router = N4SectionProcessorRouter()
+    stats = time_call(lambda: router.run(state), repeat)
+    stats["sections"] = sections
+    return {"n4_route": stats}
+
+
+def bench_checkpoint(sections: int, db_path: str, repeat: int) -> dict[str, Any]:
+    """Taille sérialisée et temps d'écriture SQLite d'un checkpoint de l'état."""
+    state = _large_state(sections)
+    checkpointer = SqliteSaver.from_conn_string(db_path)
+    config = {"configurable": {"thread_id": "benchmark"}}
+
+    def _make_checkpoint() -> dict[str, Any]:
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = dict(state)
+        return checkpoint
+
+    size_bytes = len(checkpointer.serde.dumps(_make_checkpoint()))
+    stats = time_call(
+        lambda: checkpointer.put(config, _make_checkpoint(), {"source": "bench"}),
+        repeat,
+    )
+    stats["size_bytes"] = size_bytes
+    stats["sections"] = sections
+    return {"checkpoint_write": stats}
+
+
+def run_suite(scale: str, embeddings_kind: str = "fake", repeat: int = 5) -> dict:
+    """Exécute tous les benchmarks à l'échelle donnée et retourne le rapport."""
+    params = SCALES[scale]
+    embeddings = make_embeddings(embeddings_kind)
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="agent_vf_bench_") as work_dir:
+        journal_dir = str(Path(work_dir) / "journal")
+        store_dir = str(Path(work_dir) / "vector_store")
+        generate_journal_corpus(journal_dir, params["entries"], params["paragraphs"])
+        results.update(bench_n2(journal_dir, store_dir, embeddings, repeat))
+        results.update(bench_t1(store_dir, embeddings, params["queries"], repeat))
+        results.update(bench_n4(params["sections"], repeat))
+        results.update(
+            bench_checkpoint(
+                params["sections"], str(Path(work_dir) / "ckpt.sqlite"), repeat
+            )
+        )
+    return {
+        "version": RESULTS_FORMAT_VERSION,
+        "created_at": datetime.now(UTC).isoformat(),
+        "scale": scale,
+        "embeddings": embeddings_kind,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare_to_baseline(
+    report: dict[str, Any],
+    baseline: dict[str, Any],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> list[dict[str, Any]]:
+    """
+    Compare les médianes (et tailles) du rapport à celles d'une baseline.
+
+    Returns:
+        Une ligne par mesure commune : valeurs, ratio et indicateur de régression.
+    """
+    comparison = []
+    for name, current in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        for metric in ("median_s", "size_bytes"):
+            if metric not in current or not previous.get(metric):
+                continue
+            ratio = current[metric] / previous[metric]
+            comparison.append(
+                {
+                    "benchmark": name,
+                    "metric": metric,
+                    "baseline": previous[metric],
+                    "current": current[metric],
+                    "ratio": round(ratio, 3),
+                    "regression": ratio > 1 + tolerance,
+                }
+            )
+    return comparison
+
+
+def format_comparison(comparison: list[dict[str, Any]]) -> str:
+    """Formate la comparaison avec la baseline en tableau texte."""
+    lines = [f"{'Benchmark':<20} {'Mesure':<11} {'Baseline':>12} {'Actuel':>12} Ratio"]
+    for row in comparison:
+        flag = "  RÉGRESSION" if row["regression"] else ""
+        lines.append(
+            f"{row['benchmark']:<20} {row['metric']:<11} {row['baseline']:>12.6g} "
+            f"{row['current']:>12.6g} {row['ratio']:.2f}{flag}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Benchmarks hors ligne d'AGENT_VF.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--embeddings", choices=("fake", "fastembed"), default="fake")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="benchmarks/results/latest.json")
+    parser.add_argument("--baseline", help="Rapport JSON de référence à comparer.")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    configure_logging(logging.WARNING)
+    bench_report = run_suite(args.scale, args.embeddings, args.repeat)
+    for output_path in filter(None, (args.output, args.save_baseline)):
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(output_path).write_text(json.dumps(bench_report, indent=2))
+        print(f"Rapport écrit dans {output_path}")
+
+    if args.baseline:
+        baseline_report = json.loads(Path(args.baseline).read_text())
+        rows = compare_to_baseline(bench_report, baseline_report, args.tolerance)
+        print(format_comparison(rows))
+        sys.exit(1 if any(row["regression"] for row in rows) else 0)
@@ -1,5 +1,8 @@
+import argparse
 import logging
 import json
+import queue
+import threading
 from pathlib import Path
 
 from src.config import settings
@@ -10,11 +13,70 @@ from src.nodes.n2_journal_ingestor_anonymizer import N2JournalIngestorAnonymizer
 from src.nodes.n3_thesis_outline_planner import N3ThesisOutlinePlannerNode
 from src.nodes.n5_context_retrieval import N5ContextRetrievalNode
 from src.nodes.n6_section_drafting import N6SectionDraftingNode
+from src.profiling import (
+    add_profile_argument,
+    profile_node,
+    start_profiling,
+    stop_profiling,
+)
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(name)s: %(message)s")
 logger = logging.getLogger(__name__)
 
 
+def _is_section_eligible_for_test(section_obj: SectionDetail) -> bool:
+    return not section_obj.id.startswith("0.") and bool(
+        section_obj.student_experience_keywords
+    )
+
+
+def _choose_section_index(outline: list[SectionDetail]) -> int | None:
+    """Première section éligible, sinon première hors "0.", sinon la première."""
+    for is_candidate in (
+        _is_section_eligible_for_test,
+        lambda section_obj: not section_obj.id.startswith("0."),
+    ):
+        for i, section_obj in enumerate(outline):
+            if is_candidate(section_obj):
+                return i
+    return 0 if outline else None
+
+
+def _start_streaming_planner(n3_node, state: AgentState):
+    """Lance N3 en streaming dans un thread; les sections arrivent dans une queue."""
+    sections_queue: queue.Queue = queue.Queue()
+    streamed_outline: list[SectionDetail] = []
+    stream_errors: list[Exception] = []
+
+    def _produce():
+        try:
+            for section in n3_node.stream_sections(state):
+                streamed_outline.append(section)
+                sections_queue.put(section)
+        except Exception as e:  # noqa: BLE001
+            stream_errors.append(e)
+        finally:
+            sections_queue.put(None)
+
+    producer = threading.Thread(target=_produce, name="n3-stream", daemon=True)
+    producer.start()
+    return sections_queue, producer, streamed_outline, stream_errors
+
+
+def _run_node(node, node_name: str, state: AgentState) -> AgentState | None:
+    """Exécute un nœud (profilé si --profile) ; None si le nœud signale une erreur."""
+    node_output = profile_node(node, node_name).run(state)
+    state = AgentState(**{**state.dict(), **node_output})
+    if state.error_message:
+        logger.error(f"Erreur {node_name}: {state.error_message}")
+        error_details = state.error_details or state.error_details_n6_drafting
+        if error_details:
+            logger.error(f"Détails Erreur {node_name}: {error_details}")
+        return None
+    logger.info(f"{node_name} terminé. Message: {state.current_operation_message}")
+    return state
+
+
 def main():
     logger.info("Début du pipeline de test N0 -> N1 -> N2 -> N3 -> N5 -> N6")
 
@@ -55,25 +117,21 @@ def main():
 
     # --- Étape N0: Initial Setup ---
     logger.info("\n--- EXÉCUTION N0: InitialSetupNode ---")
-    n0_node = N0InitialSetupNode()
-    n0_output = n0_node.run(current_state)
-    current_state = AgentState(**{**current_state.dict(), **n0_output})
-    if current_state.error_message:
-        logger.error(f"Erreur N0: {current_state.error_message}")
+    current_state = _run_node(
+        N0InitialSetupNode(), "N0_InitialSetupNode", current_state
+    )
+    if current_state is None:
         return
-    logger.info(f"N0 terminé. Message: {current_state.current_operation_message}") # Message peut être None
     logger.info(f"  Chemin Vector Store utilisé: {current_state.vector_store_path}")
 
 
     # --- Étape N1: Guideline Ingestor ---
     logger.info("\n--- EXÉCUTION N1: GuidelineIngestorNode ---")
-    n1_node = N1GuidelineIngestorNode()
-    n1_output = n1_node.run(current_state)
-    current_state = AgentState(**{**current_state.dict(), **n1_output})
-    if current_state.error_message:
-        logger.error(f"Erreur N1: {current_state.error_message}")
+    current_state = _run_node(
+        N1GuidelineIngestorNode(), "N1_GuidelineIngestorNode", current_state
+    )
+    if current_state is None:
         return
-    logger.info(f"N1 terminé. Message: {current_state.current_operation_message}")
     if current_state.school_guidelines_structured:
         # Afficher seulement les clés pour la concision
         logger.info(f"  Directives structurées (clés): {list(current_state.school_guidelines_structured.keys())}")
@@ -82,13 +140,14 @@ def main():
 
     # --- ÉTAPE N2: Journal Ingestor & Anonymizer (CRÉATION DU VECTOR STORE) ---
     logger.info("\n--- EXÉCUTION N2: JournalIngestorAnonymizerNode ---")
-    n2_node = N2JournalIngestorAnonymizerNode() # Utilise les paramètres par défaut pour chunk_size/overlap
-    n2_output = n2_node.run(current_state)
-    current_state = AgentState(**{**current_state.dict(), **n2_output})
-    if current_state.error_message:
-        logger.error(f"Erreur N2: {current_state.error_message}")
+    # Paramètres par défaut pour chunk_size/overlap
+    current_state = _run_node(
+        N2JournalIngestorAnonymizerNode(),
+        "N2_JournalIngestorAnonymizerNode",
+        current_state,
+    )
+    if current_state is None:
         return
-    logger.info(f"N2 terminé. Message: {current_state.current_operation_message}")
     logger.info(f"  Vector store initialisé: {current_state.vector_store_initialized}")
 
 
@@ -97,15 +156,16 @@ def main():
     n3_node = N3ThesisOutlinePlannerNode(
         llm_model_name=current_state.llm_model_name or settings.llm_model_name
     )
-    n3_output = n3_node.run(current_state)
-    current_state = AgentState(**{**current_state.dict(), **n3_output})
-
-    if current_state.error_message:
-        logger.error(f"Erreur N3: {current_state.error_message}")
-        if current_state.error_details:
-            logger.error(f"Détails Erreur N3: {current_state.error_details}")
+    if n3_node.planner_mode == "streaming":
+        # N5/N6 démarrent sur la première section éligible pendant que N3 génère
+        # la suite du plan en arrière-plan.
+        run_streaming_pipeline(
+            profile_node(n3_node, "N3_ThesisOutlinePlannerNode"), current_state
+        )
+        return
+    current_state = _run_node(n3_node, "N3_ThesisOutlinePlannerNode", current_state)
+    if current_state is None:
         return
-    logger.info(f"N3 terminé. Message: {current_state.current_operation_message}")
     
     if not current_state.thesis_outline:
         logger.error("N3 n'a généré aucun plan (thesis_outline est vide). Arrêt.")
@@ -117,21 +177,8 @@ def main():
         # logger.info(f"     Keywords pour N5: {section_detail_obj.student_experience_keywords}") # Log un peu verbeux
 
     # --- Choix de la section à tester ---
-    section_to_test_index = -1
-    for i, section_obj in enumerate(current_state.thesis_outline):
-        if not section_obj.id.startswith("0.") and section_obj.student_experience_keywords:
-            section_to_test_index = i
-            break
-    
-    if section_to_test_index == -1:
-        for i, section_obj in enumerate(current_state.thesis_outline):
-            if not section_obj.id.startswith("0."):
-                section_to_test_index = i
-                break
-    
-    if section_to_test_index == -1 and len(current_state.thesis_outline) > 0:
-        section_to_test_index = 0
-    elif section_to_test_index == -1 :
+    section_to_test_index = _choose_section_index(current_state.thesis_outline)
+    if section_to_test_index is None:
         logger.error("Aucune section trouvée dans le plan pour tester N5/N6.")
         return
 
@@ -144,14 +191,11 @@ def main():
 
     # --- Étape N5: Context Retrieval ---
     logger.info("\n--- EXÉCUTION N5: ContextRetrievalNode (avec RAG réel) ---")
-    n5_node = N5ContextRetrievalNode()
-    n5_output = n5_node.run(current_state)
-    current_state = AgentState(**{**current_state.dict(), **n5_output})
-
-    if current_state.error_message:
-        logger.error(f"Erreur N5: {current_state.error_message}")
+    current_state = _run_node(
+        N5ContextRetrievalNode(), "N5_ContextRetrievalNode", current_state
+    )
+    if current_state is None:
         return
-    logger.info(f"N5 terminé. Message: {current_state.current_operation_message}")
 
     updated_section_after_n5 = current_state.get_section_by_id(chosen_section_detail.id)
     if updated_section_after_n5 and updated_section_after_n5.anonymized_context_for_llm:
@@ -167,16 +211,11 @@ def main():
 
     # --- Étape N6: Section Drafting ---
     logger.info("\n--- EXÉCUTION N6: SectionDraftingNode (avec LLM réel) ---")
-    n6_node = N6SectionDraftingNode()
-    n6_output = n6_node.run(current_state)
-    current_state = AgentState(**{**current_state.dict(), **n6_output})
-
-    if current_state.error_message:
-        logger.error(f"Erreur N6: {current_state.error_message}")
-        if current_state.error_details_n6_drafting:
-             logger.error(f"Détails Erreur N6: {current_state.error_details_n6_drafting}")
+    current_state = _run_node(
+        N6SectionDraftingNode(), "N6_SectionDraftingNode", current_state
+    )
+    if current_state is None:
         return
-    logger.info(f"N6 terminé. Message: {current_state.current_operation_message}")
 
     final_section_state = current_state.get_section_by_id(chosen_section_detail.id)
     if final_section_state and final_section_state.draft_v1:
@@ -192,7 +231,69 @@ def main():
     logger.info("\nPipeline de test N0 -> N1 -> N2 -> N3 -> N5 -> N6 terminé.")
 
 
+def run_streaming_pipeline(n3_node, current_state: AgentState):
+    logger.info("N3 en mode streaming: le drafting démarre dès la première section.")
+    sections_queue, producer, streamed_outline, stream_errors = (
+        _start_streaming_planner(n3_node, current_state)
+    )
+
+    chosen_section_detail: SectionDetail | None = None
+    while True:
+        section = sections_queue.get()
+        if section is None:
+            break
+        logger.info(f"  Section reçue de N3: ID: {section.id}, Titre: {section.title}")
+        if _is_section_eligible_for_test(section):
+            chosen_section_detail = section
+            break
+
+    if chosen_section_detail is None:
+        producer.join()
+        logger.error(f"Aucune section éligible reçue de N3. Erreurs: {stream_errors}")
+        return
+
+    partial_state = current_state.copy(deep=True)
+    partial_state.thesis_outline = list(streamed_outline)
+    partial_state.current_section_id = chosen_section_detail.id
+    partial_state.current_section_index = partial_state.thesis_outline.index(
+        chosen_section_detail
+    )
+    logger.info(
+        f"\nSection choisie pour N5/N6 (N3 toujours en cours): "
+        f"ID={chosen_section_detail.id}, Titre='{chosen_section_detail.title}'"
+    )
+
+    for node_name, node in (
+        ("N5_ContextRetrievalNode", N5ContextRetrievalNode()),
+        ("N6_SectionDraftingNode", N6SectionDraftingNode()),
+    ):
+        next_state = _run_node(node, node_name, partial_state)
+        if next_state is None:
+            break
+        partial_state = next_state
+
+    producer.join()
+    if stream_errors:
+        logger.error(f"Erreur N3 (streaming): {stream_errors[0]}")
+    drafted_section = partial_state.get_section_by_id(chosen_section_detail.id)
+    full_outline = [
+        drafted_section if s.id == chosen_section_detail.id and drafted_section else s
+        for s in streamed_outline
+    ]
+    logger.info(f"Plan complet reçu ({len(full_outline)} sections).")
+    if drafted_section and drafted_section.draft_v1:
+        logger.info("vvv --- Début Brouillon N6 --- vvv")
+        logger.info(drafted_section.draft_v1)
+        logger.info("^^^ --- Fin Brouillon N6 --- ^^^")
+    logger.info(
+        "\nPipeline de test (streaming) N0 -> N1 -> N2 -> N3 -> N5 -> N6 terminé."
+    )
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pipeline de test N0 -> N6.")
+    add_profile_argument(parser)
+    args = parser.parse_args()
     output_dir_for_script = Path("outputs/pipeline_test")
     output_dir_for_script.mkdir(parents=True, exist_ok=True)
     
@@ -214,4 +315,9 @@ if __name__ == "__main__":
                                            "J'ai travaillé sur le projet Alpha et le projet Automatisation DG. "
                                            "J'ai utilisé Power Automate et AI Builder.")
 
-    main()
\ No newline at end of file
+    if args.profile is not None:
+        start_profiling(args.profile or None)
+    try:
+        main()
+    finally:
+        stop_profiling()
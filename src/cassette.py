@@ -0,0 +1,295 @@
+# src/cassette.py
+import base64
+import gzip
+import json
+import logging
+import threading
+import time
+from array import array
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.prompt_values import PromptValue
+
+from src.config import settings
+from src.fingerprints import stable_fingerprint
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_MODES = ("off", "record", "replay")
+CASSETTE_VERSION = "1"
+
+
+class CassetteMissError(LookupError):
+    """Aucun enregistrement ne correspond à l'appel rejoué."""
+
+
+def _encode_vectors(vectors: list[list[float]]) -> dict[str, Any]:
+    # float32 encodé en base64 : ~4x plus compact que la liste JSON
+    flat = array("f", [value for vector in vectors for value in vector])
+    return {
+        "dim": len(vectors[0]) if vectors else 0,
+        "data": base64.b64encode(flat.tobytes()).decode("ascii"),
+    }
+
+
+def _decode_vectors(encoded: dict[str, Any]) -> list[list[float]]:
+    flat = array("f")
+    flat.frombytes(base64.b64decode(encoded["data"]))
+    dim = encoded["dim"]
+    if not dim:
+        return []
+    return [flat[i : i + dim].tolist() for i in range(0, len(flat), dim)]
+
+
+def _prompt_text(prompt: Any) -> Any:
+    """Forme sérialisable d'une entrée de LLM (texte, PromptValue ou messages)."""
+    if isinstance(prompt, PromptValue):
+        prompt = prompt.to_messages()
+    if isinstance(prompt, list):
+        return [
+            [m.type, m.content] if isinstance(m, BaseMessage) else m for m in prompt
+        ]
+    return prompt
+
+
+class Cassette:
+    """
+    Enregistrement compact (JSONL gzip) des appels LLM et d'embedding.
+
+    En mode `record`, chaque appel est ajouté au fichier avec sa durée ; le
+    premier enregistrement remplace une cassette existante, pour qu'un
+    ré-enregistrement ne rejoue pas les réponses de la session précédente. En mode
+    `replay`, les réponses sont servies dans l'ordre d'enregistrement pour une
+    même clé (un prompt redemandé rejoue les réponses successives), avec la
+    latence d'origine (`latency="original"`) ou sans attente (`"zero"`).
+    """
+
+    def __init__(self, path: str, mode: str, latency: str = "original"):
+        """Ouvre la cassette ; en mode `replay`, charge tous les enregistrements."""
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Mode de cassette inconnu: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._entries: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        self._cursors: dict[str, int] = defaultdict(int)
+        self._recording_started = False
+        if mode == "replay":
+            self._load()
+
+    def _load(self) -> None:
+        if not self.path.is_file():
+            raise FileNotFoundError(f"Cassette introuvable: {self.path}")
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                self._entries[entry["key"]].append(entry)
+        logger.info(
+            "Cassette: %d enregistrement(s) chargé(s) depuis %s",
+            sum(len(v) for v in self._entries.values()),
+            self.path,
+        )
+
+    @staticmethod
+    def make_key(kind: str, *parts: Any) -> str:
+        """Clé d'un appel : type d'appel, paramètres du modèle et entrée."""
+        return stable_fingerprint(CASSETTE_VERSION, kind, *parts)
+
+    def record(self, entry: dict[str, Any]) -> None:
+        """Ajoute un enregistrement (le premier tronque le fichier existant)."""
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            file_mode = "at" if self._recording_started else "wt"
+            with gzip.open(self.path, file_mode, encoding="utf-8") as f:
+                f.write(line + "\n")
+            self._recording_started = True
+
+    def replay(self, key: str) -> dict[str, Any]:
+        """Retourne le prochain enregistrement pour cette clé (le dernier se répète)."""
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMissError(f"Aucun enregistrement pour la clé {key[:12]}")
+            index = min(self._cursors[key], len(entries) - 1)
+            self._cursors[key] += 1
+        return entries[index]
+
+    def wait(self, duration_s: float) -> None:
+        """Reproduit la latence enregistrée si `latency="original"`."""
+        if self.latency == "original" and duration_s > 0:
+            time.sleep(duration_s)
+
+
+class CassetteChatModel:
+    """
+    Enveloppe un `ChatOllama` pour enregistrer ou rejouer `invoke` et `stream`.
+
+    Les autres attributs sont délégués au modèle enveloppé.
+    """
+
+    def __init__(self, llm: Any, cassette: Cassette):
+        """Enveloppe `llm` avec la cassette donnée."""
+        self.llm = llm
+        self.cassette = cassette
+
+    def __getattr__(self, name: str) -> Any:
+        """Délègue au modèle enveloppé (`with_structured_output`, `model`...)."""
+        return getattr(self.llm, name)
+
+    def _key(self, kind: str, prompt: Any, kwargs: dict[str, Any]) -> str:
+        return self.cassette.make_key(
+            kind,
+            getattr(self.llm, "model", None),
+            getattr(self.llm, "format", None),
+            getattr(self.llm, "temperature", None),
+            _prompt_text(prompt),
+            kwargs,
+        )
+
+    def invoke(self, prompt: Any, config: Any = None, **kwargs: Any) -> AIMessage:
+        """Appel LLM enregistré ou rejoué."""
+        key = self._key("chat", prompt, kwargs)
+        if self.cassette.mode == "replay":
+            entry = self.cassette.replay(key)
+            self.cassette.wait(entry["duration_s"])
+            return AIMessage(
+                content=entry["content"],
+                response_metadata=entry.get("response_metadata", {}),
+            )
+        started_at = time.perf_counter()
+        response = self.llm.invoke(prompt, config, **kwargs)
+        self.cassette.record(
+            {
+                "key": key,
+                "kind": "chat",
+                "duration_s": time.perf_counter() - started_at,
+                "content": response.content,
+                "response_metadata": getattr(response, "response_metadata", {}),
+            }
+        )
+        return response
+
+    def stream(
+        self, prompt: Any, config: Any = None, **kwargs: Any
+    ) -> Iterator[AIMessageChunk]:
+        """Streaming enregistré ou rejoué (délai de chaque chunk conservé)."""
+        key = self._key("stream", prompt, kwargs)
+        if self.cassette.mode == "replay":
+            entry = self.cassette.replay(key)
+            previous_offset = 0.0
+            for offset_s, content in entry["chunks"]:
+                self.cassette.wait(offset_s - previous_offset)
+                previous_offset = offset_s
+                yield AIMessageChunk(content=content)
+            return
+        started_at = time.perf_counter()
+        chunks: list[list[Any]] = []
+        for chunk in self.llm.stream(prompt, config, **kwargs):
+            chunks.append([time.perf_counter() - started_at, chunk.content])
+            yield chunk
+        self.cassette.record(
+            {
+                "key": key,
+                "kind": "stream",
+                "duration_s": time.perf_counter() - started_at,
+                "chunks": chunks,
+            }
+        )
+
+
+class CassetteEmbeddings(Embeddings):
+    """
+    Embeddings enregistrés ou rejoués par lot.
+
+    Le modèle réel n'est instancié (via `factory`) qu'en enregistrement : le
+    rejeu fonctionne sans télécharger ni charger le modèle d'embedding.
+    """
+
+    def __init__(
+        self, factory: Callable[[], Embeddings], model_name: str, cassette: Cassette
+    ):
+        """Initialise l'enveloppe ; `factory` construit le modèle réel."""
+        self.factory = factory
+        self.model_name = model_name
+        self.cassette = cassette
+        self._embeddings: Embeddings | None = None
+
+    def _call(self, kind: str, payload: Any, compute: Callable[[Any], Any]) -> Any:
+        key = self.cassette.make_key(kind, self.model_name, payload)
+        if self.cassette.mode == "replay":
+            entry = self.cassette.replay(key)
+            self.cassette.wait(entry["duration_s"])
+            return _decode_vectors(entry["vectors"])
+        if self._embeddings is None:
+            self._embeddings = self.factory()
+        started_at = time.perf_counter()
+        vectors = compute(self._embeddings)
+        self.cassette.record(
+            {
+                "key": key,
+                "kind": kind,
+                "duration_s": time.perf_counter() - started_at,
+                "vectors": _encode_vectors(
+                    vectors if kind == "embed_documents" else [vectors]
+                ),
+            }
+        )
+        return vectors
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Embeddings d'un lot de documents."""
+        return self._call(
+            "embed_documents", texts, lambda model: model.embed_documents(texts)
+        )
+
+    def embed_query(self, text: str) -> list[float]:
+        """Embedding d'une requête."""
+        vectors = self._call("embed_query", text, lambda model: model.embed_query(text))
+        # Rejoué : liste d'un seul vecteur
+        return vectors[0] if vectors and isinstance(vectors[0], list) else vectors
+
+
+_active_cassette: Cassette | None = None
+_active_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Cassette | None:
+    """Cassette configurée par les settings (None si `cassette_mode` vaut "off")."""
+    global _active_cassette
+    if settings.cassette_mode == "off":
+        return None
+    with _active_cassette_lock:
+        if (
+            _active_cassette is None
+            or _active_cassette.mode != settings.cassette_mode
+            or str(_active_cassette.path) != settings.cassette_path
+        ):
+            _active_cassette = Cassette(
+                settings.cassette_path,
+                settings.cassette_mode,
+                settings.cassette_latency,
+            )
+        return _active_cassette
+
+
+def with_chat_cassette(llm: Any) -> Any:
+    """Enveloppe un modèle de chat si une cassette est active, sinon le retourne."""
+    cassette = get_cassette()
+    return llm if cassette is None else CassetteChatModel(llm, cassette)
+
+
+def with_embeddings_cassette(
+    factory: Callable[[], Embeddings], model_name: str
+) -> Embeddings:
+    """Construit les embeddings, enveloppés si une cassette est active."""
+    cassette = get_cassette()
+    if cassette is None:
+        return factory()
+    return CassetteEmbeddings(factory, model_name, cassette)
@@ -4,12 +4,10 @@ from pathlib import Path
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
 
@@ -36,9 +34,126 @@ class Settings(BaseSettings):
     vector_store_directory: str = str(PROJECT_ROOT / "data/processed/vector_store")
     journal_vector_store_path: str = str(PROJECT_ROOT / "data/processed/vector_store")
     recreate_vector_store: bool = False
+    # N2 : chunks embeddés et ajoutés à l'index par lots de cette taille ;
+    # seul le lot courant (et le fichier en cours) reste en mémoire
+    n2_index_batch_size: int = 256
+    # Chunks N2 en tokens du modèle d'embedding (fenêtre de 512 pour
+    # bge-small, marge pour les tokens spéciaux et l'estimation)
+    n2_chunk_max_tokens: int = 480
+    n2_chunk_overlap_tokens: int = 48
 
     k_retrieval_count: int = 3
 
+    # Compaction du contexte N5 -> N6 : T1 récupère `context_fetch_k` extraits,
+    # fusionnés/dédupliqués puis sélectionnés (MMR) dans un budget de tokens
+    context_packing_enabled: bool = True
+    context_fetch_k: int = 8
+    context_token_budget: int = 1200
+    context_score_cutoff: float | None = None
+    context_mmr_lambda: float = 0.7
+
+    # Mode de planification N3 : "single_pass", "streaming", "two_phase"
+    # ou "constrained"
+    n3_planner_mode: str = "single_pass"
+    # Mode "two_phase" : appels LLM parallèles max et tentatives par partie
+    n3_expansion_concurrency: int = 2
+    n3_part_max_attempts: int = 2
+    # Mode "constrained" : tentatives de régénération par section invalide
+    n3_section_repair_attempts: int = 2
+
+    # Budget de longueur : `min_pages` (N1) réparti en mots par section (N3),
+    # plafond `num_predict` pour N6 avec une marge `length_budget_headroom`
+    length_budget_enabled: bool = True
+    words_per_page: int = 300
+    length_budget_headroom: float = 0.3
+
+    # Mémoïsation de N0-N2 (nœuds déterministes) : sortie rejouée tant que les
+    # champs d'état, fichiers et settings déclarés dans create_graph n'ont pas
+    # changé. Opt-out par nœud via `node_memoization_disabled_nodes`.
+    node_memoization_enabled: bool = True
+    node_memoization_disabled_nodes: list[str] = []
+    node_memo_directory: str = str(PROJECT_ROOT / "data/processed/node_memo")
+
+    # Cache des plans N3 (clé: directives, persona, exemple de thèse, modèle)
+    outline_cache_enabled: bool = False
+    outline_cache_directory: str = str(PROJECT_ROOT / "data/processed/outline_cache")
+
+    # Index FAISS des passages de l'exemple de thèse (N2 le construit,
+    # N3/N6 l'interrogent)
+    example_thesis_index_directory: str = str(
+        PROJECT_ROOT / "data/processed/example_thesis_index"
+    )
+    example_thesis_chunk_size: int = 800
+    example_thesis_chunk_overlap: int = 100
+    example_thesis_k_per_query: int = 2
+    example_thesis_max_passages: int = 6
+
+    # Révision N6 après critique : "paragraph" (seuls les paragraphes visés par
+    # la critique sont régénérés) ou "full" (réécriture complète)
+    n6_revision_mode: str = "paragraph"
+    # Au-delà de cette proportion de paragraphes visés, réécriture complète
+    n6_paragraph_revision_max_ratio: float = 0.6
+
+    # Boucle de critique N7 : arrêt si score atteint, brouillons quasi identiques,
+    # ou budget (tokens / secondes de critique et de révision N6) de la section
+    # épuisé
+    n7_score_threshold: int = 4
+    n7_similarity_threshold: float = 0.95
+    n7_section_token_budget: int = 20000
+    n7_section_time_budget_s: float = 600.0
+
+    # Pré-rédaction spéculative (N5/N6/N7) des prochaines sections PENDING
+    # pendant que N8 attend la revue humaine
+    speculative_drafting_enabled: bool = False
+    speculative_max_sections: int = 2
+    speculative_time_budget_s: float = 900.0
+    # Attente maximale, à la reprise de la revue, de l'étape spéculative en cours
+    speculative_cancel_timeout_s: float = 5.0
+    speculative_drafts_directory: str = str(
+        PROJECT_ROOT / "data/processed/speculative_drafts"
+    )
+
+    # N4 remet à PENDING les sections dont les entrées (persona, directives,
+    # chunks du journal, index, prompts) ont changé depuis leur rédaction
+    invalidation_enabled: bool = True
+
+    # Revue humaine groupée N8 : nombre de sections par interruption (1 = une
+    # section à la fois) et âge max (s) de la plus ancienne section en attente
+    n8_batch_review_size: int = 1
+    n8_batch_review_max_age_s: float = 1800.0
+
+    # Cassette des appels LLM (N3/N6/N7) et d'embedding : "off", "record"
+    # (enregistre les réponses et leur durée) ou "replay" (rejoue, latence
+    # "original" ou "zero") pour des exécutions reproductibles hors ligne
+    cassette_mode: str = "off"
+    cassette_path: str = str(PROJECT_ROOT / "data/processed/cassettes/default.jsonl.gz")
+    cassette_latency: str = "original"
+
+    # Tracing par nœud (temps réel/CPU, RSS, taille des écritures checkpoint,
+    # tokens LLM et embeddings en spans enfants) : exportateur "jsonl" (fichier
+    # `tracing_path`) ou "otel" (paquet `opentelemetry-sdk` requis)
+    tracing_enabled: bool = False
+    tracing_exporter: str = "jsonl"
+    tracing_path: str = str(PROJECT_ROOT / "outputs/traces/spans.jsonl")
+
+    # Warm-up lancé à la construction du graphe : modèle d'embedding partagé,
+    # index FAISS existant et préchargement du modèle Ollama (`keep_alive`).
+    # Les nœuds attendent au plus `warmup_wait_timeout_s` avant de charger
+    # eux-mêmes.
+    warmup_enabled: bool = True
+    warmup_ollama_keep_alive: str = "30m"
+    warmup_wait_timeout_s: float = 120.0
+
+    # Worker d'embedding partagé (`python -m src.embedding_worker`) : N2, T1 et
+    # T2 l'utilisent via ce socket Unix s'il est actif, sinon embedding local.
+    # Micro-lots de `max_batch_size` textes ou `max_wait_ms` d'attente.
+    embedding_worker_enabled: bool = False
+    embedding_worker_socket: str = str(
+        PROJECT_ROOT / "data/processed/embedding_worker.sock"
+    )
+    embedding_worker_max_batch_size: int = 64
+    embedding_worker_max_wait_ms: float = 5.0
+
     persistence_db_path: str = str(
         PROJECT_ROOT / "data/processed/langgraph_checkpoints.sqlite"
     )
@@ -50,6 +165,16 @@ class Settings(BaseSettings):
     )
 
 
+def configure_logging(level: int = logging.INFO) -> None:
+    """
+    Configure le logging racine pour les points d'entrée (scripts, CLI).
+
+    Non appelé à l'import : une bibliothèque ne doit pas imposer sa
+    configuration de logging à l'application qui l'importe.
+    """
+    logging.basicConfig(level=level, format=LOG_FORMAT)
+
+
 settings = Settings()
 
 logger.info(
@@ -63,6 +188,7 @@ logger.info(
 )
 
 if __name__ == "__main__":  # pragma: no cover
+    configure_logging()
     print("Current AGENT_VF Settings (from config.py):")
     for field_name, value in settings.model_dump().items():
         print(f"  {field_name}: {value}")
\ No newline at end of file
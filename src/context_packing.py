@@ -0,0 +1,193 @@
+# src/context_packing.py
+import logging
+import re
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+CHARS_PER_TOKEN = 4
+MIN_OVERLAP_CHARS = 20
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimation grossière du nombre de tokens (≈ 4 caractères par token)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def strip_overlap(previous_text: str, next_text: str, max_overlap: int) -> str:
+    """
+    Retire du début de `next_text` le texte déjà présent à la fin de `previous_text`.
+
+    Le chevauchement recherché est le plus long suffixe de `previous_text` égal à
+    un préfixe de `next_text` (au plus `max_overlap` caractères, au moins
+    `MIN_OVERLAP_CHARS` pour éviter les coïncidences).
+    """
+    upper_bound = min(max_overlap, len(previous_text), len(next_text))
+    for size in range(upper_bound, MIN_OVERLAP_CHARS - 1, -1):
+        if previous_text.endswith(next_text[:size]):
+            return next_text[size:]
+    return next_text
+
+
+def _adjacent_tail(
+    block: dict[str, Any], excerpt: dict[str, Any], max_overlap: int
+) -> str:
+    """
+    Texte de `excerpt` qui prolonge `block` (chunk suivant de la même entrée).
+
+    Avec les offsets posés par N2 (`start_offset`/`end_offset`), le
+    chevauchement se déduit sans comparer les textes ; sinon `strip_overlap`.
+    """
+    block_end = block["metadata"].get("end_offset")
+    excerpt_start = excerpt["metadata"].get("start_offset")
+    if not isinstance(block_end, int) or not isinstance(excerpt_start, int):
+        return strip_overlap(block["text"], excerpt["text"], max_overlap)
+    if excerpt_start >= block_end:
+        # Chunks contigus : seul l'espace de séparation n'est pas indexé
+        return (" " if excerpt_start > block_end else "") + excerpt["text"]
+    return excerpt["text"][block_end - excerpt_start :]
+
+
+def merge_adjacent_chunks(
+    excerpts: list[dict[str, Any]], max_overlap: int
+) -> list[dict[str, Any]]:
+    """
+    Fusionne les extraits consécutifs (`chunk_index`) d'un même `source_document`.
+
+    Le texte commun aux chunks voisins (chevauchement du chunker) n'est
+    conservé qu'une fois. Le score d'un bloc fusionné est le meilleur score
+    (distance la plus faible) de ses chunks.
+    """
+    by_source: dict[str, list[dict[str, Any]]] = {}
+    for excerpt in excerpts:
+        metadata = excerpt.get("metadata") or {}
+        source = str(metadata.get("source_document", metadata.get("chunk_id", "")))
+        by_source.setdefault(source, []).append(excerpt)
+
+    blocks: list[dict[str, Any]] = []
+    for source, source_excerpts in by_source.items():
+        source_excerpts.sort(key=lambda e: e["metadata"].get("chunk_index", 0))
+        current: dict[str, Any] | None = None
+        for excerpt in source_excerpts:
+            metadata = excerpt["metadata"]
+            chunk_index = metadata.get("chunk_index")
+            if (
+                current is not None
+                and chunk_index is not None
+                and chunk_index == current["metadata"]["chunk_indices"][-1]
+            ):
+                continue  # Doublon exact du chunk précédent.
+            if (
+                current is not None
+                and chunk_index is not None
+                and chunk_index == current["metadata"]["chunk_indices"][-1] + 1
+            ):
+                current["text"] += _adjacent_tail(current, excerpt, max_overlap)
+                if "end_offset" in metadata:
+                    current["metadata"]["end_offset"] = metadata["end_offset"]
+                current["score"] = min(current["score"], excerpt["score"])
+                current["metadata"]["chunk_indices"].append(chunk_index)
+                continue
+            if current is not None:
+                blocks.append(current)
+            current = {
+                "text": excerpt["text"],
+                "score": excerpt["score"],
+                "metadata": {
+                    **metadata,
+                    "source_document": source,
+                    "chunk_indices": [chunk_index if chunk_index is not None else -1],
+                },
+            }
+        if current is not None:
+            blocks.append(current)
+    return blocks
+
+
+def _word_set(text: str) -> set[str]:
+    return {word.lower() for word in WORD_PATTERN.findall(text) if len(word) > 2}
+
+
+def _jaccard(words_a: set[str], words_b: set[str]) -> float:
+    if not words_a or not words_b:
+        return 0.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+def pack_context(
+    excerpts: list[dict[str, Any]],
+    token_budget: int,
+    score_cutoff: float | None = None,
+    mmr_lambda: float = 0.7,
+    max_overlap: int = 300,
+) -> list[dict[str, Any]]:
+    """
+    Sélectionne et compacte les extraits de T1 pour le prompt de N6.
+
+    Étapes : filtrage par score (les scores FAISS sont des distances, plus
+    faible = plus pertinent), fusion des chunks adjacents sans leur
+    chevauchement, sélection gloutonne de type MMR (pertinence contre
+    redondance lexicale) dans la limite de `token_budget`.
+
+    Returns:
+        Les blocs retenus, dans l'ordre chronologique du journal.
+    """
+    candidates = [
+        {**e, "metadata": e.get("metadata") or {}, "score": e.get("score", 0.0)}
+        for e in excerpts
+        if isinstance(e, dict)
+        and "text" in e
+        and (score_cutoff is None or e.get("score", 0.0) <= score_cutoff)
+    ]
+    blocks = merge_adjacent_chunks(candidates, max_overlap)
+    if not blocks:
+        return []
+
+    relevance = [1.0 / (1.0 + max(block["score"], 0.0)) for block in blocks]
+    word_sets = [_word_set(block["text"]) for block in blocks]
+    remaining = list(range(len(blocks)))
+    selected: list[int] = []
+    used_tokens = 0
+
+    while remaining:
+        best_idx = max(
+            remaining,
+            key=lambda i: mmr_lambda * relevance[i]
+            - (1 - mmr_lambda)
+            * max((_jaccard(word_sets[i], word_sets[j]) for j in selected), default=0),
+        )
+        remaining.remove(best_idx)
+        block_tokens = estimate_tokens(blocks[best_idx]["text"])
+        if used_tokens + block_tokens > token_budget:
+            continue
+        selected.append(best_idx)
+        used_tokens += block_tokens
+
+    if not selected:
+        # Même le meilleur bloc dépasse le budget : on le tronque plutôt que rien.
+        best_block = dict(blocks[max(range(len(blocks)), key=lambda i: relevance[i])])
+        best_block["text"] = best_block["text"][: token_budget * CHARS_PER_TOKEN]
+        return [best_block]
+
+    logger.info(
+        "Context packing: %d extraits -> %d blocs retenus (~%d tokens / %d).",
+        len(excerpts),
+        len(selected),
+        used_tokens,
+        token_budget,
+    )
+    packed = [blocks[i] for i in selected]
+    packed.sort(
+        key=lambda b: (
+            str(b["metadata"].get("journal_date", "")),
+            b["metadata"]["source_document"],
+            b["metadata"]["chunk_indices"][0],
+        )
+    )
+    return packed
+
+
+def format_packed_context(packed: list[dict[str, Any]]) -> str:
+    """Formate les blocs compactés pour `anonymized_context_for_llm`."""
+    return "\n\n---\n\n".join(block["text"] for block in packed)
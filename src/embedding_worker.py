@@ -0,0 +1,305 @@
+# src/embedding_worker.py
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from typing import Any
+
+from langchain_core.embeddings import Embeddings
+
+from src.config import configure_logging, settings
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingWorkerError(RuntimeError):
+    """Le worker a refusé ou n'a pas pu traiter la requête."""
+
+
+def authkey_path(socket_path: str) -> Path:
+    """Fichier de la clé d'authentification des clients, à côté du socket."""
+    return Path(f"{socket_path}.key")
+
+
+def _write_authkey(socket_path: str) -> bytes:
+    """Tire une nouvelle clé et l'écrit dans un fichier lisible du seul owner."""
+    key = secrets.token_bytes(32)
+    key_file = authkey_path(socket_path)
+    key_file.unlink(missing_ok=True)
+    # O_EXCL : pas de lien symbolique suivi ni de fichier préexistant réutilisé
+    fd = os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+def _default_model_factory(model_name: str) -> Embeddings:
+    from langchain_community.embeddings import FastEmbedEmbeddings
+
+    return FastEmbedEmbeddings(model_name=model_name)
+
+
+class EmbeddingWorker:
+    """
+    Processus d'embedding partagé par tous les graphes d'une machine.
+
+    Le worker possède un seul modèle fastembed et écoute sur un socket Unix
+    créé en 0600. Les clients s'authentifient avec la clé aléatoire écrite
+    (en 0600) dans `<socket>.key` avant que le worker ne lise leurs requêtes.
+    Les requêtes de documents de tous les clients sont regroupées en
+    micro-lots (jusqu'à `max_batch_size` textes ou `max_wait_ms` d'attente)
+    pour un seul appel au modèle ; les requêtes de type `query` (un texte,
+    préfixe de requête du modèle) sont traitées une à une dans la même boucle.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        socket_path: str,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        model_factory: Callable[[str], Embeddings] = _default_model_factory,
+    ):
+        """Prépare le worker ; le modèle est chargé par `serve_forever`."""
+        self.model_name = model_name
+        self.socket_path = socket_path
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000
+        self.model_factory = model_factory
+        self.stats = {"requests": 0, "batches": 0, "texts": 0}
+        self._requests: queue.Queue = queue.Queue()
+        self._listener: Listener | None = None
+        self._authkey = b""
+        self._stopped = threading.Event()
+        self.ready = threading.Event()
+
+    def serve_forever(self) -> None:
+        """Charge le modèle puis sert les clients jusqu'à `shutdown`."""
+        model = self.model_factory(self.model_name)
+        socket_file = Path(self.socket_path)
+        socket_file.parent.mkdir(parents=True, exist_ok=True)
+        if socket_file.exists():
+            socket_file.unlink()  # socket d'un worker précédent arrêté
+        self._authkey = _write_authkey(self.socket_path)
+        # Le socket est créé en 0600 dès `bind` : pas de fenêtre où il serait
+        # joignable par les autres utilisateurs.
+        previous_umask = os.umask(0o177)
+        try:
+            self._listener = Listener(
+                self.socket_path, family="AF_UNIX", authkey=self._authkey
+            )
+        finally:
+            os.umask(previous_umask)
+        threading.Thread(
+            target=self._batch_loop, args=(model,), name="embed-batcher", daemon=True
+        ).start()
+        logger.info(
+            "Worker d'embedding (%s) à l'écoute sur %s",
+            self.model_name,
+            self.socket_path,
+        )
+        self.ready.set()
+        while not self._stopped.is_set():
+            try:
+                connection = self._listener.accept()
+            except (AuthenticationError, EOFError) as e:
+                logger.warning("Worker d'embedding: client refusé (%s)", e)
+                continue
+            except OSError:
+                if self._stopped.is_set():
+                    break  # listener fermé par shutdown
+                logger.warning("Worker d'embedding: connexion interrompue.")
+                continue
+            threading.Thread(
+                target=self._serve_client, args=(connection,), daemon=True
+            ).start()
+
+    def shutdown(self) -> None:
+        """Arrête d'accepter des clients et supprime le socket et sa clé."""
+        self._stopped.set()
+        if self._listener is not None:
+            self._listener.close()
+        Path(self.socket_path).unlink(missing_ok=True)
+        authkey_path(self.socket_path).unlink(missing_ok=True)
+
+    def _serve_client(self, connection: Connection) -> None:
+        with connection:
+            while True:
+                try:
+                    request = connection.recv()
+                except (EOFError, OSError):
+                    return
+                future: Future = Future()
+                self._requests.put((request, future))
+                try:
+                    connection.send(future.result())
+                except (BrokenPipeError, OSError):
+                    return
+
+    def _next_batch(self) -> list[tuple[dict[str, Any], Future]]:
+        batch = [self._requests.get()]
+        texts = len(batch[0][0].get("texts", ()))
+        deadline = time.perf_counter() + self.max_wait_s
+        while texts < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            texts += len(item[0].get("texts", ()))
+        return batch
+
+    def _batch_loop(self, model: Embeddings) -> None:
+        while not self._stopped.is_set():
+            batch = self._next_batch()
+            documents: list[tuple[list[str], Future]] = []
+            for request, future in batch:
+                texts = request.get("texts", [])
+                if request.get("model") != self.model_name:
+                    future.set_result({"error": f"Modèle servi : {self.model_name}"})
+                elif request.get("kind") == "query":
+                    future.set_result(
+                        self._embed(lambda t=texts: [model.embed_query(x) for x in t])
+                    )
+                else:
+                    documents.append((texts, future))
+            if documents:
+                # Un seul appel au modèle pour les documents de tous les clients
+                all_texts = [text for texts, _ in documents for text in texts]
+                result = self._embed(lambda: model.embed_documents(all_texts))
+                offset = 0
+                for texts, future in documents:
+                    if "error" in result:
+                        future.set_result(result)
+                    else:
+                        vectors = result["vectors"][offset : offset + len(texts)]
+                        future.set_result({"vectors": vectors})
+                    offset += len(texts)
+                self.stats["batches"] += 1
+                self.stats["texts"] += len(all_texts)
+            self.stats["requests"] += len(batch)
+
+    @staticmethod
+    def _embed(compute: Callable[[], list[list[float]]]) -> dict[str, Any]:
+        try:
+            return {"vectors": compute()}
+        except Exception as e:  # noqa: BLE001
+            logger.error("Worker d'embedding: échec du lot: %s", e)
+            return {"error": str(e)}
+
+
+class WorkerEmbeddings(Embeddings):
+    """
+    Client du worker d'embedding.
+
+    Chaque thread garde sa propre connexion, authentifiée avec la clé du
+    worker lue à l'ouverture. Si le worker ne répond plus ou refuse la clé,
+    le client bascule définitivement sur un modèle local construit par
+    `fallback_factory`.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        socket_path: str,
+        fallback_factory: Callable[[], Embeddings] | None = None,
+    ):
+        """Initialise le client (la connexion est ouverte au premier appel)."""
+        self.model_name = model_name
+        self.socket_path = socket_path
+        self.fallback_factory = fallback_factory or (
+            lambda: _default_model_factory(model_name)
+        )
+        self._local = threading.local()
+        self._fallback: Embeddings | None = None
+        self._fallback_lock = threading.Lock()
+
+    def _request(self, kind: str, texts: list[str]) -> list[list[float]] | None:
+        if self._fallback is not None:
+            return None
+        try:
+            connection = getattr(self._local, "connection", None)
+            if connection is None:
+                authkey = authkey_path(self.socket_path).read_bytes()
+                connection = Client(self.socket_path, family="AF_UNIX", authkey=authkey)
+                self._local.connection = connection
+            connection.send({"kind": kind, "model": self.model_name, "texts": texts})
+            response = connection.recv()
+        except (OSError, EOFError, AuthenticationError) as e:
+            self._local.connection = None
+            logger.warning("Worker d'embedding injoignable (%s) : embedding local.", e)
+            return None
+        if "error" in response:
+            raise EmbeddingWorkerError(response["error"])
+        return response["vectors"]
+
+    def _local_model(self) -> Embeddings:
+        with self._fallback_lock:
+            if self._fallback is None:
+                self._fallback = self.fallback_factory()
+        return self._fallback
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Embeddings d'un lot de documents (micro-batché par le worker)."""
+        vectors = self._request("documents", texts)
+        if vectors is None:
+            return self._local_model().embed_documents(texts)
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        """Embedding d'une requête."""
+        vectors = self._request("query", [text])
+        if vectors is None:
+            return self._local_model().embed_query(text)
+        return vectors[0]
+
+
+def worker_embeddings(model_name: str) -> WorkerEmbeddings | None:
+    """
+    Client du worker d'embedding s'il est activé et à l'écoute, sinon None.
+
+    L'appelant construit alors son modèle en processus, comme sans worker.
+    """
+    if not settings.embedding_worker_enabled:
+        return None
+    socket_path = settings.embedding_worker_socket
+    if not (Path(socket_path).exists() and authkey_path(socket_path).exists()):
+        logger.info("Worker d'embedding absent : embedding en processus.")
+        return None
+    return WorkerEmbeddings(model_name, socket_path)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Worker d'embedding partagé.")
+    parser.add_argument("--model", default=settings.embedding_model_name)
+    parser.add_argument("--socket", default=settings.embedding_worker_socket)
+    parser.add_argument(
+        "--max-batch-size", type=int, default=settings.embedding_worker_max_batch_size
+    )
+    parser.add_argument(
+        "--max-wait-ms", type=float, default=settings.embedding_worker_max_wait_ms
+    )
+    args = parser.parse_args()
+    configure_logging()
+
+    worker = EmbeddingWorker(
+        args.model, args.socket, args.max_batch_size, args.max_wait_ms
+    )
+    try:
+        worker.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.shutdown()
@@ -0,0 +1,138 @@
+# src/feedback_terms.py
+import re
+
+from src.state import SectionDetail
+
+WORD_PATTERN = re.compile(r"\w[\w-]*", re.UNICODE)
+QUOTED_PATTERN = re.compile(r"[\"«“]\s*([^\"»”]{3,80}?)\s*[\"»”]")
+SENTENCE_START_PATTERN = re.compile(r"(?:^|[.!?…:;]\s+|\n\s*)$")
+MIN_TERM_LENGTH = 4
+MIN_PROPER_NOUN_LENGTH = 2
+
+# Verbes de consigne en -er (radical) : toutes leurs formes usuelles
+# (infinitif, impératif, participe) sont des consignes, pas des sujets.
+_EDITING_VERB_STEMS = """
+    ajout allong amélior clarifi complét compress condens corrig détaill
+    développ enrich évit expliqu illustr insist justifi modifi nuanc ordonn
+    parl précis rajout reformul remplac renforc répét reprécis restructur
+    retir retravaill revis simplifi soign structur supprim synthétis uniformis
+    vérifi allég approfond argument cit document harmonis mentionn organis
+    présent rapproch rédig réorganis résum accentu équilibr
+    """.split()
+_VERB_ENDINGS = ("er", "ez", "e", "es", "ons", "é", "ée", "és", "ées", "ant")
+
+# Vocabulaire des consignes de relecture : il décrit la modification attendue
+# (politesse, verbes d'édition, jugements de style), pas un sujet à rechercher
+# dans le journal.
+FEEDBACK_STOPWORDS = frozenset(
+    """
+    alors après aussi autre autres avant avec avoir bien cela cette ceci cet ces
+    comme dans davantage depuis donc elle elles encore entre être était fait
+    faire faut ici leur leurs mais même mieux moins notamment nous peut peu
+    plus pour pourrait pourquoi quand quel quelle quelles quels quelque quelques
+    sans selon sont sous surtout tous tout toute toutes très trop vous votre vos
+    vers chez lors dont pendant durant contre parmi voire afin puis chaque
+    celui celle ceux celles plusieurs certains certaines aucun aucune autant
+    sinon également cependant toutefois pourtant néanmoins
+    beaucoup vraiment assez plutôt parfois souvent toujours jamais ainsi déjà
+    merci svp stp plaît please thanks bravo super parfait bon bonne bons bonnes
+    excellent excellente attention remarque remarques suggestion suggestions
+    clairement simplement brièvement rapidement précisément globalement
+    légèrement nettement directement concrètement
+    allonge raccourcis raccourcissez raccourcir revoir revoyez revois mettre
+    mettez mets réduire réduisez réduis écrire écrivez écris réécrire réécrivez
+    réécris reprendre reprenez reprends refaire refaites refais rendre rendez
+    rends relire relisez relis garder gardez garde enlever enlevez enlève
+    section sections paragraphe paragraphes partie parties phrase phrases
+    passage passages texte brouillon contenu exemple exemples point points
+    titre titres intitulé introduction conclusion transition transitions plan
+    structure chapitre chapitres sous-partie sous-section ligne lignes mot mots
+    style ton niveau registre vocabulaire formulation formulations tournure
+    tournures orthographe grammaire ponctuation faute fautes coquille coquilles
+    typo typos erreur erreurs répétition répétitions redite redites longueur
+    long longue longs longues court courte courts courtes lourd lourde lourds
+    lourdes clair claire clairs claires précis précise concret concrète concrets
+    concrètes vague vagues flou floue confus confuse général générale généraux
+    générique génériques superficiel superficielle répétitif répétitive
+    redondant redondante verbeux verbeuse fluide fluides lisible lisibles
+    académique formel formelle familier familière simple simples complexe
+    complexes compliqué compliquée dense denses maladroit maladroite
+    manque manquent manquant premier première deuxième troisième dernier
+    dernière début suite fin
+    needs changes more less
+    """.split()
+) | frozenset(stem + ending for stem in _EDITING_VERB_STEMS for ending in _VERB_ENDINGS)
+
+
+def _is_content_word(word: str, at_sentence_start: bool) -> bool:
+    """
+    Vrai si `word` porte un sujet plutôt qu'une consigne de forme.
+
+    Sigles (« SAP », « KPI ») et noms propres (majuscule hors début de phrase)
+    sont des sujets quelle que soit leur longueur ; les autres mots doivent
+    faire `MIN_TERM_LENGTH` caractères et ne pas être du vocabulaire de relecture.
+    """
+    lowered = word.lower()
+    if lowered in FEEDBACK_STOPWORDS or lowered.isdigit():
+        return False
+    is_acronym = word.isupper() and sum(c.isalpha() for c in word) >= 2
+    is_proper_noun = word[0].isupper() and not at_sentence_start
+    if is_acronym or is_proper_noun:
+        return len(word) >= MIN_PROPER_NOUN_LENGTH
+    return len(lowered) >= MIN_TERM_LENGTH
+
+
+def extract_new_search_terms(
+    feedback_text: str | None, section: SectionDetail
+) -> list[str]:
+    """
+    Extrait de `feedback_text` les termes de recherche absents du contexte connu.
+
+    Seuls les mots porteurs de contenu comptent : passages entre guillemets
+    (conservés comme expressions entières), sigles, noms propres et mots hors du
+    vocabulaire de relecture. Un terme est "nouveau" s'il n'apparaît ni dans les
+    mots-clés de la section, ni dans les extraits de journal déjà récupérés, ni
+    dans le brouillon courant.
+
+    Returns:
+        La liste ordonnée et dédupliquée des nouveaux termes (vide si le retour
+        humain ne porte que sur la forme).
+    """
+    if not feedback_text:
+        return []
+    known_text = " ".join(
+        [
+            *section.student_experience_keywords,
+            *(
+                excerpt.get("text", "")
+                for excerpt in section.retrieved_journal_excerpts
+                if isinstance(excerpt, dict)
+            ),
+            section.anonymized_context_for_llm or "",
+            section.current_draft_for_critique or "",
+        ]
+    ).lower()
+    known_words = set(WORD_PATTERN.findall(known_text))
+
+    new_terms: list[str] = []
+    for phrase in QUOTED_PATTERN.findall(feedback_text):
+        if phrase.lower() not in known_text and phrase not in new_terms:
+            new_terms.append(phrase)
+    quoted_words = {w.lower() for p in new_terms for w in WORD_PATTERN.findall(p)}
+
+    for match in WORD_PATTERN.finditer(feedback_text):
+        word = match.group().strip("-")
+        lowered = word.lower()
+        at_sentence_start = bool(
+            SENTENCE_START_PATTERN.search(feedback_text, 0, match.start())
+        )
+        if (
+            not word
+            or not _is_content_word(word, at_sentence_start)
+            or lowered in known_words
+            or lowered in quoted_words
+            or lowered in (t.lower() for t in new_terms)
+        ):
+            continue
+        new_terms.append(word)
+    return new_terms
@@ -0,0 +1,18 @@
+# src/fingerprints.py
+import hashlib
+import json
+from typing import Any
+
+
+def stable_fingerprint(*parts: Any) -> str:
+    """
+    Calcule une empreinte SHA-256 stable pour un ensemble de valeurs JSON-compatibles.
+
+    Les dictionnaires sont sérialisés avec des clés triées, de sorte que deux
+    entrées identiques produisent toujours la même empreinte, quel que soit le
+    processus ou l'ordre d'insertion.
+    """
+    canonical = json.dumps(
+        parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
@@ -6,22 +6,19 @@ import uuid
 from langgraph.checkpoint.sqlite import SqliteSaver
 from langgraph.graph import END, StateGraph
 
-from src.config import settings
-from src.nodes.n0_initial_setup import (
-    N0InitialSetupNode,
+from src.config import configure_logging, settings
+from src.lazy_nodes import LazyNode
+from src.node_memoization import memoize_node
+from src.profiling import (
+    add_profile_argument,
+    profile_node,
+    start_profiling,
+    stop_profiling,
 )
-
-# Correction: Importer la classe
-from src.nodes.n1_guideline_ingestor import N1GuidelineIngestorNode  # Correction
-from src.nodes.n2_journal_ingestor_anonymizer import (  # Correction
-    N2JournalIngestorAnonymizerNode,
-)
-from src.nodes.n3_thesis_outline_planner import N3ThesisOutlinePlannerNode
-from src.nodes.n4_section_processor_router import N4SectionProcessorRouter
-from src.nodes.n5_context_retrieval import N5ContextRetrievalNode
-from src.nodes.n6_section_drafting import N6SectionDraftingNode
-from src.nodes.n8_human_review_hitl_node import N8HumanReviewHITLNode
+from src.speculative_drafting import SpeculativeDrafter, SpeculativeDraftStore
 from src.state import AgentState
+from src.tracing import trace_node
+from src.warmup import warmup_on_run
 
 logger = logging.getLogger(__name__)
 
@@ -47,26 +44,116 @@ def create_graph(
 
     workflow = StateGraph(AgentState)
 
-    # Instancier les nœuds
-    n0_node = N0InitialSetupNode()
-    n1_node = N1GuidelineIngestorNode()
-    n2_node = N2JournalIngestorAnonymizerNode()
-    n3_node = N3ThesisOutlinePlannerNode(llm_model_name=settings.llm_model_name)
-    n4_router_node = N4SectionProcessorRouter()
-    n5_node = N5ContextRetrievalNode()
-    n6_node = N6SectionDraftingNode()  # LLM est initialisé dans son __init__
-    n8_node = N8HumanReviewHITLNode()
-
-    # Ajouter les nœuds au graphe en utilisant leurs méthodes `run`
-    workflow.add_node("N0_InitialSetupNode", n0_node.run)
-    workflow.add_node("N1_GuidelineIngestorNode", n1_node.run)
-    workflow.add_node("N2_JournalIngestorAnonymizerNode", n2_node.run)
-    workflow.add_node("N3_ThesisOutlinePlannerNode", n3_node.run)
-    workflow.add_node("N4_SectionProcessorRouterNode", n4_router_node.run)
-    workflow.add_node("N5_ContextRetrievalNode", n5_node.run)
-    workflow.add_node("N6_SectionDraftingNode", n6_node.run)
-    workflow.add_node("N8_HumanReviewHITLNode", n8_node.run)
-    # N7 et les nœuds de compilation/bibliographie seront ajoutés plus tard
+    # Déclarer les nœuds. Chaque module de nœud n'est importé, et le nœud (et
+    # ses clients LLM/embeddings) construit, qu'à sa première exécution.
+    # N0-N2 sont déterministes : leur sortie est rejouée tant que les champs,
+    # fichiers et settings déclarés n'ont pas changé.
+    n0_node = memoize_node(
+        LazyNode("src.nodes.n0_initial_setup", "N0InitialSetupNode"),
+        "N0_InitialSetupNode",
+        input_fields=(
+            "school_guidelines_path",
+            "journal_path",
+            "output_directory",
+            "vector_store_path",
+            "llm_model_name",
+            "embedding_model_name",
+            "recreate_vector_store",
+            "user_persona",
+            "example_thesis_text_content",
+        ),
+        required_path_fields=("output_directory", "vector_store_path"),
+        settings_fields=(
+            "default_school_guidelines_path",
+            "default_journal_path",
+            "default_output_directory",
+            "vector_store_directory",
+            "llm_model_name",
+            "embedding_model_name",
+            "recreate_vector_store",
+        ),
+    )
+    n1_node = memoize_node(
+        LazyNode("src.nodes.n1_guideline_ingestor", "N1GuidelineIngestorNode"),
+        "N1_GuidelineIngestorNode",
+        input_fields=("school_guidelines_path",),
+        input_path_fields=("school_guidelines_path",),
+    )
+    n2_node = memoize_node(
+        LazyNode(
+            "src.nodes.n2_journal_ingestor_anonymizer",
+            "N2JournalIngestorAnonymizerNode",
+        ),
+        "N2_JournalIngestorAnonymizerNode",
+        input_fields=(
+            "journal_path",
+            "vector_store_path",
+            "embedding_model_name",
+            "recreate_vector_store",
+            "anonymization_map",
+            "example_thesis_text_content",
+            "example_thesis_index_path",
+        ),
+        input_path_fields=("journal_path",),
+        output_path_fields=("vector_store_path", "example_thesis_index_path"),
+        settings_fields=(
+            "n2_chunk_max_tokens",
+            "n2_chunk_overlap_tokens",
+            "example_thesis_index_directory",
+            "example_thesis_chunk_size",
+            "example_thesis_chunk_overlap",
+        ),
+    )
+    n3_node = LazyNode(
+        "src.nodes.n3_thesis_outline_planner",
+        "N3ThesisOutlinePlannerNode",
+        llm_model_name=settings.llm_model_name,
+    )
+    n5_node = LazyNode("src.nodes.n5_context_retrieval", "N5ContextRetrievalNode")
+    # LLM initialisé dans son __init__, donc à la première rédaction
+    n6_node = LazyNode("src.nodes.n6_section_drafting", "N6SectionDraftingNode")
+    n7_node = LazyNode("src.nodes.n7_self_critique", "N7SelfCritiqueNode")
+    speculative_store: SpeculativeDraftStore | None = None
+    speculative_drafter: SpeculativeDrafter | None = None
+    if settings.speculative_drafting_enabled:
+        # Pré-rédaction des sections suivantes pendant l'attente de la revue N8
+        speculative_store = SpeculativeDraftStore()
+        speculative_drafter = SpeculativeDrafter(
+            n5_node, n6_node, n7_node, store=speculative_store
+        )
+    n4_router_node = LazyNode(
+        "src.nodes.n4_section_processor_router",
+        "N4SectionProcessorRouter",
+        speculative_store=speculative_store,
+    )
+    n8_node = LazyNode(
+        "src.nodes.n8_human_review_hitl_node",
+        "N8HumanReviewHITLNode",
+        speculative_drafter=speculative_drafter,
+    )
+
+    # Ajouter les nœuds au graphe en utilisant leurs méthodes `run` (enveloppées
+    # par un span de tracing si `tracing_enabled`, profilées en mode `--profile`)
+    nodes = {
+        # Chargements à froid (embeddings, index FAISS, modèle Ollama) lancés
+        # en arrière-plan quand un thread démarre, pendant N0-N2
+        "N0_InitialSetupNode": warmup_on_run(n0_node),
+        "N1_GuidelineIngestorNode": n1_node,
+        "N2_JournalIngestorAnonymizerNode": n2_node,
+        "N3_ThesisOutlinePlannerNode": n3_node,
+        "N4_SectionProcessorRouterNode": n4_router_node,
+        "N5_ContextRetrievalNode": n5_node,
+        "N6_SectionDraftingNode": n6_node,
+        "N7_SelfCritiqueNode": n7_node,
+        "N8_HumanReviewHITLNode": n8_node,
+    }
+    for node_name, node in nodes.items():
+        node = trace_node(profile_node(node, node_name), node_name)
+        workflow.add_node(node_name, node.run)
+    # Point d'arrêt de la revue humaine : le graphe s'interrompt avant ce nœud
+    # (sans effet), l'UI dépose `temporary_human_response` puis reprend.
+    workflow.add_node("N8_AwaitHumanResponse", lambda state: {})
+    # Les nœuds de compilation/bibliographie seront ajoutés plus tard
 
     # Définir les points d'entrée et les arêtes
     workflow.set_entry_point("N0_InitialSetupNode")
@@ -81,30 +168,63 @@ def create_graph(
         lambda state: state.next_node_override,  # Le routeur met à jour ce champ
         {
             "N5_ContextRetrievalNode": "N5_ContextRetrievalNode",
+            # Modification demandée sans nouveaux termes : contexte réutilisé
+            "N6_SectionDraftingNode": "N6_SectionDraftingNode",
+            # Section promue depuis un brouillon spéculatif
+            "N7_SelfCritiqueNode": "N7_SelfCritiqueNode",
+            "N8_HumanReviewHITLNode": "N8_HumanReviewHITLNode",
             "N9_BibliographyManagerNode": END,  # Supposons N9 comme fin pour l'instant
             "ERROR_HANDLER": END,  # Gérer les erreurs en terminant
         },
     )
 
     workflow.add_edge("N5_ContextRetrievalNode", "N6_SectionDraftingNode")
-    # Après N6, on ira vers N7 (Critique) puis N8 (Revue Humaine)
-    # Pour l'instant, simplifions en allant vers N8 directement
-    workflow.add_edge("N6_SectionDraftingNode", "N8_HumanReviewHITLNode")
-
-    # Après N8, la logique de reprise dépendra de l'état (interrupt ou processed)
-    # et sera gérée par le router N4 lors du prochain passage.
-    # Si N8 a traité une réponse, il met à jour current_section_index_for_router
-    # et le graphe retourne à N4.
-    # Si N8 a mis en place un interrupt_payload, le graphe s'arrête et attend.
-    # À la reprise, il devrait aussi passer par N4.
-    workflow.add_edge("N8_HumanReviewHITLNode", "N4_SectionProcessorRouterNode")
-
-    app = workflow.compile(checkpointer=memory)
+    # Après N6, N7 critique le brouillon : retour à N6 pour révision tant que la
+    # boucle n'a pas convergé, puis N8 (Revue Humaine)
+    workflow.add_edge("N6_SectionDraftingNode", "N7_SelfCritiqueNode")
+    workflow.add_conditional_edges(
+        "N7_SelfCritiqueNode",
+        lambda state: state.next_node_override,
+        {
+            "N6_SectionDraftingNode": "N6_SectionDraftingNode",
+            "N8_HumanReviewHITLNode": "N8_HumanReviewHITLNode",
+        },
+    )
+
+    # Après N8 : si un interrupt_payload a été préparé, le graphe s'arrête avant
+    # N8_AwaitHumanResponse ; à la reprise, N8 traite la réponse humaine.
+    # Sinon (réponse traitée ou erreur), retour au routeur N4.
+    workflow.add_conditional_edges(
+        "N8_HumanReviewHITLNode",
+        lambda state: (
+            "N8_AwaitHumanResponse"
+            if state.interrupt_payload
+            else "N4_SectionProcessorRouterNode"
+        ),
+        {
+            "N8_AwaitHumanResponse": "N8_AwaitHumanResponse",
+            "N4_SectionProcessorRouterNode": "N4_SectionProcessorRouterNode",
+        },
+    )
+    workflow.add_edge("N8_AwaitHumanResponse", "N8_HumanReviewHITLNode")
+
+    app = workflow.compile(
+        checkpointer=memory, interrupt_before=["N8_AwaitHumanResponse"]
+    )
     logger.info("AGENT_VF_LangGraph workflow compiled successfully.")
     return app
 
 
 if __name__ == "__main__":  # pragma: no cover
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Exécute le graphe AGENT_VF.")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    configure_logging()
+    if args.profile is not None:
+        start_profiling(args.profile or None)
+
     # Créer les répertoires et fichiers factices si nécessaire pour l'exécution directe
     os.makedirs(settings.default_output_directory, exist_ok=True)
     if settings.default_school_guidelines_path:
@@ -197,3 +317,5 @@ if __name__ == "__main__":  # pragma: no cover
 
     except Exception as e:  # pragma: no cover
         logger.error("Error running the graph stream: %s", e, exc_info=True)
+    finally:
+        stop_profiling()
@@ -0,0 +1,206 @@
+# src/invalidation.py
+import json
+import logging
+import os
+from collections.abc import Mapping
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from src.fingerprints import stable_fingerprint
+from src.outline_cache import PLAN_FIELDS
+from src.state import AgentState, SectionDetail, SectionStatus
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter lorsque les prompts de rédaction/critique (N6/N7) changent :
+# toutes les sections rédigées deviennent alors obsolètes.
+DRAFTING_PROMPT_VERSION = "1"
+
+# Manifeste `chunk_id -> empreinte` écrit par N2 à côté de l'index FAISS ;
+# le checkpoint n'en garde que l'empreinte (`journal_chunk_manifest_digest`).
+CHUNK_MANIFEST_FILENAME = "chunk_manifest.json"
+
+# Champs produits par N5-N8, remis à zéro lorsqu'une section est invalidée.
+DERIVED_FIELDS = (
+    "retrieved_journal_excerpts",
+    "anonymized_context_for_llm",
+    "draft_v1",
+    "critique_v1",
+    "refined_draft",
+    "human_review_feedback",
+    "final_content",
+    "current_draft_for_critique",
+    "reflection_history",
+    "reflection_attempts",
+    "last_critiqued_draft",
+    "reflection_tokens_used",
+    "reflection_time_spent_s",
+    "reflection_stop_reason",
+    "feedback_search_terms",
+    "review_queued_at",
+    "input_fingerprints",
+)
+
+
+def content_hash(text: str) -> str:
+    """Empreinte du contenu d'un chunk de journal."""
+    return stable_fingerprint(text)
+
+
+def chunk_manifest_path(vector_store_path: str) -> Path:
+    """Chemin du manifeste des chunks d'un vector store de journal."""
+    return Path(vector_store_path) / CHUNK_MANIFEST_FILENAME
+
+
+def save_chunk_manifest(vector_store_path: str, manifest: dict[str, str]) -> str:
+    """Écrit le manifeste à côté de l'index (atomiquement) ; retourne son empreinte."""
+    path = chunk_manifest_path(vector_store_path)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_text(json.dumps(manifest, sort_keys=True), encoding="utf-8")
+    os.replace(tmp_path, path)
+    return stable_fingerprint(manifest)
+
+
+@lru_cache(maxsize=8)
+def _read_chunk_manifest(path: str, digest: str) -> Mapping[str, str]:
+    # `digest` fait partie de la clé : une ré-ingestion relit le fichier.
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def load_chunk_manifest(state: AgentState) -> Mapping[str, str]:
+    """
+    Manifeste des chunks indexés par N2 pour ce state (vide si absent).
+
+    Le fichier n'est relu que lorsque `journal_chunk_manifest_digest` change.
+    """
+    digest = state.journal_chunk_manifest_digest
+    if not digest or not state.vector_store_path:
+        return {}
+    path = chunk_manifest_path(state.vector_store_path)
+    try:
+        return _read_chunk_manifest(str(path), digest)
+    except (OSError, ValueError) as e:
+        logger.warning("Manifeste des chunks illisible (%s): %s", path, e)
+        return {}
+
+
+def excerpt_chunk_hashes(
+    excerpts: list[dict[str, Any]], chunk_manifest: Mapping[str, str]
+) -> dict[str, str]:
+    """Identifiants et empreintes des chunks de journal utilisés par une section."""
+    hashes: dict[str, str] = {}
+    for excerpt in excerpts:
+        if not isinstance(excerpt, dict):
+            continue
+        chunk_id = (excerpt.get("metadata") or {}).get("chunk_id")
+        if chunk_id:
+            hashes[chunk_id] = chunk_manifest.get(chunk_id) or content_hash(
+                excerpt.get("text", "")
+            )
+    return hashes
+
+
+def _global_fingerprints(state: AgentState) -> dict[str, str]:
+    return {
+        "guidelines": stable_fingerprint(
+            state.school_guidelines_structured or {},
+            state.school_guidelines_formatting or {},
+        ),
+        "persona": stable_fingerprint(state.user_persona),
+        "model": stable_fingerprint(state.llm_model_name),
+        "index_version": stable_fingerprint(
+            state.embedding_model_name, state.example_thesis_index_version
+        ),
+        "prompt_version": DRAFTING_PROMPT_VERSION,
+    }
+
+
+def _plan_fingerprint(section: SectionDetail) -> str:
+    return stable_fingerprint(
+        {field: getattr(section, field) for field in PLAN_FIELDS},
+        section.target_word_count,
+    )
+
+
+def section_input_fingerprints(
+    state: AgentState, section: SectionDetail
+) -> dict[str, Any]:
+    """
+    Empreintes des entrées utilisées pour rédiger une section (enregistrées par N6).
+
+    Clés : `guidelines`, `persona`, `model`, `index_version`, `prompt_version`,
+    `plan` et `chunks` (`{chunk_id: empreinte du contenu}`).
+    """
+    return {
+        **_global_fingerprints(state),
+        "plan": _plan_fingerprint(section),
+        "chunks": excerpt_chunk_hashes(
+            section.retrieved_journal_excerpts, load_chunk_manifest(state)
+        ),
+    }
+
+
+def changed_inputs(
+    state: AgentState,
+    section: SectionDetail,
+    chunk_manifest: Mapping[str, str] | None = None,
+) -> list[str]:
+    """
+    Liste les entrées d'une section rédigée qui ont changé depuis sa rédaction.
+
+    `chunk_manifest` évite de recharger le manifeste pour chaque section.
+    """
+    recorded = section.input_fingerprints
+    if not recorded:
+        return []
+    current = {**_global_fingerprints(state), "plan": _plan_fingerprint(section)}
+    changed = [key for key, value in current.items() if recorded.get(key) != value]
+    manifest = load_chunk_manifest(state) if chunk_manifest is None else chunk_manifest
+    if manifest and any(
+        manifest.get(chunk_id) != chunk_hash
+        for chunk_id, chunk_hash in (recorded.get("chunks") or {}).items()
+    ):
+        # Un chunk utilisé a été modifié ou supprimé du journal.
+        changed.append("chunks")
+    return changed
+
+
+def reset_section(section: SectionDetail) -> SectionDetail:
+    """Copie de la section remise à PENDING, sans les champs dérivés de N5-N8."""
+    defaults = SectionDetail.__fields__
+    return section.copy(
+        deep=True,
+        update={
+            **{field: defaults[field].get_default() for field in DERIVED_FIELDS},
+            "status": SectionStatus.PENDING,
+        },
+    )
+
+
+def invalidate_stale_sections(
+    state: AgentState,
+) -> tuple[list[SectionDetail], dict[str, list[str]]]:
+    """
+    Remet à PENDING les seules sections dont les entrées ont changé.
+
+    Returns:
+        Le plan mis à jour et, par ID de section invalidée, les entrées modifiées.
+    """
+    new_outline: list[SectionDetail] = []
+    invalidated: dict[str, list[str]] = {}
+    chunk_manifest = load_chunk_manifest(state)
+    for section in state.thesis_outline:
+        changed = changed_inputs(state, section, chunk_manifest)
+        if changed:
+            invalidated[section.id] = changed
+            new_outline.append(reset_section(section))
+        else:
+            new_outline.append(section)
+    if invalidated:
+        logger.info(
+            "Invalidation: %d section(s) remise(s) à PENDING: %s",
+            len(invalidated),
+            invalidated,
+        )
+    return new_outline, invalidated
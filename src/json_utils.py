@@ -0,0 +1,245 @@
+# src/json_utils.py
+import json
+import logging
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+OUTLINE_ROOT_KEYS = ("outline", "planned_thesis_outline")
+
+
+class IncrementalJsonArrayParser:
+    """
+    Parser JSON incrémental qui extrait les objets d'un tableau au fil de l'eau.
+
+    Le texte est fourni par morceaux (ex: tokens d'un `llm.stream`). Dès qu'un
+    objet du tableau ciblé (valeur d'une des `root_keys` de l'objet racine, ou
+    tableau racine lui-même) est refermé, son texte JSON brut est renvoyé par
+    `feed`. Chaque caractère n'est analysé qu'une seule fois : les morceaux
+    reçus sont conservés tels quels et seuls les objets émis sont recopiés.
+    """
+
+    def __init__(self, root_keys: Iterable[str] = OUTLINE_ROOT_KEYS):
+        """Initialise le parser avec les clés racines acceptées pour le tableau."""
+        self.root_keys = set(root_keys)
+        self._chunks: list[str] = []
+        self._chunk_starts: list[int] = []
+        self.characters_received = 0
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._last_string_at_root: str | None = None
+        self._target_array_depth: int | None = None
+        self._object_start: int | None = None
+        self.objects_emitted = 0
+
+    @property
+    def text(self) -> str:
+        """Texte complet reçu jusqu'à présent."""
+        return "".join(self._chunks)
+
+    def _slice(self, start: int, end: int) -> str:
+        """Texte reçu entre les positions absolues `start` et `end`."""
+        index = bisect_right(self._chunk_starts, start) - 1
+        pieces: list[str] = []
+        while index < len(self._chunks) and self._chunk_starts[index] < end:
+            chunk_start = self._chunk_starts[index]
+            pieces.append(
+                self._chunks[index][max(start - chunk_start, 0) : end - chunk_start]
+            )
+            index += 1
+        return "".join(pieces)
+
+    def feed(self, chunk: str) -> list[str]:  # noqa: C901
+        """Ajoute un morceau de texte et renvoie les objets complétés."""
+        if not chunk:
+            return []
+        self._chunks.append(chunk)
+        self._chunk_starts.append(self.characters_received)
+        self.characters_received += len(chunk)
+        completed: list[str] = []
+
+        for char in chunk:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string_at_root = self._slice(
+                            self._string_start + 1, self._pos
+                        )
+            elif char == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif char in "{[":
+                if (
+                    char == "["
+                    and self._target_array_depth is None
+                    and (
+                        self._depth == 0
+                        or (
+                            self._depth == 1
+                            and self._last_string_at_root in self.root_keys
+                        )
+                    )
+                ):
+                    self._target_array_depth = self._depth + 1
+                elif (
+                    char == "{"
+                    and self._target_array_depth is not None
+                    and self._depth == self._target_array_depth
+                ):
+                    self._object_start = self._pos
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if (
+                    char == "}"
+                    and self._object_start is not None
+                    and self._depth == self._target_array_depth
+                ):
+                    completed.append(self._slice(self._object_start, self._pos + 1))
+                    self._object_start = None
+                    self.objects_emitted += 1
+                elif (
+                    char == "]"
+                    and self._target_array_depth is not None
+                    and self._depth == self._target_array_depth - 1
+                ):
+                    # Le tableau ciblé est refermé : on ignore les tableaux suivants.
+                    self._target_array_depth = -1
+            self._pos += 1
+
+        return completed
+
+
+def iter_stream_objects(
+    chunks: Iterable[str], root_keys: Iterable[str] = OUTLINE_ROOT_KEYS
+) -> Iterator[str]:
+    """Itère sur les objets JSON complets extraits d'un flux de morceaux de texte."""
+    parser = IncrementalJsonArrayParser(root_keys=root_keys)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    logger.debug(
+        "Flux JSON terminé: %d objets extraits, %d caractères reçus.",
+        parser.objects_emitted,
+        parser.characters_received,
+    )
+
+
+def strip_code_fences(text: str) -> str:
+    """Retire les balises Markdown (```json ... ```) autour d'une sortie LLM."""
+    stripped = text.strip()
+    if stripped.startswith("```"):
+        first_newline = stripped.find("\n")
+        stripped = stripped[first_newline + 1 :] if first_newline != -1 else ""
+        if stripped.rstrip().endswith("```"):
+            stripped = stripped.rstrip()[:-3]
+    return stripped.strip()
+
+
+def repair_json(text: str) -> str:  # noqa: C901
+    """
+    Répare localement une sortie JSON de LLM tronquée ou légèrement invalide.
+
+    Opérations (en une seule passe) : retrait des balises Markdown et du texte
+    avant le premier `{`/`[`, suppression des virgules finales avant `}`/`]`,
+    fermeture d'une chaîne non terminée et des accolades/crochets ouverts.
+    Le résultat n'est pas garanti valide ; il doit être revalidé par l'appelant.
+    """
+    candidate = strip_code_fences(text)
+    starts = [i for i in (candidate.find("{"), candidate.find("[")) if i != -1]
+    if not starts:
+        return candidate
+    candidate = candidate[min(starts) :]
+
+    output: list[str] = []
+    stack: list[str] = []
+    in_string = False
+    escape = False
+    for char in candidate:
+        if in_string:
+            output.append(char)
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            while output and output[-1].isspace():
+                output.pop()
+            if output and output[-1] == ",":
+                output.pop()
+            if not stack:
+                break
+            if stack[-1] != char:
+                char = stack[-1]
+            stack.pop()
+            output.append(char)
+            if not stack:
+                break
+            continue
+        output.append(char)
+
+    if in_string:
+        if escape:
+            output.pop()
+        output.append('"')
+    while output and (output[-1].isspace() or output[-1] == ","):
+        output.pop()
+    if output and output[-1] == ":":
+        output.append("null")
+    while stack:
+        output.append(stack.pop())
+    return "".join(output)
+
+
+def loads_lenient(text: str) -> Any:
+    """Charge un JSON, en appliquant `repair_json` si le parsing direct échoue."""
+    try:
+        return json.loads(strip_code_fences(text))
+    except json.JSONDecodeError:
+        repaired = repair_json(text)
+        logger.info("JSON invalide réparé localement (%d caractères).", len(repaired))
+        return json.loads(repaired)
+
+
+def inline_json_schema_refs(schema: dict[str, Any]) -> dict[str, Any]:
+    """
+    Remplace les `$ref` locaux (`#/definitions/...`, `#/$defs/...`) d'un schéma.
+
+    Le schéma obtenu est autonome, ce qui le rend utilisable directement comme
+    contrainte de décodage (`format` structuré d'Ollama).
+    """
+    definitions = {**schema.get("definitions", {}), **schema.get("$defs", {})}
+
+    def _resolve(node: Any) -> Any:
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str) and ref.startswith(("#/definitions/", "#/$defs/")):
+                resolved = dict(definitions[ref.rsplit("/", 1)[-1]])
+                resolved.update({k: v for k, v in node.items() if k != "$ref"})
+                return _resolve(resolved)
+            return {
+                key: _resolve(value)
+                for key, value in node.items()
+                if key not in ("definitions", "$defs")
+            }
+        if isinstance(node, list):
+            return [_resolve(item) for item in node]
+        return node
+
+    return _resolve(schema)
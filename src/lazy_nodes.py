@@ -0,0 +1,60 @@
+# src/lazy_nodes.py
+import importlib
+import inspect
+import logging
+import threading
+from typing import Any
+
+from src.state import AgentState
+
+logger = logging.getLogger(__name__)
+
+
+class LazyNode:
+    """
+    Nœud importé et instancié à sa première exécution.
+
+    Le module du nœud (et ses dépendances lourdes : clients LLM, FAISS,
+    fastembed, chargeurs de documents) n'est importé que si le graphe exécute
+    réellement ce nœud. Une reprise qui ne fait que répondre à N8 ne paie
+    ainsi ni l'import des autres nœuds ni la construction de leurs clients.
+    """
+
+    def __init__(self, module_name: str, class_name: str, **kwargs: Any):
+        """Mémorise le module, la classe et les arguments du constructeur."""
+        self.module_name = module_name
+        self.class_name = class_name
+        self.kwargs = kwargs
+        self._node: Any | None = None
+        self._accepts_config = False
+        self._lock = threading.Lock()
+
+    @property
+    def node(self) -> Any:
+        """Instance réelle du nœud (construite au premier accès)."""
+        if self._node is None:
+            with self._lock:
+                if self._node is None:
+                    module = importlib.import_module(self.module_name)
+                    node = getattr(module, self.class_name)(**self.kwargs)
+                    self._accepts_config = (
+                        "config" in inspect.signature(node.run).parameters
+                    )
+                    logger.debug("Nœud %s construit.", self.class_name)
+                    self._node = node
+        return self._node
+
+    def __getattr__(self, name: str) -> Any:
+        """Délègue au nœud réel (le construit si nécessaire)."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.node, name)
+
+    def run(
+        self, state: AgentState, config: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """Construit le nœud si besoin puis exécute son `run`."""
+        node = self.node
+        if self._accepts_config:
+            return node.run(state, config)
+        return node.run(state)
@@ -0,0 +1,133 @@
+# src/length_budget.py
+import logging
+import math
+from typing import Any
+
+from src.state import SectionDetail, SectionStatus
+
+logger = logging.getLogger(__name__)
+
+# Poids par niveau hiérarchique : les sous-sections portent le contenu,
+# les niveaux profonds sont plus courts.
+LEVEL_WEIGHTS = {1: 1.0, 2: 1.0, 3: 0.7}
+DEEP_LEVEL_WEIGHT = 0.5
+# Section suivie de sous-sections : simple chapeau introductif.
+PARENT_SECTION_WEIGHT = 0.25
+# Ratio tokens / mot pour du français avec les tokenizers des modèles Ollama.
+TOKENS_PER_WORD = 1.6
+MIN_TARGET_WORDS = 80
+MIN_OUTPUT_TOKENS = 256
+
+
+def section_weight(outline: list[SectionDetail], index: int) -> float:
+    """Poids relatif d'une section dans le budget de longueur du mémoire."""
+    section = outline[index]
+    has_children = index + 1 < len(outline) and outline[index + 1].level > section.level
+    base_weight = (
+        PARENT_SECTION_WEIGHT
+        if has_children
+        else LEVEL_WEIGHTS.get(section.level, DEEP_LEVEL_WEIGHT)
+    )
+    return base_weight * max(section.length_weight, 0.0)
+
+
+def max_output_tokens_for(target_word_count: int, headroom: float) -> int:
+    """Plafond `num_predict` pour une cible en mots (avec marge)."""
+    return max(
+        MIN_OUTPUT_TOKENS,
+        math.ceil(target_word_count * TOKENS_PER_WORD * (1 + headroom)),
+    )
+
+
+def allocate_length_budget(
+    outline: list[SectionDetail],
+    min_pages: int | None,
+    words_per_page: int,
+    headroom: float,
+) -> list[SectionDetail]:
+    """
+    Répartit l'objectif de pages (N1 `min_pages`) entre les sections du plan.
+
+    Le nombre total de mots (`min_pages * words_per_page`) est réparti au
+    prorata de `section_weight`. Chaque section reçoit `target_word_count` et
+    `max_output_tokens` (plafond de génération N6).
+
+    Returns:
+        Une copie du plan avec les budgets renseignés (inchangé si `min_pages`
+        est absent).
+    """
+    if not min_pages or min_pages <= 0 or not outline:
+        return outline
+    budgeted = [section.copy(deep=True) for section in outline]
+    eligible = [i for i, s in enumerate(budgeted) if s.status != SectionStatus.ERROR]
+    weights = {i: section_weight(budgeted, i) for i in eligible}
+    total_weight = sum(weights.values())
+    if total_weight <= 0:
+        return outline
+
+    total_words = min_pages * words_per_page
+    for index, weight in weights.items():
+        target = max(MIN_TARGET_WORDS, round(total_words * weight / total_weight))
+        budgeted[index].target_word_count = target
+        budgeted[index].max_output_tokens = max_output_tokens_for(target, headroom)
+    logger.info(
+        "Length budget: %d pages (~%d mots) réparties sur %d sections.",
+        min_pages,
+        total_words,
+        len(weights),
+    )
+    return budgeted
+
+
+def length_instruction(section: SectionDetail, words_per_page: int) -> str:
+    """Consigne de longueur insérée dans les prompts de N6."""
+    if not section.target_word_count:
+        return (
+            "Aucune longueur imposée : adaptez la longueur aux objectifs de la "
+            "section."
+        )
+    pages = section.target_word_count / words_per_page
+    return (
+        f"Visez environ {section.target_word_count} mots (≈ {pages:.1f} page(s)), "
+        "sans dépasser cette cible de plus de 10 %."
+    )
+
+
+def word_count(text: str | None) -> int:
+    """Nombre de mots d'un texte (séparés par des espaces)."""
+    return len(text.split()) if text else 0
+
+
+def length_report(outline: list[SectionDetail]) -> list[dict[str, Any]]:
+    """Longueur projetée (budget) et réelle (dernier brouillon) par section."""
+    report = []
+    for section in outline:
+        text = section.final_content or section.refined_draft or section.draft_v1
+        actual = word_count(text)
+        projected = section.target_word_count
+        report.append(
+            {
+                "section_id": section.id,
+                "title": section.title,
+                "projected_words": projected,
+                "actual_words": actual,
+                "ratio": round(actual / projected, 2) if projected and text else None,
+            }
+        )
+    return report
+
+
+def format_length_report(report: list[dict[str, Any]]) -> str:
+    """Formate le rapport de longueur en tableau texte."""
+    lines = [f"{'Section':<40} {'Projeté':>8} {'Réel':>8} {'Ratio':>6}"]
+    for row in report:
+        projected = row["projected_words"] if row["projected_words"] else "-"
+        ratio = f"{row['ratio']:.2f}" if row["ratio"] is not None else "-"
+        lines.append(
+            f"{row['title'][:40]:<40} {projected!s:>8} {row['actual_words']:>8} "
+            f"{ratio:>6}"
+        )
+    total_projected = sum(r["projected_words"] or 0 for r in report)
+    total_actual = sum(r["actual_words"] for r in report)
+    lines.append(f"{'TOTAL':<40} {total_projected:>8} {total_actual:>8}")
+    return "\n".join(lines)
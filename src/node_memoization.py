@@ -0,0 +1,177 @@
+# src/node_memoization.py
+import json
+import logging
+import os
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from src.config import settings
+from src.fingerprints import stable_fingerprint
+from src.state import AgentState
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter lorsque la sortie de N0/N1/N2 change de format : les sorties
+# mémoïsées deviennent alors inaccessibles.
+NODE_MEMO_VERSION = "1"
+
+
+def path_fingerprint(path: str | None) -> Any:
+    """
+    Empreinte légère d'un fichier ou d'un répertoire (taille et date de modification).
+
+    Un répertoire est parcouru récursivement ; un chemin absent a une empreinte
+    distincte de celle d'un répertoire vide.
+    """
+    if not path:
+        return None
+    target = Path(path)
+    if target.is_file():
+        stat = target.stat()
+        return [stat.st_size, stat.st_mtime_ns]
+    if target.is_dir():
+        return sorted(
+            [str(f.relative_to(target)), f.stat().st_size, f.stat().st_mtime_ns]
+            for f in target.rglob("*")
+            if f.is_file()
+        )
+    return "missing"
+
+
+class MemoizedNode:
+    """
+    Enveloppe un nœud déterministe (N0-N2) et rejoue sa sortie mémoïsée.
+
+    L'empreinte couvre les champs d'état déclarés (`input_fields`), les
+    fichiers ou répertoires désignés par `input_path_fields` et les `settings`
+    lus par le nœud (`settings_fields`). En cas de HIT, le delta de sortie
+    enregistré est retourné sans exécuter le nœud, à condition que les
+    fichiers qu'il produit (`output_path_fields`, p. ex. le vector store) n'aient
+    pas changé depuis et que les répertoires qu'il crée (`required_path_fields`)
+    existent toujours. Les sorties en erreur ne sont jamais enregistrées.
+    """
+
+    def __init__(
+        self,
+        node: Any,
+        node_name: str,
+        input_fields: tuple[str, ...],
+        input_path_fields: tuple[str, ...] = (),
+        output_path_fields: tuple[str, ...] = (),
+        required_path_fields: tuple[str, ...] = (),
+        settings_fields: tuple[str, ...] = (),
+        memo_directory: str | None = None,
+    ):
+        """Initialise l'enveloppe autour de `node.run`."""
+        self.node = node
+        self.node_name = node_name
+        self.input_fields = input_fields
+        self.input_path_fields = input_path_fields
+        self.output_path_fields = output_path_fields
+        self.required_path_fields = required_path_fields
+        self.settings_fields = settings_fields
+        self.memo_directory = (
+            Path(memo_directory or settings.node_memo_directory) / node_name
+        )
+
+    def fingerprint(self, state: AgentState) -> str:
+        """Empreinte des entrées du nœud pour cet état."""
+        return stable_fingerprint(
+            NODE_MEMO_VERSION,
+            self.node_name,
+            {field: getattr(state, field) for field in self.input_fields},
+            # N0 distingue un champ absent de sa valeur par défaut
+            sorted(set(self.input_fields) & state.__fields_set__),
+            {
+                field: path_fingerprint(getattr(state, field))
+                for field in self.input_path_fields
+            },
+            {field: getattr(settings, field) for field in self.settings_fields},
+        )
+
+    def _output_paths(self, state: AgentState, delta: dict[str, Any]) -> dict:
+        return {
+            field: path_fingerprint(delta.get(field, getattr(state, field)))
+            for field in self.output_path_fields
+        }
+
+    def _entry_path(self, key: str) -> Path:
+        return self.memo_directory / f"{key}.json"
+
+    def _load(self, state: AgentState, key: str) -> dict[str, Any] | None:
+        entry_path = self._entry_path(key)
+        if not entry_path.is_file():
+            return None
+        try:
+            entry = json.loads(entry_path.read_text(encoding="utf-8"))
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Node memo: entrée %s illisible, ignorée: %s", entry_path, e)
+            return None
+        delta = entry["delta"]
+        missing = [
+            field
+            for field in self.required_path_fields
+            if path_fingerprint(delta.get(field, getattr(state, field)))
+            in (None, "missing")
+        ]
+        if missing or entry.get("output_paths") != self._output_paths(state, delta):
+            logger.info(
+                "Node memo: fichiers produits par %s modifiés, entrée ignorée.",
+                self.node_name,
+            )
+            return None
+        return delta
+
+    def _store(self, state: AgentState, key: str, delta: dict[str, Any]) -> None:
+        entry = {
+            "version": NODE_MEMO_VERSION,
+            "created_at": datetime.now(UTC).isoformat(),
+            "output_paths": self._output_paths(state, delta),
+            "delta": delta,
+        }
+        try:
+            payload = json.dumps(entry, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logger.warning(
+                "Node memo: sortie de %s non sérialisable, non mémoïsée: %s",
+                self.node_name,
+                e,
+            )
+            return
+        self.memo_directory.mkdir(parents=True, exist_ok=True)
+        entry_path = self._entry_path(key)
+        tmp_path = entry_path.with_suffix(".json.tmp")
+        tmp_path.write_text(payload, encoding="utf-8")
+        os.replace(tmp_path, entry_path)
+
+    def run(self, state: AgentState) -> dict[str, Any]:
+        """Retourne la sortie mémoïsée (HIT) ou exécute le nœud (MISS)."""
+        key = self.fingerprint(state)
+        delta = self._load(state, key)
+        if delta is not None:
+            logger.info("Node memo HIT: %s (%s)", self.node_name, key[:12])
+            return delta
+        logger.info("Node memo MISS: %s (%s)", self.node_name, key[:12])
+        delta = self.node.run(state)
+        last_node = delta.get("last_successful_node") or ""
+        if delta.get("error_message") or last_node.endswith("_Error"):
+            return delta
+        self._store(state, key, delta)
+        return delta
+
+
+def memoize_node(node: Any, node_name: str, **dependencies: Any) -> Any:
+    """
+    Applique `MemoizedNode` sauf si la mémoïsation est désactivée pour ce nœud.
+
+    Returns:
+        Le nœud enveloppé, ou le nœud d'origine (`node_memoization_enabled` à
+        False ou `node_name` dans `node_memoization_disabled_nodes`).
+    """
+    if (
+        not settings.node_memoization_enabled
+        or node_name in settings.node_memoization_disabled_nodes
+    ):
+        return node
+    return MemoizedNode(node, node_name, **dependencies)
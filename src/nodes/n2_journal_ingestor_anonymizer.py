@@ -1,7 +1,9 @@
 # src/nodes/n2_journal_ingestor_anonymizer.py
 import logging
 import re
+from collections.abc import Iterable, Iterator
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
@@ -13,9 +15,16 @@ from langchain_community.document_loaders import (
 from langchain_community.embeddings import FastEmbedEmbeddings
 from langchain_community.vectorstores import FAISS
 from langchain_core.documents import Document
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from src.cassette import with_embeddings_cassette
+from src.config import settings
+from src.embedding_worker import worker_embeddings
+from src.invalidation import content_hash, save_chunk_manifest
 from src.state import AgentState
+from src.text_chunker import chunk_text
+from src.tools.t2_example_thesis_retriever import build_example_thesis_index
+from src.tracing import traced_embeddings
+from src.warmup import warm_embeddings
 
 logger = logging.getLogger(__name__)
 
@@ -70,16 +79,20 @@ def _load_single_journal_file(file_path: Path) -> list[Document]:
         return []
 
 
-def _load_raw_journal_entries_from_files(journal_dir_path: str) -> list[dict[str, Any]]:
-    """Charge toutes les entrées de journal depuis le répertoire spécifié."""
-    raw_entries_data: list[dict[str, Any]] = []
+def _iter_raw_journal_entries(journal_dir_path: str) -> Iterator[dict[str, Any]]:
+    """
+    Produit les entrées de journal du répertoire, un fichier à la fois.
+
+    Seul le fichier en cours est en mémoire : N2 enchaîne anonymisation,
+    chunking et indexation sans matérialiser tout le journal.
+    """
     path_obj = Path(journal_dir_path)
 
     if not path_obj.is_dir():
         logger.error(
             "Le chemin du journal %s n'est pas un répertoire valide.", journal_dir_path
         )
-        return raw_entries_data
+        return
 
     for file_path in sorted(path_obj.iterdir()):
         if file_path.is_file():
@@ -105,21 +118,23 @@ def _load_raw_journal_entries_from_files(journal_dir_path: str) -> list[dict[str
 
             if page_content.strip():
                 date_str = _parse_date_from_filename(file_path.name)
-                raw_entries_data.append(
-                    {
-                        "source_file": file_path.name,
-                        "raw_text": page_content,
-                        "date_str": date_str if date_str else "Date inconnue",
-                        "anonymized_text": page_content,
-                        "tone_issues_found": False,
-                    }
-                )
+                yield {
+                    "source_file": file_path.name,
+                    "raw_text": page_content,
+                    "date_str": date_str if date_str else "Date inconnue",
+                    "anonymized_text": page_content,
+                    "tone_issues_found": False,
+                }
             else:  # pragma: no cover
                 logger.warning(
                     "Aucun contenu textuel extrait de %s après chargement.",
                     file_path.name,
                 )
 
+
+def _load_raw_journal_entries_from_files(journal_dir_path: str) -> list[dict[str, Any]]:
+    """Charge toutes les entrées de journal depuis le répertoire spécifié."""
+    raw_entries_data = list(_iter_raw_journal_entries(journal_dir_path))
     logger.info(
         "%d entrées de journal chargées depuis %s.",
         len(raw_entries_data),
@@ -128,6 +143,13 @@ def _load_raw_journal_entries_from_files(journal_dir_path: str) -> list[dict[str
     return raw_entries_data
 
 
+def _batched(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    """Regroupe un itérable en listes d'au plus `size` éléments."""
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
 class N2JournalIngestorAnonymizerNode:
     """
     Nœud pour charger, traiter, chunker les entrées du journal et gérer le vector store.
@@ -135,35 +157,56 @@ class N2JournalIngestorAnonymizerNode:
     L'anonymisation est basique. Le vector store utilisé est FAISS.
     """
 
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 150):
-        """Initialise le nœud avec la taille et le chevauchement des chunks."""
-        self.chunk_size = chunk_size
-        self.chunk_overlap = chunk_overlap
+    def __init__(self, chunk_size: int | None = None, chunk_overlap: int | None = None):
+        """
+        Initialise le nœud avec la taille et le chevauchement des chunks.
+
+        Les deux sont exprimés en tokens du modèle d'embedding (défauts :
+        `n2_chunk_max_tokens` et `n2_chunk_overlap_tokens`).
+        """
+        self.chunk_size = chunk_size or settings.n2_chunk_max_tokens
+        self.chunk_overlap = (
+            settings.n2_chunk_overlap_tokens if chunk_overlap is None else chunk_overlap
+        )
 
     def _process_entries(
         self, entries: list[dict[str, Any]], anonymization_map: dict[str, str]
     ) -> list[dict[str, Any]]:
         """Applique l'anonymisation aux entrées de journal."""
-        processed_entries = []
+        return list(
+            self._iter_processed_entries(
+                (entry.copy() for entry in entries), anonymization_map
+            )
+        )
+
+    def _iter_processed_entries(
+        self, entries: Iterable[dict[str, Any]], anonymization_map: dict[str, str]
+    ) -> Iterator[dict[str, Any]]:
+        """Anonymise les entrées au fil de l'eau (les dicts sont modifiés en place)."""
         for entry in entries:
-            entry_copy = entry.copy()
-            anon_text = simple_anonymizer(entry_copy["raw_text"], anonymization_map)
-            entry_copy["anonymized_text"] = anon_text
-            processed_entries.append(entry_copy)
-        return processed_entries
+            entry["anonymized_text"] = simple_anonymizer(
+                entry["raw_text"], anonymization_map
+            )
+            yield entry
 
     def _chunk_entries_for_embedding(
         self, processed_entries: list[dict[str, Any]]
     ) -> list[Document]:
         """Divise les entrées traitées en chunks pour l'embedding."""
         logger.info("Démarrage du chunking des entrées traitées...")
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-            length_function=len,
-            is_separator_regex=False,
-        )
-        all_docs: list[Document] = []
+        all_docs = list(self._iter_chunks(processed_entries))
+        logger.info("%d chunks créés pour l'indexation FAISS.", len(all_docs))
+        return all_docs
+
+    def _iter_chunks(
+        self, processed_entries: Iterable[dict[str, Any]]
+    ) -> Iterator[Document]:
+        """
+        Produit les chunks de chaque entrée, entrée par entrée.
+
+        Les offsets `start_offset`/`end_offset` de chaque chunk dans le texte
+        anonymisé de l'entrée sont conservés dans les métadonnées.
+        """
         for entry_idx, entry in enumerate(processed_entries):
             anonymized_text = entry.get("anonymized_text")
             if not anonymized_text or not anonymized_text.strip():  # pragma: no cover
@@ -173,8 +216,8 @@ class N2JournalIngestorAnonymizerNode:
                 )
                 continue
 
-            chunks = text_splitter.split_text(anonymized_text)
-            for i, chunk_text in enumerate(chunks):
+            offsets = chunk_text(anonymized_text, self.chunk_size, self.chunk_overlap)
+            for i, (start, end) in enumerate(offsets):
                 metadata = {
                     "source_document": entry.get(
                         "source_file", f"Inconnue_{entry_idx}"
@@ -183,11 +226,12 @@ class N2JournalIngestorAnonymizerNode:
                     "chunk_index": i,
                     "chunk_id": f"{entry.get('source_file', f'unk_{entry_idx}')}"
                     f"_chunk{i}",
+                    "start_offset": start,
+                    "end_offset": end,
                 }
-                doc = Document(page_content=chunk_text, metadata=metadata)
-                all_docs.append(doc)
-        logger.info("%d chunks créés pour l'indexation FAISS.", len(all_docs))
-        return all_docs
+                yield Document(
+                    page_content=anonymized_text[start:end], metadata=metadata
+                )
 
     def _remove_existing_store(self, vector_store_path: Path) -> None:
         """Supprime un vector store existant."""
@@ -235,17 +279,31 @@ class N2JournalIngestorAnonymizerNode:
     # noqa: C901
     def _save_or_update_faiss_store(
         self,
-        docs_to_index: list[Document],
+        docs_to_index: Iterable[Document],
         vector_store_path_str: str,
         embedding_model_name: str,
         recreate_if_exists: bool,
+        batch_size: int | None = None,
     ) -> bool:
-        """Sauvegarde ou met à jour le vector store FAISS."""
+        """
+        Sauvegarde ou met à jour le vector store FAISS.
+
+        `docs_to_index` peut être un générateur : les chunks sont embeddés et
+        ajoutés à l'index par lots de `batch_size` au fur et à mesure qu'ils
+        sont produits, sans que la liste complète n'existe en mémoire.
+        """
         logger.info("Gestion du vector store FAISS à : %s", vector_store_path_str)
         vector_store_path = Path(vector_store_path_str)
         embeddings: FastEmbedEmbeddings | None = None
         try:
-            embeddings = FastEmbedEmbeddings(model_name=embedding_model_name)
+            embeddings = traced_embeddings(
+                with_embeddings_cassette(
+                    lambda: worker_embeddings(embedding_model_name)
+                    or warm_embeddings(embedding_model_name)
+                    or FastEmbedEmbeddings(model_name=embedding_model_name),
+                    embedding_model_name,
+                )
+            )
         except Exception as e:  # noqa: BLE001
             logger.error(
                 "Échec init embedding model (%s): %s",
@@ -260,34 +318,42 @@ class N2JournalIngestorAnonymizerNode:
 
         vector_store_path.mkdir(parents=True, exist_ok=True)
 
-        if not docs_to_index:
-            logger.warning(
-                "Aucun document à indexer. Vector store non (re)créé ou vide."
-            )
-            if recreate_if_exists:  # pragma: no cover
-                return self._create_empty_faiss_store(vector_store_path, embeddings)
-            return True
-
         try:
             index_file = vector_store_path / "index.faiss"
             pkl_file = vector_store_path / "index.pkl"
-
-            if (
+            update_existing = (
                 not recreate_if_exists
                 and index_file.exists()
                 and pkl_file.exists()
                 and index_file.stat().st_size > 0
+            )
+
+            db: FAISS | None = None
+            for batch in _batched(
+                docs_to_index, batch_size or settings.n2_index_batch_size
             ):
-                logger.info("Mise à jour du vector store FAISS existant...")
-                db = FAISS.load_local(
-                    folder_path=str(vector_store_path),
-                    embeddings=embeddings,
-                    allow_dangerous_deserialization=True,
+                if db is not None:
+                    db.add_documents(batch)
+                elif update_existing:
+                    logger.info("Mise à jour du vector store FAISS existant...")
+                    db = FAISS.load_local(
+                        folder_path=str(vector_store_path),
+                        embeddings=embeddings,
+                        allow_dangerous_deserialization=True,
+                    )
+                    db.add_documents(batch)
+                else:
+                    logger.info("Création d'un nouveau vector store FAISS...")
+                    db = FAISS.from_documents(batch, embeddings)
+                logger.debug("N2: lot de %d chunks indexé.", len(batch))
+
+            if db is None:
+                logger.warning(
+                    "Aucun document à indexer. Vector store non (re)créé ou vide."
                 )
-                db.add_documents(docs_to_index)
-            else:
-                logger.info("Création d'un nouveau vector store FAISS...")
-                db = FAISS.from_documents(docs_to_index, embeddings)
+                if recreate_if_exists:  # pragma: no cover
+                    return self._create_empty_faiss_store(vector_store_path, embeddings)
+                return True
 
             db.save_local(folder_path=str(vector_store_path))
             store_action = (
@@ -309,6 +375,33 @@ class N2JournalIngestorAnonymizerNode:
             )
             return False
 
+    def _index_example_thesis(
+        self, state: AgentState, updated_fields: dict[str, Any]
+    ) -> None:
+        """
+        Indexe l'exemple de thèse dans son propre vector store (non bloquant).
+
+        N3 et N6 n'en reçoivent ensuite que les passages pertinents. En cas
+        d'échec, ils se rabattent sur le texte complet de l'exemple.
+        """
+        if not state.example_thesis_text_content:
+            return
+        index_path = (
+            state.example_thesis_index_path or settings.example_thesis_index_directory
+        )
+        version = build_example_thesis_index(
+            state.example_thesis_text_content,
+            index_path,
+            state.embedding_model_name,  # type: ignore
+            chunk_size=settings.example_thesis_chunk_size,
+            chunk_overlap=settings.example_thesis_chunk_overlap,
+        )
+        if version is None:  # pragma: no cover
+            logger.warning("N2: Index de l'exemple de thèse non disponible.")
+            return
+        updated_fields["example_thesis_index_path"] = index_path
+        updated_fields["example_thesis_index_version"] = version
+
     def run(self, state: AgentState) -> dict[str, Any]:
         """Exécute le nœud d'ingestion et d'anonymisation du journal."""
         logger.info("N2: Journal Ingestor & Anonymizer Node starting...")
@@ -328,32 +421,72 @@ class N2JournalIngestorAnonymizerNode:
             )
             return updated_fields
 
-        raw_journal_data = _load_raw_journal_entries_from_files(state.journal_path)
-        if not raw_journal_data:  # pragma: no cover
-            logger.warning("N2: Aucune entrée de journal brute n'a été chargée.")
-
+        # Pipeline en flux : fichier -> anonymisation -> chunks -> lot
+        # d'embeddings -> index. Le checkpoint ne reçoit que des compteurs et
+        # l'empreinte du manifeste des chunks, écrit à côté de l'index.
         anonymization_map = state.anonymization_map or DEFAULT_ANONYMIZATION_MAP
-        processed_entries = self._process_entries(raw_journal_data, anonymization_map)
-        updated_fields["raw_journal_entries"] = processed_entries
-
-        docs_to_index = self._chunk_entries_for_embedding(processed_entries)
-        updated_fields["processed_chunks_for_vector_store"] = [
-            doc.dict() for doc in docs_to_index
-        ]
-
+        chunk_manifest: dict[str, str] = {}
+        summary = {"entries": 0, "chunks": 0, "characters": 0, "tone_issues": 0}
+
+        def _count_entries(
+            entries: Iterable[dict[str, Any]],
+        ) -> Iterator[dict[str, Any]]:
+            for entry in entries:
+                summary["entries"] += 1
+                summary["characters"] += len(entry["anonymized_text"])
+                summary["tone_issues"] += bool(entry["tone_issues_found"])
+                yield entry
+
+        def _record_chunks(chunks: Iterable[Document]) -> Iterator[Document]:
+            for doc in chunks:
+                chunk_manifest[doc.metadata["chunk_id"]] = content_hash(
+                    doc.page_content
+                )
+                summary["chunks"] += 1
+                yield doc
+
+        chunk_stream = _record_chunks(
+            self._iter_chunks(
+                _count_entries(
+                    self._iter_processed_entries(
+                        _iter_raw_journal_entries(state.journal_path),  # type: ignore
+                        anonymization_map,
+                    )
+                )
+            )
+        )
+        batch_size = settings.n2_index_batch_size
         store_success = self._save_or_update_faiss_store(
-            docs_to_index,
+            chunk_stream,
             state.vector_store_path,  # type: ignore
             state.embedding_model_name,  # type: ignore
             state.recreate_vector_store,
+            batch_size=batch_size,
+        )
+        if not summary["entries"]:  # pragma: no cover
+            logger.warning("N2: Aucune entrée de journal brute n'a été chargée.")
+        summary["batches"] = -(-summary["chunks"] // batch_size)
+        logger.info(
+            "N2: %d entrées, %d chunks indexés en %d lot(s).",
+            summary["entries"],
+            summary["chunks"],
+            summary["batches"],
         )
+        updated_fields["raw_journal_entries"] = []
+        updated_fields["processed_chunks_for_vector_store"] = None
+        updated_fields["journal_ingestion_summary"] = summary
 
         if store_success:
+            updated_fields["journal_chunk_manifest_digest"] = save_chunk_manifest(
+                state.vector_store_path,  # type: ignore
+                chunk_manifest,
+            )
             updated_fields["vector_store_initialized"] = True
             updated_fields["current_operation_message"] = (
                 "N2: Journal entries processed and vector store updated."
             )
             updated_fields["last_successful_node"] = "N2JournalIngestorAnonymizerNode"
+            self._index_example_thesis(state, updated_fields)
         else:  # pragma: no cover
             updated_fields["vector_store_initialized"] = False
             updated_fields["error_message"] = (
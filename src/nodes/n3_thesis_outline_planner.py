@@ -1,7 +1,10 @@
 # src/nodes/n3_thesis_outline_planner.py
+import contextvars
+import json  # Ajout pour la Solution 2 si nécessaire plus tard
 import logging
 import traceback
-import json # Ajout pour la Solution 2 si nécessaire plus tard
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from langchain_community.chat_models import ChatOllama
@@ -11,7 +14,18 @@ from langchain_core.pydantic_v1 import BaseModel as LangchainBaseModel
 from langchain_core.pydantic_v1 import Field as LangchainField
 from langchain_core.pydantic_v1 import ValidationError as PydanticV1ValidationError
 
+from src.cassette import with_chat_cassette
+from src.config import settings
+from src.json_utils import (
+    OUTLINE_ROOT_KEYS,
+    inline_json_schema_refs,
+    iter_stream_objects,
+    loads_lenient,
+)
+from src.length_budget import allocate_length_budget
+from src.outline_cache import OutlineCache
 from src.state import AgentState, SectionDetail, SectionStatus
+from src.tools.t2_example_thesis_retriever import retrieve_example_passages
 
 logger = logging.getLogger(__name__)
 
@@ -62,24 +76,78 @@ class PlannedThesisOutlineForLLM(LangchainBaseModel):
     )
 
 
+def _raw_section_id(raw_object: str) -> str | None:
+    """Id d'un objet section JSON invalide pour le modèle, si lisible."""
+    try:
+        item = json.loads(raw_object)
+    except json.JSONDecodeError:
+        return None
+    return str(item["id"]) if isinstance(item, dict) and item.get("id") else None
+
+
+N3_PLANNER_MODES = ("single_pass", "streaming", "two_phase", "constrained")
+
+
 class N3ThesisOutlinePlannerNode:  # noqa: C901
     """
     Nœud responsable de la génération du plan initial de la thèse.
+
+    Modes de planification (`planner_mode`) :
+    - `single_pass` : un appel LLM, le JSON complet est parsé à la fin.
+    - `streaming` : le plan est consommé via `llm.stream` et chaque section est
+      validée dès que son objet JSON est refermé (voir `stream_sections`).
+    - `two_phase` : les parties de niveau 1 sont générées d'abord, puis les
+      sous-sections de chaque partie sont développées par des appels LLM
+      courts et parallèles ; une partie invalide est régénérée seule.
+    - `constrained` : le schéma JSON de `PlannedThesisOutlineForLLM` est passé au
+      `format` structuré d'Ollama ; en cas d'échec, le JSON est réparé
+      localement et seules les sections invalides sont redemandées au LLM.
+
+    Si `settings.outline_cache_enabled` est actif (ou qu'un `outline_cache` est
+    fourni), un plan déjà validé pour les mêmes directives, persona, exemple de
+    thèse et modèle est servi depuis le cache sans appel LLM.
+
+    Lorsque le thread possède déjà un plan complet produit pour ces mêmes
+    entrées (`thesis_outline_plan_key`), N3 le garde tel quel avec ses
+    brouillons : une reprise après mise à jour du journal ne re-rédige que les
+    sections invalidées par N4.
     """
 
     def __init__(
-        self, llm_model_name: str = "gemma3:12b-it-q4_K_M", temperature: float = 0.05
+        self,
+        llm_model_name: str = "gemma3:12b-it-q4_K_M",
+        temperature: float = 0.05,
+        planner_mode: str | None = None,
+        outline_cache: OutlineCache | None = None,
     ):
-        """Initialise le nœud avec le modèle LLM et la température."""
+        """Initialise le nœud avec le modèle LLM, la température et le mode."""
         self.llm_model_name = llm_model_name
+        self.outline_cache = outline_cache or (
+            OutlineCache() if settings.outline_cache_enabled else None
+        )
         self.temperature = temperature
+        self.planner_mode = planner_mode or settings.n3_planner_mode
+        self.expansion_concurrency = max(1, settings.n3_expansion_concurrency)
+        self.part_max_attempts = max(1, settings.n3_part_max_attempts)
+        self.section_repair_attempts = max(1, settings.n3_section_repair_attempts)
+        if self.planner_mode not in N3_PLANNER_MODES:
+            logger.warning(
+                "N3: Mode de planification inconnu '%s'. Utilisation de 'single_pass'.",
+                self.planner_mode,
+            )
+            self.planner_mode = "single_pass"
         self.llm: ChatOllama | None = None
         self.structured_llm: Any | None = None
         self.use_fallback_parser: bool = False
 
         try:
-            self.llm = ChatOllama(
-                model=self.llm_model_name, temperature=self.temperature, format="json"
+            self.llm = with_chat_cassette(
+                ChatOllama(
+                    model=self.llm_model_name,
+                    temperature=self.temperature,
+                    format="json",
+                    base_url=settings.ollama_base_url,
+                )
             )
             # Tenter with_structured_output, mais se préparer au fallback
             self.structured_llm = self.llm.with_structured_output(
@@ -104,10 +172,13 @@ class N3ThesisOutlinePlannerNode:  # noqa: C901
             # S'assurer que self.llm est initialisé même si structured_llm échoue
             if self.llm is None:  # pragma: no cover
                 try:
-                    self.llm = ChatOllama(
-                        model=self.llm_model_name,
-                        temperature=self.temperature,
-                        format="json", # Demander explicitement du JSON au LLM
+                    self.llm = with_chat_cassette(
+                        ChatOllama(
+                            model=self.llm_model_name,
+                            temperature=self.temperature,
+                            format="json", # Demander explicitement du JSON au LLM
+                            base_url=settings.ollama_base_url,
+                        )
                     )
                     logger.info(
                         "N3: LLM for fallback initialized: %s", self.llm_model_name
@@ -191,6 +262,66 @@ class N3ThesisOutlinePlannerNode:  # noqa: C901
         # fmt: on
         return ChatPromptTemplate.from_template(prompt_template_str)
 
+    def _build_parts_prompt_template(self) -> ChatPromptTemplate:
+        """Construit le prompt de la phase 1 (parties de niveau 1 uniquement)."""
+        # fmt: off
+        prompt_str = (
+            "Vous êtes un assistant expert en ingénierie pédagogique et en structuration de mémoires académiques de niveau Master pour Epitech Digital School (titre RNCP 35284 \"Expert en management des systèmes d'information\").\n\n"
+            "**Persona de l'Étudiant :**\n{persona}\n\n"
+            "**Directives Scolaires Epitech (Structurées) :**\n{guidelines_str}\n\n"
+            "**Exemple de Mémoire de Référence (\"Mémoire de Mission Professionnelle – Digi5\") - modèle pour l'ordre et la nomenclature des grandes parties :**\n"
+            "--- DÉBUT EXEMPLE DE MÉMOIRE ---\n{example_thesis_str}\n"
+            "--- FIN EXEMPLE DE MÉMOIRE ---\n\n"
+            "**Votre Tâche (Phase 1 - Grandes Parties Uniquement) :**\n"
+            "Produisez UNIQUEMENT les parties de premier niveau (`level` = 1) du plan : sections préliminaires, introduction générale, chapitres du corps du mémoire, conclusion générale et sections finales. "
+            "NE générez AUCUNE sous-section : chaque partie sera détaillée dans une seconde phase.\n"
+            "Chaque partie est un objet `PlannedSectionDetailForLLM` : `id` (avec point final, ex: \"1.\"), `title`, `level` (= 1), `description_objectives`, `original_requirements_summary`, `student_experience_keywords` (5-10 termes concrets pour la recherche RAG dans le journal), `example_phrasing_or_content_type`, `key_questions_to_answer`.\n\n"
+            "Votre unique sortie doit être un **objet JSON unique et valide** avec une **SEULE clé racine nommée `outline`** contenant la liste ordonnée de ces parties."
+        )
+        # fmt: on
+        return ChatPromptTemplate.from_template(prompt_str)
+
+    def _build_part_expansion_prompt_template(self) -> ChatPromptTemplate:
+        """Construit le prompt de la phase 2 (sous-sections d'une partie)."""
+        # fmt: off
+        prompt_str = (
+            "Vous êtes un assistant expert en structuration de mémoires académiques de niveau Master pour Epitech Digital School (titre RNCP 35284).\n\n"
+            "**Persona de l'Étudiant :**\n{persona}\n\n"
+            "**Directives Scolaires Epitech (Structurées) :**\n{guidelines_str}\n\n"
+            "**Plan Global (grandes parties déjà validées) :**\n{parts_overview}\n\n"
+            "**Passages de l'Exemple Digi5 pour une Partie Équivalente (modèle de granularité et de nomenclature) :**\n{example_passages}\n\n"
+            "**Partie à Détailler :**\n"
+            "- id : {part_id}\n"
+            "- Titre : {part_title}\n"
+            "- Objectifs : {part_objectives}\n"
+            "- Exigences Epitech : {part_requirements}\n\n"
+            "**Votre Tâche (Phase 2 - Sous-sections de la partie {part_id}) :**\n"
+            "Générez UNIQUEMENT les sous-sections de cette partie (`level` 2, et 3 si la granularité de l'exemple Digi5 l'exige), dans l'ordre de lecture. "
+            "Chaque `id` DOIT commencer par \"{part_id}\" et se terminer par un point (ex: \"{part_id}1.\", \"{part_id}1.1.\"). "
+            "Ne répétez pas la partie elle-même. Chaque objet respecte le schéma `PlannedSectionDetailForLLM`, avec des `student_experience_keywords` extrêmement spécifiques et directement exploitables pour une recherche RAG dans le journal de l'étudiant.\n"
+            "Si cette partie ne nécessite aucune sous-section (ex: Remerciements, Bibliographie), renvoyez une liste vide.\n\n"
+            "Votre unique sortie doit être un **objet JSON unique et valide** avec une **SEULE clé racine nommée `outline`**."
+        )
+        # fmt: on
+        return ChatPromptTemplate.from_template(prompt_str)
+
+    def _build_section_repair_prompt_template(self) -> ChatPromptTemplate:
+        """Construit le prompt de régénération d'une seule section invalide."""
+        # fmt: off
+        prompt_str = (
+            "Vous êtes un assistant expert en structuration de mémoires académiques Epitech (titre RNCP 35284).\n"
+            "Une section d'un plan de thèse généré précédemment ne respecte pas le schéma `PlannedSectionDetailForLLM`. "
+            "Corrigez UNIQUEMENT cette section, sans modifier le reste du plan.\n\n"
+            "**Persona de l'Étudiant :**\n{persona}\n\n"
+            "**Position dans le plan :**\n- Section précédente : {previous_section}\n- Section suivante : {next_section}\n\n"
+            "**Objet invalide :**\n{invalid_section_json}\n\n"
+            "**Erreur de validation :**\n{validation_error}\n\n"
+            "Votre unique sortie doit être un **objet JSON unique et valide** représentant cette section, avec tous les champs requis : "
+            "`id` (avec point final), `title`, `level`, `description_objectives`, `original_requirements_summary`, `student_experience_keywords`, `example_phrasing_or_content_type`, `key_questions_to_answer`."
+        )
+        # fmt: on
+        return ChatPromptTemplate.from_template(prompt_str)
+
     def _create_error_section(
         self, id_prefix: str, title_str: str, detail: str
     ) -> SectionDetail:
@@ -207,6 +338,399 @@ class N3ThesisOutlinePlannerNode:  # noqa: C901
             status=SectionStatus.ERROR,
         )
 
+    def _format_guidelines(self, state: AgentState) -> str:
+        """Formate les directives structurées pour les prompts de planification."""
+        guidelines_str_formatted = ""
+        if state.school_guidelines_structured:
+            for title, points_list in state.school_guidelines_structured.items():
+                guidelines_str_formatted += f"\n**{title}**\n"
+                if points_list:
+                    for point in points_list:
+                        guidelines_str_formatted += f"  - {point}\n"
+                else:  # pragma: no cover
+                    guidelines_str_formatted += (
+                        "  - (Aucune sous-directive spécifiée)\n"
+                    )
+        else:  # pragma: no cover
+            guidelines_str_formatted = "Aucune directive scolaire structurée fournie.\n"
+        return guidelines_str_formatted
+
+    def _example_passages(self, state: AgentState, queries: list[str]) -> str | None:
+        """Passages de l'exemple indexé (T2) pertinents pour les requêtes."""
+        return retrieve_example_passages(
+            state.example_thesis_index_path,
+            state.example_thesis_index_version,
+            state.embedding_model_name,
+            queries,
+            k_per_query=settings.example_thesis_k_per_query,
+            max_passages=settings.example_thesis_max_passages,
+        )
+
+    def _example_thesis_text(self, state: AgentState) -> str:
+        """
+        Retourne l'exemple de thèse pour le prompt de planification.
+
+        Si l'exemple a été indexé par N2, seuls les passages pertinents pour
+        chaque catégorie de directives sont envoyés ; sinon le texte complet.
+        """
+        guideline_queries = [
+            f"{category}: {'; '.join(points[:3])}"
+            for category, points in (state.school_guidelines_structured or {}).items()
+        ]
+        example_passages = self._example_passages(state, guideline_queries)
+        if example_passages:
+            return example_passages
+        example_thesis_text = state.example_thesis_text_content
+        if not example_thesis_text:  # pragma: no cover
+            logger.warning("N3: Contenu de l'exemple de thèse manquant. Placeholder.")
+            example_thesis_text = "Intro, Chapitres, Conclusion."
+        return example_thesis_text
+
+    def _build_prompt_input(self, state: AgentState) -> str:
+        """Formate le prompt de planification à partir de l'état."""
+        return self._build_prompt_template_str().format(
+            guidelines_str=self._format_guidelines(state),
+            persona=state.user_persona,
+            example_thesis_str=self._example_thesis_text(state),
+        )
+
+    def _parse_outline_json(self, raw_json: str) -> PlannedThesisOutlineForLLM:
+        """
+        Parse la sortie JSON brute du LLM en `PlannedThesisOutlineForLLM`.
+
+        Corrige la clé racine `planned_thesis_outline` en `outline` si besoin.
+        Lève `PydanticV1ValidationError` si la sortie reste invalide.
+        """
+        # Tentative de correction du JSON si la clé racine est 'planned_thesis_outline'
+        corrected_json_str = raw_json
+        try:
+            parsed_candidate = json.loads(raw_json)
+            if (
+                isinstance(parsed_candidate, dict)
+                and "planned_thesis_outline" in parsed_candidate
+                and "outline" not in parsed_candidate
+            ):
+                logger.warning(
+                    "N3: Tentative de correction de la clé racine du JSON de "
+                    "'planned_thesis_outline' vers 'outline'."
+                )
+                parsed_candidate["outline"] = parsed_candidate.pop(
+                    "planned_thesis_outline"
+                )
+                corrected_json_str = json.dumps(parsed_candidate)
+        except json.JSONDecodeError:
+            logger.error(
+                "N3: Le JSON brut du LLM n'est pas un JSON valide et ne peut être "
+                "corrigé."
+            )
+            # L'erreur Pydantic sera levée par parse_raw ci-dessous
+
+        try:
+            return PlannedThesisOutlineForLLM.parse_raw(corrected_json_str)
+        except PydanticV1ValidationError as ve_fallback:
+            logger.error("N3 FALLBACK PARSING FAILED: %s", ve_fallback)
+            logger.error(
+                "N3 JSON that failed parsing (après correction éventuelle):\n%s",
+                corrected_json_str,
+            )
+            raise
+
+    def _to_section_detail(
+        self, llm_s_detail: PlannedSectionDetailForLLM
+    ) -> SectionDetail:
+        """Convertit une section planifiée par le LLM en SectionDetail PENDING."""
+        return SectionDetail(
+            id=llm_s_detail.id,
+            title=llm_s_detail.title,
+            level=llm_s_detail.level,
+            description_objectives=llm_s_detail.description_objectives,
+            original_requirements_summary=llm_s_detail.original_requirements_summary,
+            student_experience_keywords=llm_s_detail.student_experience_keywords,
+            example_phrasing_or_content_type=(
+                llm_s_detail.example_phrasing_or_content_type
+            ),
+            key_questions_to_answer=llm_s_detail.key_questions_to_answer,
+            status=SectionStatus.PENDING,
+        )
+
+    def stream_sections(
+        self,
+        state: AgentState,
+        prompt_input_for_llm: str | None = None,
+        dropped_sections: list[str] | None = None,
+    ) -> Iterator[SectionDetail]:
+        """
+        Génère le plan en streaming et produit chaque section dès qu'elle est close.
+
+        Le flux `llm.stream` est analysé par un parser JSON incrémental : chaque
+        objet `PlannedSectionDetailForLLM` du tableau `outline` est validé et
+        converti en `SectionDetail` dès que son accolade fermante arrive, ce qui
+        permet à l'appelant de lancer N5/N6 sur les premières sections pendant
+        que le LLM génère les suivantes. Un objet invalide est ignoré (loggé)
+        sans interrompre le flux ; il est ajouté à `dropped_sections` si la
+        liste est fournie, pour que l'appelant sache que le plan est incomplet.
+        """
+        if not self.llm:  # pragma: no cover
+            raise RuntimeError("N3: Instance LLM non disponible pour le streaming.")
+
+        if prompt_input_for_llm is None:
+            prompt_input_for_llm = self._build_prompt_input(state)
+        logger.info(
+            "N3: Planification en streaming avec le LLM '%s'...", self.llm_model_name
+        )
+        content_chunks = (
+            chunk.content if hasattr(chunk, "content") else str(chunk)
+            for chunk in self.llm.stream(prompt_input_for_llm)
+        )
+        for index, raw_object in enumerate(iter_stream_objects(content_chunks)):
+            try:
+                planned_section = PlannedSectionDetailForLLM.parse_raw(raw_object)
+            except (PydanticV1ValidationError, json.JSONDecodeError) as e:
+                logger.warning(
+                    "N3: Section streamée invalide ignorée: %s. JSON: %s",
+                    e,
+                    raw_object[:300],
+                )
+                if dropped_sections is not None:
+                    dropped_sections.append(_raw_section_id(raw_object) or str(index))
+                continue
+            logger.info(
+                "N3: Section streamée prête: %s %s",
+                planned_section.id,
+                planned_section.title,
+            )
+            yield self._to_section_detail(planned_section)
+
+    def _expand_part(
+        self,
+        part: PlannedSectionDetailForLLM,
+        base_values: dict[str, Any],
+        example_passages: str | None = None,
+    ) -> list[PlannedSectionDetailForLLM]:
+        """
+        Développe les sous-sections d'une partie, avec régénération ciblée.
+
+        Seule cette partie est redemandée au LLM en cas d'échec de parsing.
+        Lève la dernière erreur si toutes les tentatives échouent.
+        """
+        prompt_input = self._build_part_expansion_prompt_template().format(
+            **base_values,
+            part_id=part.id,
+            part_title=part.title,
+            part_objectives=part.description_objectives,
+            part_requirements=part.original_requirements_summary,
+            example_passages=example_passages
+            or "(Aucun passage d'exemple spécifique à cette partie.)",
+        )
+        last_error: Exception | None = None
+        for attempt in range(1, self.part_max_attempts + 1):
+            try:
+                llm_response: AIMessage = self.llm.invoke(prompt_input)
+                outline = self._parse_outline_json(llm_response.content).outline
+                subsections = [s for s in outline if s.id != part.id]
+                misplaced_ids = [
+                    s.id for s in subsections if not s.id.startswith(part.id)
+                ]
+                if misplaced_ids:
+                    logger.warning(
+                        "N3: Sous-sections hors de la partie %s: %s",
+                        part.id,
+                        misplaced_ids,
+                    )
+                logger.info(
+                    "N3: Partie %s développée (%d sous-sections, tentative %d).",
+                    part.id,
+                    len(subsections),
+                    attempt,
+                )
+                return subsections
+            except Exception as e:  # noqa: BLE001
+                last_error = e
+                logger.warning(
+                    "N3: Échec du développement de la partie %s (tentative %d/%d): %s",
+                    part.id,
+                    attempt,
+                    self.part_max_attempts,
+                    e,
+                )
+        raise last_error  # type: ignore[misc]
+
+    def _generate_two_phase_outline(
+        self, state: AgentState
+    ) -> tuple[list[PlannedSectionDetailForLLM], list[str]]:
+        """
+        Génère le plan en deux phases : parties puis sous-sections en parallèle.
+
+        Returns:
+            La liste ordonnée des sections planifiées et la liste des ids de
+            parties dont le développement a échoué (conservées sans sous-sections).
+        """
+        base_values = {
+            "persona": state.user_persona,
+            "guidelines_str": self._format_guidelines(state),
+        }
+        parts_prompt = self._build_parts_prompt_template().format(
+            **base_values, example_thesis_str=self._example_thesis_text(state)
+        )
+        logger.info("N3: Phase 1 - génération des parties de niveau 1...")
+        parts_response: AIMessage = self.llm.invoke(parts_prompt)
+        parts = [
+            part
+            for part in self._parse_outline_json(parts_response.content).outline
+            if part.level == 1
+        ]
+        if not parts:
+            raise ValueError("La phase 1 n'a produit aucune partie de niveau 1.")
+
+        base_values["parts_overview"] = "\n".join(
+            f"- {part.id} {part.title}" for part in parts
+        )
+        logger.info(
+            "N3: Phase 2 - développement de %d parties (concurrence: %d)...",
+            len(parts),
+            self.expansion_concurrency,
+        )
+
+        def _safe_expand(part: PlannedSectionDetailForLLM):
+            try:
+                example_passages = self._example_passages(
+                    state, [f"{part.title}. {part.description_objectives}"]
+                )
+                return self._expand_part(part, base_values, example_passages), None
+            except Exception as e:  # noqa: BLE001
+                logger.error(
+                    "N3: Partie %s conservée sans sous-sections: %s", part.id, e
+                )
+                return [], part.id
+
+        # Une copie du contexte par partie : les threads du pool n'héritent
+        # pas des ContextVar (handler de tracing des appels LLM, etc.)
+        contexts = [contextvars.copy_context() for _ in parts]
+        with ThreadPoolExecutor(
+            max_workers=min(self.expansion_concurrency, len(parts)),
+            thread_name_prefix="n3-expand",
+        ) as executor:
+            expansions = list(
+                executor.map(
+                    lambda context, part: context.run(_safe_expand, part),
+                    contexts,
+                    parts,
+                )
+            )
+
+        planned_sections: list[PlannedSectionDetailForLLM] = []
+        failed_part_ids: list[str] = []
+        for part, (subsections, failed_id) in zip(parts, expansions, strict=True):
+            planned_sections.append(part)
+            planned_sections.extend(subsections)
+            if failed_id:
+                failed_part_ids.append(failed_id)
+        return planned_sections, failed_part_ids
+
+    def _repair_section(
+        self,
+        state: AgentState,
+        items: list[Any],
+        index: int,
+        validation_error: Exception,
+    ) -> PlannedSectionDetailForLLM | None:
+        """Redemande au LLM une seule section invalide, sous contrainte de schéma."""
+
+        def _describe(neighbour_index: int) -> str:
+            if 0 <= neighbour_index < len(items) and isinstance(
+                items[neighbour_index], dict
+            ):
+                neighbour = items[neighbour_index]
+                return f"{neighbour.get('id', '?')} {neighbour.get('title', '')}"
+            return "(aucune)"
+
+        prompt_input = self._build_section_repair_prompt_template().format(
+            persona=state.user_persona,
+            previous_section=_describe(index - 1),
+            next_section=_describe(index + 1),
+            invalid_section_json=json.dumps(items[index], ensure_ascii=False),
+            validation_error=str(validation_error),
+        )
+        section_schema = inline_json_schema_refs(PlannedSectionDetailForLLM.schema())
+        for attempt in range(1, self.section_repair_attempts + 1):
+            try:
+                llm_response: AIMessage = self.llm.invoke(
+                    prompt_input, format=section_schema
+                )
+                repaired = PlannedSectionDetailForLLM.parse_obj(
+                    loads_lenient(llm_response.content)
+                )
+                logger.info(
+                    "N3: Section %d régénérée seule (tentative %d).", index, attempt
+                )
+                return repaired
+            except Exception as e:  # noqa: BLE001
+                logger.warning(
+                    "N3: Régénération de la section %d échouée (tentative %d/%d): %s",
+                    index,
+                    attempt,
+                    self.section_repair_attempts,
+                    e,
+                )
+        return None
+
+    def _generate_constrained_outline(
+        self, state: AgentState, prompt_input_for_llm: str
+    ) -> tuple[list[PlannedSectionDetailForLLM], list[str], str]:
+        """
+        Génère le plan avec décodage contraint par le schéma JSON du plan.
+
+        La sortie est d'abord réparée localement (`loads_lenient`) puis validée
+        section par section ; seules les sections invalides sont régénérées.
+
+        Returns:
+            Les sections valides, les ids (ou index) des sections abandonnées,
+            et la sortie brute du LLM pour le débogage.
+        """
+        outline_schema = inline_json_schema_refs(PlannedThesisOutlineForLLM.schema())
+        llm_response: AIMessage = self.llm.invoke(
+            prompt_input_for_llm, format=outline_schema
+        )
+        raw_output = llm_response.content
+        payload = loads_lenient(raw_output)
+        if isinstance(payload, dict):
+            items = next(
+                (payload[key] for key in OUTLINE_ROOT_KEYS if key in payload), None
+            )
+        else:
+            items = payload
+        if not isinstance(items, list):
+            raise ValueError("La sortie contrainte ne contient pas de liste `outline`.")
+
+        planned_sections: list[PlannedSectionDetailForLLM] = []
+        dropped_sections: list[str] = []
+        for index, item in enumerate(items):
+            try:
+                planned_sections.append(PlannedSectionDetailForLLM.parse_obj(item))
+                continue
+            except PydanticV1ValidationError as ve:
+                logger.warning("N3: Section %d invalide: %s", index, ve)
+                repaired = self._repair_section(state, items, index, ve)
+            if repaired is not None:
+                planned_sections.append(repaired)
+            else:
+                item_id = item.get("id") if isinstance(item, dict) else None
+                dropped_sections.append(str(item_id or index))
+        return planned_sections, dropped_sections, raw_output
+
+    def _with_length_budget(
+        self, state: AgentState, outline: list[SectionDetail]
+    ) -> list[SectionDetail]:
+        """Répartit `min_pages` (N1) en budgets de longueur par section."""
+        if not settings.length_budget_enabled:
+            return outline
+        return allocate_length_budget(
+            outline,
+            (state.school_guidelines_formatting or {}).get("min_pages"),
+            settings.words_per_page,
+            settings.length_budget_headroom,
+        )
+
     def run(self, state: AgentState) -> dict[str, Any]:  # noqa: C901
         """Exécute la génération du plan de thèse."""
         logger.info("N3: Génération du plan de thèse...")
@@ -221,33 +745,45 @@ class N3ThesisOutlinePlannerNode:  # noqa: C901
                 self._create_error_section("input", "Input Error", msg)
             )
             updated_fields["thesis_outline"] = final_thesis_outline
+            updated_fields["thesis_outline_plan_key"] = None
             updated_fields["last_successful_node"] = state.last_successful_node
             return updated_fields
 
-        example_thesis_text = state.example_thesis_text_content
-        if not example_thesis_text:  # pragma: no cover
-            logger.warning("N3: Contenu de l'exemple de thèse manquant. Placeholder.")
-            example_thesis_text = "Intro, Chapitres, Conclusion."
-
-        guidelines_str_formatted = ""
-        if state.school_guidelines_structured:
-            for title, points_list in state.school_guidelines_structured.items():
-                guidelines_str_formatted += f"\n**{title}**\n"
-                if points_list:
-                    for point in points_list:
-                        guidelines_str_formatted += f"  - {point}\n"
-                else:  # pragma: no cover
-                    guidelines_str_formatted += (
-                        "  - (Aucune sous-directive spécifiée)\n"
-                    )
-        else:  # pragma: no cover
-            guidelines_str_formatted = "Aucune directive scolaire structurée fournie.\n"
-
-        prompt_input_for_llm = self._build_prompt_template_str().format(
-            guidelines_str=guidelines_str_formatted,
-            persona=state.user_persona,
-            example_thesis_str=example_thesis_text,
+        plan_key = OutlineCache.make_key(
+            state.school_guidelines_structured,
+            state.user_persona,
+            state.example_thesis_text_content,
+            self.llm_model_name,
         )
+        if state.thesis_outline and state.thesis_outline_plan_key == plan_key:
+            msg = (
+                "Entrées de planification inchangées : plan existant conservé "
+                f"({len(state.thesis_outline)} sections)."
+            )
+            logger.info("N3: %s", msg)
+            updated_fields["current_operation_message"] = msg
+            updated_fields["last_successful_node"] = "N3ThesisOutlinePlannerNode"
+            return updated_fields
+        # Remplacé par la clé des entrées une fois un plan complet produit
+        updated_fields["thesis_outline_plan_key"] = None
+
+        if self.outline_cache is not None:
+            cached_outline = self.outline_cache.get(plan_key)
+            if cached_outline:
+                msg = (
+                    f"Plan de thèse servi depuis le cache "
+                    f"({len(cached_outline)} sections)."
+                )
+                logger.info("N3: %s", msg)
+                updated_fields["thesis_outline"] = self._with_length_budget(
+                    state, cached_outline
+                )
+                updated_fields["thesis_outline_plan_key"] = plan_key
+                updated_fields["current_operation_message"] = msg
+                updated_fields["last_successful_node"] = "N3ThesisOutlinePlannerNode"
+                return updated_fields
+
+        prompt_input_for_llm = self._build_prompt_input(state)
 
         if not self.llm:  # pragma: no cover
             msg = "N3 Erreur Critique: Instance LLM non disponible (échec __init__)."
@@ -267,7 +803,39 @@ class N3ThesisOutlinePlannerNode:  # noqa: C901
                 "N3: Invocation du LLM '%s' pour la planification...",
                 self.llm_model_name,
             )
-            if not self.use_fallback_parser and self.structured_llm: # pragma: no cover (car on sait qu'il échoue)
+            if self.planner_mode == "streaming":
+                dropped_sections: list[str] = []
+                final_thesis_outline.extend(
+                    self.stream_sections(state, prompt_input_for_llm, dropped_sections)
+                )
+                if not final_thesis_outline:
+                    raise ValueError("Aucune section valide n'a été reçue du flux LLM.")
+                if dropped_sections:
+                    updated_fields["error_details"] = (
+                        "N3: Sections streamées invalides ignorées: "
+                        f"{dropped_sections}"
+                    )
+            elif self.planner_mode == "two_phase":
+                planned_sections_from_llm, failed_part_ids = (
+                    self._generate_two_phase_outline(state)
+                )
+                if failed_part_ids:
+                    updated_fields["error_details"] = (
+                        "N3: Parties non développées après "
+                        f"{self.part_max_attempts} tentatives: {failed_part_ids}"
+                    )
+            elif self.planner_mode == "constrained":
+                (
+                    planned_sections_from_llm,
+                    dropped_sections,
+                    raw_json_output_for_debug,
+                ) = self._generate_constrained_outline(state, prompt_input_for_llm)
+                if dropped_sections:
+                    updated_fields["error_details"] = (
+                        "N3: Sections abandonnées après régénération ciblée: "
+                        f"{dropped_sections}"
+                    )
+            elif not self.use_fallback_parser and self.structured_llm: # pragma: no cover (car on sait qu'il échoue)
                 logger.info("N3: Utilisant self.structured_llm.invoke()")
                 response_llm_obj: PlannedThesisOutlineForLLM = (
                     self.structured_llm.invoke(prompt_input_for_llm)
@@ -284,55 +852,37 @@ class N3ThesisOutlinePlannerNode:  # noqa: C901
                 raw_json_output_for_debug = llm_response.content
                 logger.info("N3 RAW LLM OUTPUT (FALLBACK):\n%s", raw_json_output_for_debug)
                 
-                # Tentative de correction du JSON si la clé racine est 'planned_thesis_outline'
-                corrected_json_str = raw_json_output_for_debug
-                try:
-                    parsed_candidate = json.loads(raw_json_output_for_debug)
-                    if "planned_thesis_outline" in parsed_candidate and "outline" not in parsed_candidate:
-                        logger.warning("N3: Tentative de correction de la clé racine du JSON de 'planned_thesis_outline' vers 'outline'.")
-                        parsed_candidate["outline"] = parsed_candidate.pop("planned_thesis_outline")
-                        corrected_json_str = json.dumps(parsed_candidate)
-                except json.JSONDecodeError:
-                    logger.error("N3: Le JSON brut du LLM n'est pas un JSON valide et ne peut être corrigé.")
-                    # L'erreur Pydantic sera levée par parse_raw ci-dessous
-
-                try:
-                    response_object = PlannedThesisOutlineForLLM.parse_raw(
-                        corrected_json_str # Utiliser la chaîne potentiellement corrigée
-                    )
-                    logger.info("N3: Fallback parsing successful.")
-                except PydanticV1ValidationError as ve_fallback: 
-                    logger.error("N3 FALLBACK PARSING FAILED: %s", ve_fallback)
-                    logger.error("N3 JSON that failed parsing (après correction éventuelle):\n%s", corrected_json_str)
-                    raise ve_fallback 
+                response_object = self._parse_outline_json(
+                    raw_json_output_for_debug
+                )
+                logger.info("N3: Fallback parsing successful.")
 
                 planned_sections_from_llm = response_object.outline
 
             for llm_s_detail in planned_sections_from_llm:
-                section_for_state = SectionDetail(
-                    id=llm_s_detail.id,
-                    title=llm_s_detail.title,
-                    level=llm_s_detail.level,
-                    description_objectives=llm_s_detail.description_objectives,
-                    original_requirements_summary=(
-                        llm_s_detail.original_requirements_summary
-                    ),
-                    student_experience_keywords=(
-                        llm_s_detail.student_experience_keywords
-                    ),
-                    example_phrasing_or_content_type=(
-                        llm_s_detail.example_phrasing_or_content_type
-                    ),
-                    key_questions_to_answer=llm_s_detail.key_questions_to_answer,
-                    status=SectionStatus.PENDING,
-                )
-                final_thesis_outline.append(section_for_state)
+                final_thesis_outline.append(self._to_section_detail(llm_s_detail))
 
-            updated_fields["thesis_outline"] = final_thesis_outline
+            updated_fields["thesis_outline"] = self._with_length_budget(
+                state, final_thesis_outline
+            )
             msg = f"Plan de thèse généré ({len(final_thesis_outline)} sections)."
             updated_fields["current_operation_message"] = msg
             logger.info("N3: %s", msg)
 
+            # Seuls les plans complets (sans partie/section abandonnée) sont
+            # cachés, et conservés par les exécutions suivantes du thread.
+            if not updated_fields.get("error_details"):
+                updated_fields["thesis_outline_plan_key"] = plan_key
+                if self.outline_cache is not None:
+                    self.outline_cache.put(
+                        plan_key,
+                        final_thesis_outline,
+                        metadata={
+                            "llm_model_name": self.llm_model_name,
+                            "planner_mode": self.planner_mode,
+                        },
+                    )
+
         except PydanticV1ValidationError as ve: 
             error_detail_msg_parts = [
                 f"N3 Erreur Pydantic: {ve}.",
@@ -2,6 +2,11 @@
 import logging
 from typing import Any
 
+from src.config import settings
+from src.feedback_terms import extract_new_search_terms
+from src.invalidation import invalidate_stale_sections
+from src.run_config import thread_id_from_config
+from src.speculative_drafting import SpeculativeDraftStore, speculative_fingerprint
 from src.state import AgentState, SectionStatus
 
 logger = logging.getLogger(__name__)
@@ -11,23 +16,90 @@ class N4SectionProcessorRouter:
     """
     Nœud de routage pour déterminer la prochaine étape dans le traitement des sections
     de la thèse.
+
+    Si un `speculative_store` est fourni, une section PENDING déjà pré-rédigée
+    pendant la revue humaine (voir `SpeculativeDrafter`) est promue telle quelle
+    au lieu d'être re-traitée par N5/N6.
     """
 
-    def run(self, state: AgentState) -> dict[str, Any]:
+    def __init__(self, speculative_store: SpeculativeDraftStore | None = None):
+        """Initialise le routeur, avec éventuellement le stockage spéculatif."""
+        self.speculative_store = speculative_store
+
+    def _promote_speculative_draft(
+        self,
+        state: AgentState,
+        section_index: int,
+        thread_id: str | None,
+        updated_fields: dict[str, Any],
+    ) -> bool:
+        """Promeut le brouillon spéculatif encore valide d'une section PENDING."""
+        if self.speculative_store is None or thread_id is None:
+            return False
+        section = state.thesis_outline[section_index]
+        promoted = self.speculative_store.pop(
+            thread_id, section.id, speculative_fingerprint(state, section)
+        )
+        if promoted is None:
+            return False
+        new_thesis_outline = list(state.thesis_outline)
+        new_thesis_outline[section_index] = promoted
+        updated_fields["thesis_outline"] = new_thesis_outline
+        # Brouillon déjà critiqué par N7 : directement en revue humaine.
+        updated_fields["next_node_override"] = (
+            "N8_HumanReviewHITLNode"
+            if promoted.reflection_stop_reason
+            else "N7_SelfCritiqueNode"
+        )
+        logger.info(
+            "N4: Section '%s' (ID: %s) promoted from speculative draft. Routing to %s.",
+            section.title,
+            section.id,
+            updated_fields["next_node_override"],
+        )
+        return True
+
+    def _invalidate_stale_sections(
+        self, state: AgentState, updated_fields: dict[str, Any]
+    ) -> AgentState:
+        """Remet à PENDING les sections obsolètes ; retourne l'état à router."""
+        if not settings.invalidation_enabled:
+            return state
+        new_thesis_outline, invalidated = invalidate_stale_sections(state)
+        if not invalidated:
+            return state
+        logger.info(
+            "N4: %d section(s) invalidated by upstream changes: %s",
+            len(invalidated),
+            ", ".join(invalidated),
+        )
+        updated_fields["thesis_outline"] = new_thesis_outline
+        return state.copy(update={"thesis_outline": new_thesis_outline})
+
+    def run(
+        self, state: AgentState, config: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
         """
         Évalue l'état actuel de `thesis_outline` et détermine le prochain nœud.
 
         Logique de routage :
-        1. Si la section courante a une demande de modification (feedback humain),
-           route vers N5 pour re-traiter cette section.
+        1. Si la section courante (ou, en revue groupée, une autre section) a une
+           demande de modification (feedback humain), route vers N5 si le retour
+           apporte de nouveaux termes de recherche (ou si aucun contexte n'a
+           encore été récupéré), sinon directement vers N6 qui réutilise le
+           contexte déjà récupéré.
         2. Sinon, cherche la prochaine section avec le statut PENDING à partir de
-           l'index de routage actuel.
+           l'index de routage actuel. Une section déjà pré-rédigée de manière
+           spéculative est promue et routée vers N7 (ou N8 si déjà critiquée).
         3. Si aucune section PENDING n'est trouvée après l'index actuel, cherche
            une section PENDING depuis le début de la liste (au cas où une section
            antérieure serait repassée à PENDING).
         4. Si toutes les sections sont dans un état final (approuvé, erreur, skippé),
            route vers la gestion de la bibliographie (N9).
         5. Gère les cas d'erreur (outline vide, états inconsistants).
+
+        Au préalable, les sections dont les entrées ont changé depuis leur
+        rédaction (`SectionDetail.input_fingerprints`) sont remises à PENDING.
         """
         logger.info("N4: Section Processor Router evaluating next step...")
         updated_fields: dict[str, Any] = {
@@ -41,9 +113,11 @@ class N4SectionProcessorRouter:
             updated_fields["next_node_override"] = "ERROR_HANDLER"
             return updated_fields
 
+        state = self._invalidate_stale_sections(state, updated_fields)
         start_index = state.current_section_index_for_router
         num_sections = len(state.thesis_outline)
 
+        modification_index: int | None = None
         if (
             0 <= start_index < num_sections
             and state.thesis_outline[start_index].human_review_feedback
@@ -51,16 +125,48 @@ class N4SectionProcessorRouter:
                 start_index
             ].human_review_feedback.modification_requested
         ):
-            current_section = state.thesis_outline[start_index]
+            modification_index = start_index
+        else:
+            # Revue groupée (N8) : d'autres sections peuvent attendre une modification.
+            modification_index = next(
+                (
+                    i
+                    for i, s in enumerate(state.thesis_outline)
+                    if s.status == SectionStatus.MODIFICATION_REQUESTED
+                    and s.human_review_feedback
+                    and s.human_review_feedback.modification_requested
+                ),
+                None,
+            )
+
+        if modification_index is not None:
+            current_section = state.thesis_outline[modification_index]
+            new_terms = extract_new_search_terms(
+                current_section.human_review_feedback.feedback_text, current_section
+            )
+            has_cached_context = bool(
+                current_section.retrieved_journal_excerpts
+                or current_section.anonymized_context_for_llm
+            )
+            next_node = (
+                "N5_ContextRetrievalNode"
+                if new_terms or not has_cached_context
+                else "N6_SectionDraftingNode"
+            )
             logger.info(
                 "N4: Section '%s' (ID: %s) requires modification. "
-                "Routing to context retrieval.",
+                "Routing to %s (new search terms: %s).",
                 current_section.title,
                 current_section.id,
+                next_node,
+                new_terms,
             )
+            new_thesis_outline = [s.copy(deep=True) for s in state.thesis_outline]
+            new_thesis_outline[modification_index].feedback_search_terms = new_terms
+            updated_fields["thesis_outline"] = new_thesis_outline
             updated_fields["current_section_id"] = current_section.id
-            updated_fields["current_section_index"] = start_index
-            updated_fields["next_node_override"] = "N5_ContextRetrievalNode"
+            updated_fields["current_section_index"] = modification_index
+            updated_fields["next_node_override"] = next_node
             return updated_fields
 
         for i in range(start_index, num_sections):
@@ -75,11 +181,12 @@ class N4SectionProcessorRouter:
                 updated_fields["current_section_id"] = section.id
                 updated_fields["current_section_index"] = i
                 updated_fields["next_node_override"] = "N5_ContextRetrievalNode"
+                self._promote_speculative_draft(
+                    state, i, thread_id_from_config(config), updated_fields
+                )
                 return updated_fields
 
-        for i in range(
-            start_index
-        ):  # pragma: no cover (ce chemin est logique mais pas couvert par tests actuels)
+        for i in range(start_index):
             section = state.thesis_outline[i]
             if section.status == SectionStatus.PENDING:
                 logger.info(
@@ -92,6 +199,9 @@ class N4SectionProcessorRouter:
                 updated_fields["current_section_index"] = i
                 updated_fields["current_section_index_for_router"] = i
                 updated_fields["next_node_override"] = "N5_ContextRetrievalNode"
+                self._promote_speculative_draft(
+                    state, i, thread_id_from_config(config), updated_fields
+                )
                 return updated_fields
 
         all_sections_processed_or_error = all(
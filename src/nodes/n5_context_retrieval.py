@@ -3,6 +3,7 @@ import logging
 from typing import Any
 
 from src.config import settings
+from src.context_packing import format_packed_context, pack_context
 from src.state import AgentState, SectionDetail, SectionStatus
 from src.tools.t1_journal_context_retriever import (
     JournalContextRetrieverArgs,
@@ -23,6 +24,24 @@ class N5ContextRetrievalNode:
             keywords
         )
 
+    def _merge_with_cached_excerpts(
+        self, cached_excerpts: list[dict[str, Any]], new_excerpts: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """Ajoute aux extraits déjà récupérés les nouveaux, sans doublons."""
+        merged = list(cached_excerpts)
+        known_ids = {
+            (e.get("metadata") or {}).get("chunk_id", e.get("text"))
+            for e in cached_excerpts
+        }
+        for excerpt in new_excerpts:
+            excerpt_id = (excerpt.get("metadata") or {}).get(
+                "chunk_id", excerpt.get("text")
+            )
+            if excerpt_id not in known_ids:
+                merged.append(excerpt)
+                known_ids.add(excerpt_id)
+        return merged
+
     def run(self, state: AgentState) -> dict[str, Any]:  # noqa: C901
         """
         Executes the context retrieval process for the current section.
@@ -83,7 +102,14 @@ class N5ContextRetrievalNode:
             f"Traitement de la section : {section_copy.title} (ID: {current_section_id})"
         )
 
-        keywords = section_copy.student_experience_keywords
+        # Après un retour humain apportant de nouveaux termes (voir N4), seuls ces
+        # termes sont recherchés ; les extraits déjà récupérés sont conservés.
+        feedback_terms = section_copy.feedback_search_terms
+        cached_excerpts = (
+            list(section_copy.retrieved_journal_excerpts) if feedback_terms else []
+        )
+        section_copy.feedback_search_terms = []
+        keywords = feedback_terms or section_copy.student_experience_keywords
 
         if not keywords:
             logger.warning(
@@ -113,12 +139,21 @@ class N5ContextRetrievalNode:
                     embedding_model_name=state.embedding_model_name,
                 )
                 k = settings.k_retrieval_count
+                if settings.context_packing_enabled:
+                    # On récupère plus large, la compaction resserre ensuite.
+                    k = min(10, max(k, settings.context_fetch_k))
                 tool_args = JournalContextRetrieverArgs(
                     query_or_keywords=query_str, k_retrieval_count=k
                 )
                 # CORRECTION ICI: Utiliser .dict() pour Pydantic V1
                 raw_excerpts = retriever_tool._run(**tool_args.dict())
-
+                if cached_excerpts and not any(
+                    isinstance(excerpt, dict) and "error" in excerpt
+                    for excerpt in raw_excerpts
+                ):
+                    raw_excerpts = self._merge_with_cached_excerpts(
+                        cached_excerpts, raw_excerpts
+                    )
 
                 if any(
                     isinstance(excerpt, dict) and "error" in excerpt
@@ -153,13 +188,23 @@ class N5ContextRetrievalNode:
                     section_copy.status = SectionStatus.CONTEXT_RETRIEVED
                 else:
                     section_copy.retrieved_journal_excerpts = raw_excerpts
-                    anonymized_context_for_llm = "\n\n---\n\n".join(
-                        [
-                            excerpt["text"]
-                            for excerpt in raw_excerpts
-                            if isinstance(excerpt, dict) and "text" in excerpt
-                        ]
-                    )
+                    if settings.context_packing_enabled:
+                        anonymized_context_for_llm = format_packed_context(
+                            pack_context(
+                                raw_excerpts,
+                                token_budget=settings.context_token_budget,
+                                score_cutoff=settings.context_score_cutoff,
+                                mmr_lambda=settings.context_mmr_lambda,
+                            )
+                        )
+                    else:
+                        anonymized_context_for_llm = "\n\n---\n\n".join(
+                            [
+                                excerpt["text"]
+                                for excerpt in raw_excerpts
+                                if isinstance(excerpt, dict) and "text" in excerpt
+                            ]
+                        )
                     section_copy.anonymized_context_for_llm = (
                         anonymized_context_for_llm
                     )
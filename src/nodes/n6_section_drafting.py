@@ -1,13 +1,24 @@
 # src/nodes/n6_section_drafting.py
 import logging
+import time
 import traceback
 from typing import Any
 
 from langchain_community.chat_models import ChatOllama
 from langchain_core.prompts import ChatPromptTemplate
 
+from src.cassette import with_chat_cassette
 from src.config import settings
-from src.state import AgentState, SectionDetail, SectionStatus
+from src.invalidation import section_input_fingerprints
+from src.length_budget import length_instruction, word_count
+from src.paragraph_revision import (
+    format_points,
+    join_paragraphs,
+    plan_paragraph_revisions,
+    split_paragraphs,
+)
+from src.state import AgentState, HumanReviewFeedback, SectionDetail, SectionStatus
+from src.tools.t2_example_thesis_retriever import retrieve_example_passages
 
 logger = logging.getLogger(__name__)
 
@@ -30,9 +41,12 @@ class N6SectionDraftingNode:
         self.llm: ChatOllama | None = None
 
         try:
-            self.llm = ChatOllama(
-                model=self.llm_model_name,
-                temperature=self.temperature,
+            self.llm = with_chat_cassette(
+                ChatOllama(
+                    model=self.llm_model_name,
+                    temperature=self.temperature,
+                    base_url=settings.ollama_base_url,
+                )
             )
             logger.info(
                 "N6SectionDraftingNode initialized with LLM: %s", self.llm_model_name
@@ -66,6 +80,10 @@ class N6SectionDraftingNode:
             "- Questions Fondamentales auxquelles cette Section DOIT Répondre : {section_key_questions}\n"
             "- Notes sur le Style/Type de Contenu Attendu (inspiré de l'exemple Digi5) : {section_style_notes}\n\n"
 
+            "**Passages de l'Exemple Digi5 pour une Section Équivalente (modèles de ton, de structure et d'intégration des expériences — à NE PAS recopier) :**\n"
+            "--- DÉBUT PASSAGES EXEMPLE ---\n{example_passages}\n"
+            "--- FIN PASSAGES EXEMPLE ---\n\n"
+
             "**Extraits Pertinents du Journal de Bord de l'Étudiant (anonymisés, fournis par N5 après recherche RAG basée sur les keywords de N3) :**\n"
             "Ces extraits sont la **matière première essentielle** de votre rédaction. Ils représentent les expériences vécues, les tâches accomplies, les outils utilisés, les défis rencontrés, et les réflexions personnelles de l'étudiant qui sont jugés pertinents pour CETTE section. Votre mission n'est PAS de les résumer ou de les paraphraser superficiellement. Vous devez les **analyser en profondeur, les interpréter, les connecter aux objectifs de la section, aux exigences Epitech, et aux compétences RNCP (si pertinent pour cette section), et les intégrer de manière fluide, analytique et judicieuse dans votre argumentation.**\n"
             "--- DÉBUT CONTEXTE JOURNAL ---\n{journal_context}\n"
@@ -83,7 +101,8 @@ class N6SectionDraftingNode:
             "5.  **Analyse, Réflexion et Justification :** Toute affirmation doit être étayée. Toute réflexion personnelle de l'étudiant (tirée du journal ou implicite) doit être présentée et analysée de manière professionnelle et distanciée. Justifiez vos analyses et conclusions.\n"
             "6.  **Structure, Cohérence et Fluidité :** Organisez le contenu en paragraphes logiques et bien articulés. Utilisez des phrases de transition claires pour assurer une lecture fluide et une argumentation progressive et facile à suivre. Chaque paragraphe doit développer une idée principale.\n"
             "7.  **Identification des Besoins de Citations Externes :** Si, pour étayer une affirmation, définir un concept théorique clé, ou contextualiser une pratique mentionnée dans le journal, une référence à une source externe (article académique, ouvrage de référence, standard industriel, etc.) est manifestement nécessaire et absente du contexte fourni, **indiquez-le très clairement et précisément dans le texte** en utilisant le format suivant : `[NÉCESSITE CITATION EXTERNE POUR : décrire précisément le concept, l'affirmation ou l'information à sourcer. Exemple : 'définition du framework Agile Scrum' ou 'statistiques sur l'adoption de l'IA dans le secteur foncier']`. Ne pas inventer de sources.\n"
-            "8.  **Longueur, Profondeur et Substance :** Rédigez un contenu substantiel, approfondi et approprié pour une section de mémoire de niveau Master. La qualité et la profondeur de l'analyse priment sur la quantité pure. Une sous-section typique peut faire plusieurs paragraphes consistants. Un chapitre peut s'étendre sur plusieurs pages. Assurez-vous de couvrir tous les aspects demandés pour la section.\n\n"
+            "8.  **Longueur, Profondeur et Substance :** Rédigez un contenu substantiel, approfondi et approprié pour une section de mémoire de niveau Master. La qualité et la profondeur de l'analyse priment sur la quantité pure. Une sous-section typique peut faire plusieurs paragraphes consistants. Un chapitre peut s'étendre sur plusieurs pages. Assurez-vous de couvrir tous les aspects demandés pour la section.\n"
+            "9.  **Longueur Cible :** {length_instruction}\n\n"
 
             "**Format de Sortie Attendu (Strict) :**\n"
             "Rédigez **UNIQUEMENT et DIRECTEMENT le texte du contenu de la section elle-même.**\n"
@@ -126,7 +145,8 @@ class N6SectionDraftingNode:
             "3.  Conservez les forces du brouillon précédent qui n'ont pas été critiquées.\n"
             "4.  Assurez-vous que la version révisée respecte **toutes les instructions de rédaction initiales** (ton, style, intégration du journal, anonymisation, réponse aux objectifs, signalement de citations, etc.) en plus des corrections demandées.\n"
             "5.  Si la critique suggère d'intégrer de nouvelles informations du journal (suite à `suggested_search_queries`), utilisez le `journal_context` (potentiellement actualisé) pour cela.\n"
-            "6.  Soyez particulièrement attentif à corriger les `identified_flaws`, à combler les `missing_information`, et à retirer le `superfluous_content`.\n\n"
+            "6.  Soyez particulièrement attentif à corriger les `identified_flaws`, à combler les `missing_information`, et à retirer le `superfluous_content`.\n"
+            "7.  **Longueur Cible :** {length_instruction}\n\n"
             "**Format de Sortie Attendu (Strict) :**\n"
             "Rédigez **UNIQUEMENT et DIRECTEMENT le texte du contenu de la section révisée.**\n"
             "Ne PAS inclure le titre de la section.\n"
@@ -136,6 +156,115 @@ class N6SectionDraftingNode:
         # fmt: on
         return ChatPromptTemplate.from_template(prompt_str)
 
+    def _build_feedback_revision_prompt_template(self) -> ChatPromptTemplate:
+        """
+        Builds the prompt template used to apply a human reviewer's feedback (N8).
+        """
+        # fmt: off
+        prompt_str = (
+            "Vous êtes un rédacteur académique expert chargé de **modifier** une section de mémoire professionnel Epitech selon le retour de l'étudiant-relecteur.\n\n"
+            "**Persona de l'Étudiant :**\n{persona}\n\n"
+            "**Section :** \"{section_title}\"\n"
+            "- Objectifs : {section_objectives}\n"
+            "- Exigences Epitech : {section_requirements_summary}\n\n"
+            "**Version Actuelle de la Section :**\n"
+            "--- DÉBUT VERSION ACTUELLE ---\n{previous_draft_content}\n"
+            "--- FIN VERSION ACTUELLE ---\n\n"
+            "**Retour du Relecteur (à appliquer intégralement) :**\n"
+            "--- DÉBUT RETOUR ---\n{feedback_text}\n"
+            "--- FIN RETOUR ---\n\n"
+            "**Contexte du Journal d'Apprentissage (anonymisé) :**\n"
+            "--- DÉBUT CONTEXTE JOURNAL ---\n{journal_context}\n"
+            "--- FIN CONTEXTE JOURNAL ---\n\n"
+            "**Consignes :** appliquez précisément le retour du relecteur, sans modifier ce qu'il ne demande pas de changer. Conservez le ton académique, l'anonymisation et les signalements `[NÉCESSITE CITATION EXTERNE POUR : ...]` existants. Longueur cible : {length_instruction}\n\n"
+            "**Format de Sortie Attendu (Strict) :** rédigez UNIQUEMENT le texte complet de la section modifiée, sans titre ni commentaire."
+        )
+        # fmt: on
+        return ChatPromptTemplate.from_template(prompt_str)
+
+    def _build_paragraph_revision_prompt_template(self) -> ChatPromptTemplate:
+        """
+        Builds the prompt template used to revise a single paragraph of a draft.
+        """
+        # fmt: off
+        prompt_str = (
+            "Vous êtes un rédacteur académique expert chargé de **réviser UN SEUL paragraphe** d'une section de mémoire professionnel Epitech, à partir de points de critique précis.\n\n"
+            "**Persona de l'Étudiant :**\n{persona}\n\n"
+            "**Section :** \"{section_title}\" — Objectifs : {section_objectives}\n\n"
+            "**Paragraphe précédent (contexte, NE PAS modifier) :**\n{previous_paragraph}\n\n"
+            "**Paragraphe à réviser :**\n"
+            "--- DÉBUT PARAGRAPHE ---\n{paragraph_to_revise}\n"
+            "--- FIN PARAGRAPHE ---\n\n"
+            "**Paragraphe suivant (contexte, NE PAS modifier) :**\n{next_paragraph}\n\n"
+            "**Points de critique à corriger dans ce paragraphe :**\n{critique_points}\n\n"
+            "**Contexte du Journal d'Apprentissage (anonymisé) :**\n"
+            "--- DÉBUT CONTEXTE JOURNAL ---\n{journal_context}\n"
+            "--- FIN CONTEXTE JOURNAL ---\n\n"
+            "**Consignes :** corrigez TOUS les points ci-dessus, conservez le ton académique, l'anonymisation et les transitions avec les paragraphes voisins. "
+            "Si un contenu est superflu, supprimez-le ; si une information manque, intégrez-la dans ce paragraphe (vous pouvez produire deux paragraphes au maximum).\n\n"
+            "**Format de Sortie Attendu (Strict) :** rédigez UNIQUEMENT le texte du paragraphe révisé, sans titre ni commentaire."
+        )
+        # fmt: on
+        return ChatPromptTemplate.from_template(prompt_str)
+
+    def _revise_paragraphs(
+        self,
+        paragraphs: list[str],
+        revision_plan: dict[int, list],
+        prompt_values: dict[str, Any],
+        generation_kwargs: dict[str, Any] | None = None,
+    ) -> str:
+        """
+        Regenerates only the paragraphs targeted by the critique and splices them back.
+
+        Neighbouring paragraphs are given as read-only context so that the
+        revised paragraph keeps its transitions.
+        """
+        prompt_template = self._build_paragraph_revision_prompt_template()
+        revised_paragraphs = list(paragraphs)
+        for index, points in revision_plan.items():
+            formatted_prompt = prompt_template.format_prompt(
+                persona=prompt_values["persona"],
+                section_title=prompt_values["section_title"],
+                section_objectives=prompt_values["section_objectives"],
+                previous_paragraph=paragraphs[index - 1] if index > 0 else "(Début)",
+                paragraph_to_revise=paragraphs[index],
+                next_paragraph=(
+                    paragraphs[index + 1] if index + 1 < len(paragraphs) else "(Fin)"
+                ),
+                critique_points=format_points(points),
+                journal_context=prompt_values["journal_context"],
+            )
+            llm_response = self.llm.invoke(
+                formatted_prompt, **(generation_kwargs or {})
+            )
+            revised_paragraphs[index] = (
+                llm_response.content
+                if hasattr(llm_response, "content")
+                else str(llm_response)
+            ).strip()
+            logger.info(
+                "N6: Paragraph %d/%d revised (%d critique points).",
+                index + 1,
+                len(paragraphs),
+                len(points),
+            )
+        return join_paragraphs(revised_paragraphs)
+
+    def _example_passages_for_section(
+        self, state: AgentState, section: SectionDetail
+    ) -> str:
+        """Passages de l'exemple indexé (T2) les plus proches de la section."""
+        example_passages = retrieve_example_passages(
+            state.example_thesis_index_path,
+            state.example_thesis_index_version,
+            state.embedding_model_name,
+            [f"{section.title}. {section.description_objectives}"],
+            k_per_query=settings.example_thesis_k_per_query,
+            max_passages=settings.example_thesis_k_per_query,
+        )
+        return example_passages or "[Aucun passage d'exemple disponible.]"
+
     def run(self, state: AgentState) -> dict[str, Any]:  # noqa: C901
         """
         Drafts or revises a thesis section using the LLM.
@@ -211,7 +340,16 @@ class N6SectionDraftingNode:
             "section_key_questions": key_questions_str,
             "section_style_notes": style_notes,
             "journal_context": journal_context,
+            "length_instruction": length_instruction(
+                section_data_for_prompt, settings.words_per_page
+            ),
         }
+        # Plafond de génération issu du budget de longueur (N3).
+        generation_kwargs: dict[str, Any] = (
+            {"num_predict": section_data_for_prompt.max_output_tokens}
+            if section_data_for_prompt.max_output_tokens
+            else {}
+        )
 
         # Déterminer si c'est un draft initial ou une révision
         # La critique est dans section_to_process.critique_v1 (l'original, pas la copie)
@@ -232,8 +370,34 @@ class N6SectionDraftingNode:
         current_draft_content_for_revision = (
             section_to_process.current_draft_for_critique
         )
+        draft_paragraphs: list[str] = []
+        paragraph_revision_plan: dict[int, list] = {}
+
+        # Demande de modification humaine (N8) : révision à partir du retour et
+        # du brouillon précédent, avec le contexte déjà récupéré.
+        review_feedback = section_to_process.human_review_feedback
+        previous_reviewed_draft = (
+            section_to_process.refined_draft
+            or section_to_process.draft_v1
+            or current_draft_content_for_revision
+        )
+        is_feedback_revision = bool(
+            review_feedback
+            and review_feedback.modification_requested
+            and review_feedback.feedback_text
+            and previous_reviewed_draft
+        )
 
-        if (
+        if is_feedback_revision:
+            logger.info(
+                "N6: Applying human feedback to section: '%s'.",
+                section_data_for_prompt.title,
+            )
+            prompt_template = self._build_feedback_revision_prompt_template()
+            prompt_values["previous_draft_content"] = previous_reviewed_draft
+            prompt_values["feedback_text"] = review_feedback.feedback_text
+            is_revision_mode = True
+        elif (
             is_revision_mode
             and current_draft_content_for_revision
             and section_to_process.critique_v1
@@ -250,6 +414,24 @@ class N6SectionDraftingNode:
             prompt_values["critique_json_str"] = (
                 section_to_process.critique_v1.json()
             )  # Pydantic V1
+            if settings.n6_revision_mode == "paragraph":
+                draft_paragraphs = split_paragraphs(current_draft_content_for_revision)
+                paragraph_revision_plan, unlocated_points = plan_paragraph_revisions(
+                    draft_paragraphs, section_to_process.critique_v1
+                )
+                # Révision ciblée seulement si toute la critique est localisée et
+                # ne touche pas l'essentiel du texte ; sinon réécriture complète.
+                if unlocated_points or len(paragraph_revision_plan) > (
+                    settings.n6_paragraph_revision_max_ratio * len(draft_paragraphs)
+                ):
+                    logger.info(
+                        "N6: Falling back to full rewrite (%d unlocated points, "
+                        "%d/%d paragraphs targeted).",
+                        len(unlocated_points),
+                        len(paragraph_revision_plan),
+                        len(draft_paragraphs),
+                    )
+                    paragraph_revision_plan = {}
         else:
             logger.info(
                 "N6: Drafting initial version for section: '%s' (ID: %s, Level: %s)",
@@ -258,6 +440,9 @@ class N6SectionDraftingNode:
                 section_data_for_prompt.level,
             )
             prompt_template = self._build_initial_draft_prompt_template()
+            prompt_values["example_passages"] = self._example_passages_for_section(
+                state, section_data_for_prompt
+            )
             # Réinitialiser les champs liés à la critique/révision pour un premier draft
             section_data_for_prompt.critique_v1 = None
             section_data_for_prompt.refined_draft = None
@@ -274,6 +459,7 @@ class N6SectionDraftingNode:
                 "retrieved context. Drafting may be less informed."
             )
 
+        started_at = time.perf_counter()
         try:
             formatted_prompt = prompt_template.format_prompt(**prompt_values)
             logger.debug(
@@ -282,12 +468,20 @@ class N6SectionDraftingNode:
                 formatted_prompt.to_string()[:1000] + "...",
             )
 
-            llm_response = self.llm.invoke(formatted_prompt)
-            generated_text = (
-                llm_response.content
-                if hasattr(llm_response, "content")
-                else str(llm_response)
-            ).strip()
+            if paragraph_revision_plan:
+                generated_text = self._revise_paragraphs(
+                    draft_paragraphs,
+                    paragraph_revision_plan,
+                    prompt_values,
+                    generation_kwargs,
+                )
+            else:
+                llm_response = self.llm.invoke(formatted_prompt, **generation_kwargs)
+                generated_text = (
+                    llm_response.content
+                    if hasattr(llm_response, "content")
+                    else str(llm_response)
+                ).strip()
 
             # Mettre à jour la copie de la section avant de l'assigner à l'outline
             # et ensuite mettre à jour l'état.
@@ -304,6 +498,12 @@ class N6SectionDraftingNode:
                 updated_fields["current_operation_message"] = (
                     f"N6: Revision generated for section '{section_data_for_prompt.title}'."
                 )
+                if not is_feedback_revision:
+                    # Révision demandée par N7 : comptée dans le budget de temps
+                    # de la boucle de réflexion, comme la critique elle-même.
+                    section_to_update_in_new_outline.reflection_time_spent_s += (
+                        time.perf_counter() - started_at
+                    )
             else:
                 section_to_update_in_new_outline.draft_v1 = generated_text
                 section_to_update_in_new_outline.status = SectionStatus.DRAFT_GENERATED
@@ -313,14 +513,27 @@ class N6SectionDraftingNode:
 
             # Mettre à jour le draft courant pour la prochaine critique potentielle
             section_to_update_in_new_outline.current_draft_for_critique = generated_text
+            section_to_update_in_new_outline.input_fingerprints = (
+                section_input_fingerprints(state, section_to_update_in_new_outline)
+            )
+            if is_feedback_revision:
+                # Le retour est appliqué : N7 ne re-critique pas, N8 re-soumet.
+                section_to_update_in_new_outline.human_review_feedback = (
+                    HumanReviewFeedback(
+                        modification_requested=False,
+                        feedback_text=review_feedback.feedback_text,
+                    )
+                )
 
             updated_fields["thesis_outline"] = new_thesis_outline
             updated_fields["last_successful_node"] = "N6SectionDraftingNode"
             logger.info(
-                "N6: %s for section '%s'. Length: %d chars.",
+                "N6: %s for section '%s'. Length: %d chars, %d words (target: %s).",
                 "Revision generated" if is_revision_mode else "Initial draft generated",
                 section_data_for_prompt.title,
                 len(generated_text),
+                word_count(generated_text),
+                section_data_for_prompt.target_word_count or "none",
             )
 
         except Exception as e:  # noqa: BLE001
@@ -0,0 +1,248 @@
+# src/nodes/n7_self_critique.py
+import difflib
+import logging
+import time
+import traceback
+from typing import Any
+
+from langchain_community.chat_models import ChatOllama
+from langchain_core.prompts import ChatPromptTemplate
+
+from src.cassette import with_chat_cassette
+from src.config import settings
+from src.context_packing import estimate_tokens
+from src.json_utils import inline_json_schema_refs, loads_lenient
+from src.state import AgentState, CritiqueOutput, SectionDetail, SectionStatus
+
+logger = logging.getLogger(__name__)
+
+READY_RECOMMENDATIONS = ("READY_FOR_HUMAN_REVIEW", "MINOR_EDITS_OK_FOR_REVIEW")
+
+
+def draft_similarity(previous_draft: str, current_draft: str) -> float:
+    """Similarité (0-1) mot à mot entre deux versions d'un brouillon."""
+    return difflib.SequenceMatcher(
+        None, previous_draft.split(), current_draft.split()
+    ).ratio()
+
+
+class N7SelfCritiqueNode:
+    """
+    Nœud de critique automatique (boucle Reflexion N6/N7) d'un brouillon de section.
+
+    La boucle s'arrête et route vers N8 dès que l'une des conditions suivantes
+    est remplie ; sinon elle renvoie la section à N6 pour révision :
+    - `overall_assessment_score` atteint `settings.n7_score_threshold` (ou la
+      recommandation indique que le texte est prêt pour la revue humaine) ;
+    - le brouillon révisé est quasi identique au précédent
+      (`settings.n7_similarity_threshold`) ;
+    - le budget de tokens ou de temps de la section est épuisé ;
+    - `state.max_reflection_attempts` est atteint ;
+    - le brouillon provient d'un retour humain (N8) déjà appliqué par N6.
+
+    La sortie du LLM suit le même chemin que N3 : `format` structuré d'Ollama
+    (schéma JSON de `CritiqueOutput`), puis `loads_lenient` en cas de JSON abîmé.
+    """
+
+    def __init__(self, llm_model_name: str | None = None, temperature: float = 0.0):
+        """Initialise le nœud avec le modèle LLM de critique."""
+        self.llm_model_name = llm_model_name or settings.llm_model_name
+        self.temperature = temperature
+        self.critique_schema = inline_json_schema_refs(CritiqueOutput.schema())
+        self.llm: ChatOllama | None = None
+        try:
+            self.llm = with_chat_cassette(
+                ChatOllama(
+                    model=self.llm_model_name,
+                    temperature=self.temperature,
+                    format="json",
+                    base_url=settings.ollama_base_url,
+                )
+            )
+            logger.info("N7: LLM de critique initialisé: %s", self.llm_model_name)
+        except Exception as e:  # noqa: BLE001
+            logger.error(
+                "N7 Fatal: ChatOllama(%s) n'a pas pu être initialisé: %s",
+                self.llm_model_name,
+                e,
+                exc_info=True,
+            )
+
+    def _build_critique_prompt_template(self) -> ChatPromptTemplate:
+        """Construit le prompt de critique structurée d'un brouillon."""
+        prompt_str = (
+            "Vous êtes un évaluateur académique exigeant (jury Epitech Digital "
+            "School, titre RNCP 35284). Vous critiquez un brouillon de section de "
+            "mémoire de mission professionnelle.\n\n"
+            '**Section :** "{section_title}"\n'
+            "- Objectifs : {section_objectives}\n"
+            "- Exigences Epitech : {section_requirements_summary}\n"
+            "- Questions Fondamentales : {section_key_questions}\n\n"
+            "**Contexte du Journal Disponible (anonymisé) :**\n{journal_context}\n\n"
+            "**Brouillon à Critiquer :**\n"
+            "--- DÉBUT BROUILLON ---\n{draft}\n"
+            "--- FIN BROUILLON ---\n\n"
+            "**Consignes :**\n"
+            "1. Évaluez le brouillon de 1 (très faible) à 5 (excellent) au regard "
+            "des objectifs, des exigences et des questions.\n"
+            "2. Pour chaque défaut (`identified_flaws`) et contenu superflu "
+            "(`superfluous_content`), citez l'extrait EXACT du brouillon concerné "
+            "dans `specific_excerpt_from_draft` (max 50 mots).\n"
+            "3. Listez les informations manquantes (`missing_information`) et, si "
+            "le journal peut les fournir, 2-3 `suggested_search_queries`.\n"
+            "4. `final_recommendation` vaut 'REVISION_NEEDED', "
+            "'MINOR_EDITS_OK_FOR_REVIEW' ou 'READY_FOR_HUMAN_REVIEW'.\n\n"
+            "Votre unique sortie doit être un objet JSON valide respectant le "
+            "schéma `CritiqueOutput`."
+        )
+        return ChatPromptTemplate.from_template(prompt_str)
+
+    def _critique(
+        self, section: SectionDetail, draft: str
+    ) -> tuple[CritiqueOutput, int]:
+        """Appelle le LLM de critique ; retourne la critique et les tokens consommés."""
+        prompt_input = self._build_critique_prompt_template().format(
+            section_title=section.title,
+            section_objectives=section.description_objectives,
+            section_requirements_summary=section.original_requirements_summary,
+            section_key_questions="\n- ".join(section.key_questions_to_answer) or "N/A",
+            journal_context=section.anonymized_context_for_llm or "[Aucun contexte.]",
+            draft=draft,
+        )
+        llm_response = self.llm.invoke(prompt_input, format=self.critique_schema)
+        raw_output = llm_response.content
+        metadata = getattr(llm_response, "response_metadata", None) or {}
+        tokens_used = (metadata.get("prompt_eval_count") or 0) + (
+            metadata.get("eval_count") or 0
+        )
+        if not tokens_used:
+            tokens_used = estimate_tokens(prompt_input) + estimate_tokens(raw_output)
+        return CritiqueOutput.parse_obj(loads_lenient(raw_output)), tokens_used
+
+    def _budget_stop_reason(
+        self, section: SectionDetail, max_attempts: int
+    ) -> str | None:
+        """Retourne la raison d'arrêt liée aux tentatives/budgets, ou None."""
+        if section.reflection_attempts >= max_attempts:
+            return "max_attempts"
+        if section.reflection_tokens_used >= settings.n7_section_token_budget:
+            return "token_budget"
+        if section.reflection_time_spent_s >= settings.n7_section_time_budget_s:
+            return "time_budget"
+        return None
+
+    def run(self, state: AgentState) -> dict[str, Any]:  # noqa: C901
+        """Critique le brouillon courant et décide entre révision (N6) et revue (N8)."""
+        logger.info("N7: Self-Critique Node starting.")
+        updated_fields: dict[str, Any] = {
+            "last_successful_node": "N7SelfCritiqueNode_Error",
+            "current_operation_message": "N7: Évaluation du brouillon.",
+            "error_message": None,
+            "next_node_override": "N8_HumanReviewHITLNode",
+        }
+
+        thesis_outline_list = (
+            state.thesis_outline if isinstance(state.thesis_outline, list) else []
+        )
+        target_index = next(
+            (
+                i
+                for i, s in enumerate(thesis_outline_list)
+                if s.id == state.current_section_id
+            ),
+            None,
+        )
+        if target_index is None:
+            msg = f"N7: Section '{state.current_section_id}' introuvable dans le plan."
+            logger.error(msg)
+            updated_fields["error_message"] = msg
+            return updated_fields
+
+        new_thesis_outline = [s.copy(deep=True) for s in thesis_outline_list]
+        section = new_thesis_outline[target_index]
+        updated_fields["thesis_outline"] = new_thesis_outline
+        draft = section.current_draft_for_critique
+
+        if not draft or section.status == SectionStatus.ERROR:
+            logger.warning("N7: Aucun brouillon à critiquer pour '%s'.", section.title)
+            updated_fields["last_successful_node"] = "N7SelfCritiqueNode"
+            return updated_fields
+
+        stop_reason = self._budget_stop_reason(section, state.max_reflection_attempts)
+        review_feedback = section.human_review_feedback
+        if (
+            review_feedback
+            and review_feedback.feedback_text
+            and not review_feedback.modification_requested
+        ):
+            # Brouillon issu d'un retour humain appliqué par N6 : le relecteur
+            # juge lui-même le résultat, pas de nouvelle boucle de critique.
+            stop_reason = "human_feedback"
+        if stop_reason is None and section.last_critiqued_draft:
+            similarity = draft_similarity(section.last_critiqued_draft, draft)
+            if similarity >= settings.n7_similarity_threshold:
+                logger.info(
+                    "N7: Révision quasi identique (similarité %.3f) pour '%s'.",
+                    similarity,
+                    section.title,
+                )
+                stop_reason = "converged"
+
+        if stop_reason is None:
+            if not self.llm:  # pragma: no cover
+                stop_reason = "llm_unavailable"
+            else:
+                started_at = time.perf_counter()
+                try:
+                    critique, tokens_used = self._critique(section, draft)
+                except Exception as e:  # noqa: BLE001
+                    error_msg = f"N7: Critique invalide pour '{section.title}': {e}"
+                    logger.error(error_msg, exc_info=True)
+                    section.error_details_n7_critique = (
+                        f"{error_msg}\n{traceback.format_exc()}"
+                    )
+                    stop_reason = "critique_error"
+                else:
+                    # Le brouillon critiqué a été produit par N6 : compté au budget.
+                    section.reflection_tokens_used += tokens_used + estimate_tokens(
+                        draft
+                    )
+                    section.critique_v1 = critique
+                    section.reflection_history.append(critique)
+                    section.last_critiqued_draft = draft
+                    logger.info(
+                        "N7: Score %d/5 (%s) pour '%s'.",
+                        critique.overall_assessment_score,
+                        critique.final_recommendation,
+                        section.title,
+                    )
+                    if (
+                        critique.overall_assessment_score >= settings.n7_score_threshold
+                        or critique.final_recommendation in READY_RECOMMENDATIONS
+                    ):
+                        stop_reason = "score_threshold"
+                section.reflection_time_spent_s += time.perf_counter() - started_at
+
+        if stop_reason is None:
+            # Budget épuisé par cette critique : inutile de lancer une révision.
+            stop_reason = self._budget_stop_reason(
+                section, state.max_reflection_attempts
+            )
+
+        if stop_reason is None:
+            section.reflection_attempts += 1
+            section.status = SectionStatus.SELF_CRITIQUE_COMPLETED
+            updated_fields["next_node_override"] = "N6_SectionDraftingNode"
+            updated_fields["current_operation_message"] = (
+                f"N7: Révision {section.reflection_attempts} demandée pour "
+                f"'{section.title}'."
+            )
+        else:
+            section.reflection_stop_reason = stop_reason
+            updated_fields["current_operation_message"] = (
+                f"N7: Boucle de critique terminée pour '{section.title}' "
+                f"({stop_reason})."
+            )
+        logger.info("N7: %s", updated_fields["current_operation_message"])
+        updated_fields["last_successful_node"] = "N7SelfCritiqueNode"
+        return updated_fields
@@ -1,7 +1,12 @@
 # src/nodes/n8_human_review_hitl_node.py
 import logging
+import time
 from typing import Any
 
+from src.config import settings
+from src.length_budget import word_count
+from src.run_config import thread_id_from_config
+from src.speculative_drafting import SpeculativeDrafter
 from src.state import AgentState, HumanReviewFeedback, SectionDetail, SectionStatus
 
 logger = logging.getLogger(__name__)
@@ -14,8 +19,22 @@ class N8HumanReviewHITLNode:
     If no human response is present in the state for the current section,
     it prepares for HITL by populating state.interrupt_payload.
     If a response is present (in section.temporary_human_response), it processes it.
+
+    When a `speculative_drafter` is provided, preparing an interrupt also starts
+    background drafting of the next PENDING sections for the thread, so that
+    they are ready when the router reaches them.
+
+    With `settings.n8_batch_review_size` > 1, drafted sections are queued instead
+    of interrupting one by one; a single multi-section payload is emitted once
+    the batch is full, its oldest section exceeds `n8_batch_review_max_age_s`,
+    or no other section remains to be drafted. The resume then carries one
+    response per section in `state.batch_human_responses`.
     """
 
+    def __init__(self, speculative_drafter: SpeculativeDrafter | None = None):
+        """Initializes the node, optionally with a speculative drafter."""
+        self.speculative_drafter = speculative_drafter
+
     def _process_human_approval(
         self,
         section_to_process: SectionDetail,
@@ -92,6 +111,191 @@ class N8HumanReviewHITLNode:
             current_section_idx_from_state
         )
 
+    def _section_review_payload(
+        self, section_to_process: SectionDetail, draft_to_review: str
+    ) -> dict[str, Any]:
+        """Builds the review data presented to the human for one section."""
+        return {
+            "section_id": section_to_process.id,
+            "title": section_to_process.title,
+            "draft_content": draft_to_review,
+            "critique_v1": section_to_process.critique_v1,
+            "length": {
+                "projected_words": section_to_process.target_word_count,
+                "actual_words": word_count(draft_to_review),
+            },
+        }
+
+    def _apply_human_response(
+        self,
+        section_to_process: SectionDetail,
+        human_response: dict[str, Any],
+        current_section_idx_from_state: int,
+        updated_fields: dict[str, Any],
+    ):
+        """Dispatches a human response to the matching action handler."""
+        action = human_response.get("action")
+        feedback = human_response.get("feedback_text")
+        if action == "approve_section":
+            self._process_human_approval(
+                section_to_process, current_section_idx_from_state, updated_fields
+            )
+        elif action == "modify_section":
+            self._process_human_modification_request(
+                section_to_process,
+                feedback,
+                current_section_idx_from_state,
+                updated_fields,
+            )
+        else:
+            self._handle_unknown_action(
+                section_to_process,
+                action,
+                current_section_idx_from_state,
+                updated_fields,
+            )
+
+    def _batch_is_due(
+        self, outline: list[SectionDetail], queued: list[SectionDetail]
+    ) -> bool:
+        """Whether the queued sections should be presented now."""
+        if not queued:
+            return False
+        if len(queued) >= settings.n8_batch_review_size:
+            return True
+        oldest = min(s.review_queued_at or time.time() for s in queued)
+        if time.time() - oldest >= settings.n8_batch_review_max_age_s:
+            return True
+        # Plus rien à rédiger d'ici la prochaine revue : inutile d'attendre.
+        return not any(
+            s.status in (SectionStatus.PENDING, SectionStatus.MODIFICATION_REQUESTED)
+            for s in outline
+        )
+
+    def _queued_sections(self, outline: list[SectionDetail]) -> list[SectionDetail]:
+        return [
+            s
+            for s in outline
+            if s.status == SectionStatus.HUMAN_REVIEW_PENDING
+            and s.review_queued_at is not None
+        ]
+
+    def _emit_batch_payload(
+        self, queued: list[SectionDetail], updated_fields: dict[str, Any]
+    ):
+        """Sets a single interrupt payload covering all queued sections."""
+        updated_fields["interrupt_payload"] = {
+            "node_name": "N8_HumanReviewHITLNode",
+            "sections": [
+                self._section_review_payload(
+                    s,
+                    s.refined_draft if s.refined_draft is not None else s.draft_v1,
+                )
+                for s in queued
+            ],
+            "instructions": (
+                "Review the drafts. Provide 'batch_human_responses': one item per "
+                "section with 'section_id', 'action' "
+                "('approve_section'/'modify_section') and 'feedback_text' "
+                "if modifying."
+            ),
+        }
+        updated_fields["current_operation_message"] = (
+            f"N8: {len(queued)} section(s) pending batch human review."
+        )
+        updated_fields["last_successful_node"] = "N8HumanReviewHITLNode_Interrupted"
+        logger.info("N8: Prepared batch review of %d section(s).", len(queued))
+
+    def _run_batch(  # noqa: C901
+        self,
+        state: AgentState,
+        outline: list[SectionDetail],
+        actual_section_index: int,
+        updated_fields: dict[str, Any],
+    ) -> bool:
+        """
+        Batch mode: queues the current draft or processes the batch responses.
+
+        Returns True when a batch interrupt payload was emitted.
+        """
+        queued = self._queued_sections(outline)
+        responses = {
+            r.get("section_id"): r
+            for r in state.batch_human_responses
+            if isinstance(r, dict)
+        }
+        queued_ids = {s.id for s in queued}
+        answered = [
+            (i, s)
+            for i, s in enumerate(outline)
+            if s.id in queued_ids and (s.id in responses or s.temporary_human_response)
+        ]
+
+        if answered:
+            first_modified_index: int | None = None
+            for section_index, section in answered:
+                human_response = responses.get(section.id) or (
+                    section.temporary_human_response
+                )
+                section.temporary_human_response = None
+                section.review_queued_at = None
+                self._apply_human_response(section, human_response, section_index, {})
+                if section.status == SectionStatus.HUMAN_REVIEW_PENDING:
+                    # Réponse invalide : la section reste dans la file de revue.
+                    section.review_queued_at = time.time()
+                if (
+                    section.status == SectionStatus.MODIFICATION_REQUESTED
+                    and first_modified_index is None
+                ):
+                    first_modified_index = section_index
+            logger.info("N8: Processed %d batch review response(s).", len(answered))
+            updated_fields["batch_human_responses"] = []
+            updated_fields["current_section_index_for_router"] = (
+                first_modified_index
+                if first_modified_index is not None
+                else actual_section_index + 1
+            )
+            updated_fields["current_operation_message"] = (
+                f"N8: Processed {len(answered)} batch review response(s)."
+            )
+            updated_fields["last_successful_node"] = "N8HumanReviewHITLNode_Processed"
+            remaining = self._queued_sections(outline)
+            if remaining and not any(
+                s.status
+                in (SectionStatus.PENDING, SectionStatus.MODIFICATION_REQUESTED)
+                for s in outline
+            ):
+                self._emit_batch_payload(remaining, updated_fields)
+                return True
+            return False
+
+        section_to_process = outline[actual_section_index]
+        if (
+            section_to_process.refined_draft is None
+            and section_to_process.draft_v1 is None
+        ):
+            # Erreur (pas de brouillon) : même traitement qu'en mode unitaire.
+            self._prepare_for_human_review(
+                section_to_process, actual_section_index, updated_fields
+            )
+            return False
+
+        section_to_process.status = SectionStatus.HUMAN_REVIEW_PENDING
+        if section_to_process.review_queued_at is None:
+            section_to_process.review_queued_at = time.time()
+        queued = self._queued_sections(outline)
+        if self._batch_is_due(outline, queued):
+            self._emit_batch_payload(queued, updated_fields)
+            return True
+
+        updated_fields["current_section_index_for_router"] = actual_section_index + 1
+        updated_fields["current_operation_message"] = (
+            f"N8: Section '{section_to_process.title}' queued for batch review "
+            f"({len(queued)}/{settings.n8_batch_review_size})."
+        )
+        updated_fields["last_successful_node"] = "N8HumanReviewHITLNode_Queued"
+        return False
+
     def _prepare_for_human_review(  # noqa: C901
         self,
         section_to_process: SectionDetail,
@@ -131,10 +335,7 @@ class N8HumanReviewHITLNode:
         else:
             interrupt_payload_for_ui = {
                 "node_name": "N8_HumanReviewHITLNode",
-                "section_id": section_to_process.id,
-                "title": section_to_process.title,
-                "draft_content": draft_to_review,
-                "critique_v1": section_to_process.critique_v1,
+                **self._section_review_payload(section_to_process, draft_to_review),
                 "instructions": (
                     "Review the draft. Provide response with 'action' "
                     "('approve_section'/'modify_section') and 'feedback_text' "
@@ -155,7 +356,31 @@ class N8HumanReviewHITLNode:
                 current_section_idx_from_state
             )
 
-    def run(self, state: AgentState) -> dict[str, Any]:  # noqa: C901
+    def _maybe_start_speculative_drafting(
+        self,
+        state: AgentState,
+        config: dict[str, Any] | None,
+        interrupted: bool,
+        outline: list[SectionDetail] | None = None,
+    ):
+        """Starts background drafting of upcoming sections during an interrupt."""
+        thread_id = thread_id_from_config(config)
+        if not (self.speculative_drafter and thread_id and interrupted):
+            return
+        logger.info("N8: Speculative drafting started (thread %s).", thread_id)
+        if outline is not None:
+            state = state.copy(update={"thesis_outline": outline})
+        self.speculative_drafter.start(state, thread_id)
+
+    def _cancel_speculative_drafting(self, config: dict[str, Any] | None) -> None:
+        """Stops background drafting once the review resumes (joins the worker)."""
+        thread_id = thread_id_from_config(config)
+        if self.speculative_drafter and thread_id:
+            self.speculative_drafter.cancel(thread_id)
+
+    def run(  # noqa: C901
+        self, state: AgentState, config: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
         """
         Prepares for or processes human review feedback for a section.
         """
@@ -201,6 +426,21 @@ class N8HumanReviewHITLNode:
             updated_fields["thesis_outline"] = thesis_outline_list
             return updated_fields
 
+        # The graph is running again for this thread: the speculative worker
+        # must not draft sections concurrently with N4 -> N5 -> N6.
+        self._cancel_speculative_drafting(config)
+
+        if settings.n8_batch_review_size > 1:
+            final_thesis_outline = [s.copy(deep=True) for s in thesis_outline_list]
+            interrupted = self._run_batch(
+                state, final_thesis_outline, actual_section_index, updated_fields
+            )
+            updated_fields["thesis_outline"] = final_thesis_outline
+            self._maybe_start_speculative_drafting(
+                state, config, interrupted, final_thesis_outline
+            )
+            return updated_fields
+
         section_to_process = target_section.copy(deep=True)
         human_response = section_to_process.temporary_human_response
 
@@ -211,26 +451,17 @@ class N8HumanReviewHITLNode:
                 human_response,
             )
             section_to_process.temporary_human_response = None
-            action = human_response.get("action")
-            feedback = human_response.get("feedback_text")
-
-            if action == "approve_section":
-                self._process_human_approval(
-                    section_to_process, current_section_idx, updated_fields
-                )
-            elif action == "modify_section":
-                self._process_human_modification_request(
-                    section_to_process, feedback, current_section_idx, updated_fields
-                )
-            else:
-                self._handle_unknown_action(
-                    section_to_process, action, current_section_idx, updated_fields
-                )
+            self._apply_human_response(
+                section_to_process, human_response, current_section_idx, updated_fields
+            )
             updated_fields["last_successful_node"] = "N8HumanReviewHITLNode_Processed"
         else:
             self._prepare_for_human_review(
                 section_to_process, current_section_idx, updated_fields
             )
+            self._maybe_start_speculative_drafting(
+                state, config, bool(updated_fields.get("interrupt_payload"))
+            )
 
         final_thesis_outline = list(thesis_outline_list)
         if actual_section_index < len(final_thesis_outline):
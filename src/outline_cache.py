@@ -0,0 +1,148 @@
+# src/outline_cache.py
+import json
+import logging
+import os
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from src.config import configure_logging, settings
+from src.fingerprints import stable_fingerprint
+from src.state import SectionDetail, SectionStatus
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter lorsque le prompt ou le format du plan N3 change de manière
+# incompatible : les plans en cache deviennent alors inaccessibles.
+OUTLINE_CACHE_VERSION = "1"
+
+PLAN_FIELDS = (
+    "id",
+    "title",
+    "level",
+    "description_objectives",
+    "original_requirements_summary",
+    "student_experience_keywords",
+    "example_phrasing_or_content_type",
+    "key_questions_to_answer",
+)
+
+
+class OutlineCache:
+    """
+    Cache disque des plans de thèse validés produits par N3.
+
+    La clé est une empreinte des directives structurées, du persona, du texte de
+    l'exemple de thèse et du nom du modèle LLM. Une cohorte partageant les mêmes
+    directives et le même persona ne planifie donc qu'une seule fois.
+    """
+
+    def __init__(self, cache_directory: str | None = None):
+        """Initialise le cache dans le répertoire donné (ou celui des settings)."""
+        self.cache_directory = Path(cache_directory or settings.outline_cache_directory)
+
+    @staticmethod
+    def make_key(
+        school_guidelines_structured: dict[str, list[str]] | None,
+        user_persona: str | None,
+        example_thesis_text_content: str | None,
+        llm_model_name: str,
+    ) -> str:
+        """Calcule la clé de cache pour un ensemble d'entrées de planification."""
+        return stable_fingerprint(
+            OUTLINE_CACHE_VERSION,
+            school_guidelines_structured or {},
+            user_persona or "",
+            example_thesis_text_content or "",
+            llm_model_name,
+        )
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_directory / f"{key}.json"
+
+    def get(self, key: str) -> list[SectionDetail] | None:
+        """Retourne le plan en cache (sections PENDING) ou None si absent/illisible."""
+        entry_path = self._entry_path(key)
+        if not entry_path.is_file():
+            logger.info("Outline cache MISS: %s", key[:12])
+            return None
+        try:
+            entry = json.loads(entry_path.read_text(encoding="utf-8"))
+            outline = [
+                SectionDetail(**section_data, status=SectionStatus.PENDING)
+                for section_data in entry["outline"]
+            ]
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Outline cache: entrée %s illisible, ignorée: %s", key, e)
+            return None
+        logger.info("Outline cache HIT: %s (%d sections)", key[:12], len(outline))
+        return outline
+
+    def put(
+        self,
+        key: str,
+        outline: list[SectionDetail],
+        metadata: dict[str, Any] | None = None,
+    ) -> Path:
+        """Enregistre un plan validé (champs de planification uniquement)."""
+        self.cache_directory.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "version": OUTLINE_CACHE_VERSION,
+            "created_at": datetime.now(UTC).isoformat(),
+            "metadata": metadata or {},
+            "outline": [
+                {field: getattr(section, field) for field in PLAN_FIELDS}
+                for section in outline
+            ],
+        }
+        entry_path = self._entry_path(key)
+        tmp_path = entry_path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, entry_path)
+        logger.info("Outline cache: plan enregistré sous %s", key[:12])
+        return entry_path
+
+    def invalidate(self, key: str) -> bool:
+        """Supprime une entrée du cache. Retourne True si elle existait."""
+        entry_path = self._entry_path(key)
+        if entry_path.is_file():
+            entry_path.unlink()
+            logger.info("Outline cache: entrée %s invalidée.", key[:12])
+            return True
+        return False
+
+    def clear(self) -> int:
+        """Vide le cache et retourne le nombre d'entrées supprimées."""
+        if not self.cache_directory.is_dir():
+            return 0
+        removed = 0
+        for entry_path in self.cache_directory.glob("*.json"):
+            entry_path.unlink()
+            removed += 1
+        logger.info("Outline cache: %d entrées supprimées.", removed)
+        return removed
+
+    def keys(self) -> list[str]:
+        """Liste les clés présentes dans le cache."""
+        if not self.cache_directory.is_dir():
+            return []
+        return sorted(p.stem for p in self.cache_directory.glob("*.json"))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Gestion du cache des plans N3.")
+    parser.add_argument("--clear", action="store_true", help="Vider tout le cache.")
+    parser.add_argument("--invalidate", metavar="KEY", help="Supprimer une entrée.")
+    args = parser.parse_args()
+    configure_logging()
+
+    cache = OutlineCache()
+    if args.clear:
+        print(f"{cache.clear()} entrée(s) supprimée(s).")
+    elif args.invalidate:
+        print("Supprimée." if cache.invalidate(args.invalidate) else "Clé absente.")
+    else:
+        for cache_key in cache.keys():
+            print(cache_key)
@@ -0,0 +1,119 @@
+# src/paragraph_revision.py
+import re
+
+from src.state import CritiqueOutput, IdentifiedPoint
+
+PARAGRAPH_SEPARATOR = re.compile(r"\n\s*\n")
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+EXCERPT_MATCH_THRESHOLD = 0.6
+
+
+def split_paragraphs(text: str) -> list[str]:
+    """Découpe un brouillon en paragraphes adressables (séparés par une ligne vide)."""
+    return [p.strip() for p in PARAGRAPH_SEPARATOR.split(text) if p.strip()]
+
+
+def join_paragraphs(paragraphs: list[str]) -> str:
+    """Recompose un brouillon à partir de ses paragraphes."""
+    return "\n\n".join(p.strip() for p in paragraphs if p.strip())
+
+
+def _words(text: str) -> list[str]:
+    return [w.lower() for w in WORD_PATTERN.findall(text)]
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_words(text))
+
+
+def _coverage(needle_words: list[str], paragraph_words: set[str]) -> float:
+    if not needle_words:
+        return 0.0
+    return sum(1 for w in needle_words if w in paragraph_words) / len(needle_words)
+
+
+def find_paragraph_for_excerpt(paragraphs: list[str], excerpt: str) -> int | None:
+    """
+    Retrouve le paragraphe contenant un extrait cité par la critique.
+
+    L'extrait est d'abord cherché tel quel (casse et ponctuation normalisées),
+    puis par recouvrement de mots, le LLM critique ne citant pas toujours
+    exactement le brouillon.
+    """
+    normalized_excerpt = _normalize(excerpt)
+    if not normalized_excerpt:
+        return None
+    normalized_paragraphs = [_normalize(p) for p in paragraphs]
+    for index, paragraph in enumerate(normalized_paragraphs):
+        if normalized_excerpt in paragraph:
+            return index
+    excerpt_words = normalized_excerpt.split()
+    scores = [_coverage(excerpt_words, set(p.split())) for p in normalized_paragraphs]
+    best_index = max(range(len(paragraphs)), key=scores.__getitem__, default=None)
+    if best_index is None or scores[best_index] < EXCERPT_MATCH_THRESHOLD:
+        return None
+    return best_index
+
+
+def _closest_paragraph(paragraphs: list[str], text: str) -> int:
+    text_words = _words(text)
+    scores = [_coverage(text_words, set(_words(p))) for p in paragraphs]
+    return max(range(len(paragraphs)), key=scores.__getitem__)
+
+
+def plan_paragraph_revisions(
+    paragraphs: list[str], critique: CritiqueOutput
+) -> tuple[dict[int, list[IdentifiedPoint]], list[IdentifiedPoint]]:
+    """
+    Associe les points de la critique aux paragraphes à régénérer.
+
+    - Défauts et contenus superflus : paragraphe contenant leur extrait cité.
+    - Informations manquantes : paragraphe cité, sinon le plus proche
+      lexicalement de la description du manque.
+
+    Returns:
+        Le plan `{index_paragraphe: [points]}` et la liste des points qui n'ont
+        pu être localisés (critiques générales sans extrait exploitable).
+    """
+    plan: dict[int, list[IdentifiedPoint]] = {}
+    unlocated: list[IdentifiedPoint] = []
+    if not paragraphs:
+        return plan, [
+            *critique.identified_flaws,
+            *critique.superfluous_content,
+            *critique.missing_information,
+        ]
+
+    for point in [*critique.identified_flaws, *critique.superfluous_content]:
+        index = (
+            find_paragraph_for_excerpt(paragraphs, point.specific_excerpt_from_draft)
+            if point.specific_excerpt_from_draft
+            else None
+        )
+        if index is None:
+            unlocated.append(point)
+        else:
+            plan.setdefault(index, []).append(point)
+
+    for point in critique.missing_information:
+        index = (
+            find_paragraph_for_excerpt(paragraphs, point.specific_excerpt_from_draft)
+            if point.specific_excerpt_from_draft
+            else None
+        )
+        if index is None:
+            index = _closest_paragraph(paragraphs, point.point_description)
+        plan.setdefault(index, []).append(point)
+
+    return dict(sorted(plan.items())), unlocated
+
+
+def format_points(points: list[IdentifiedPoint]) -> str:
+    """Formate des points de critique pour un prompt de révision ciblée."""
+    lines = []
+    for point in points:
+        line = f"- {point.point_description} -> {point.suggested_improvement}"
+        if point.specific_excerpt_from_draft:
+            line += f' (extrait : "{point.specific_excerpt_from_draft}")'
+        lines.append(line)
+    return "\n".join(lines)
@@ -1,10 +1,18 @@
 # src/persistence.py
 import logging
+import uuid
 from pathlib import Path  # Ajout de Path pour la gestion des chemins
+from typing import Any
 
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    copy_checkpoint,
+    empty_checkpoint,
+)
 from langgraph.checkpoint.sqlite import SqliteSaver
 
-from src.config import settings
+from src.config import configure_logging, settings
+from src.state import AgentState
 
 logger = logging.getLogger(__name__)
 
@@ -56,7 +64,89 @@ def get_sqlite_checkpointer() -> SqliteSaver:
         raise
 
 
+def fork_thread(
+    checkpointer: BaseCheckpointSaver,
+    source_thread_id: str,
+    overrides: dict[str, Any] | None = None,
+    new_thread_id: str | None = None,
+    source_thread_ts: str | None = None,
+) -> dict[str, Any]:
+    """
+    Forks a new thread from an existing checkpoint (copy-on-write).
+
+    The new thread starts from the source checkpoint (the latest one, or
+    `source_thread_ts`), so resuming it continues where the source stopped,
+    e.g. at N4 after planning. Channel values are copied shallowly: unchanged
+    fields keep the same objects, and the vector store and example thesis
+    index are shared through their paths. Only the `overrides` (AgentState
+    fields, validated by Pydantic) are replaced; their channel versions are
+    bumped like a regular state update. N4's invalidation pass then resets
+    the sections whose inputs the overrides changed.
+
+    Args:
+        checkpointer: The checkpointer holding the source thread.
+        source_thread_id: Thread to fork from.
+        overrides: AgentState fields to replace in the fork (persona, model...).
+        new_thread_id: ID of the new thread (a UUID4 by default).
+        source_thread_ts: Specific source checkpoint; latest if None.
+
+    Returns:
+        The config of the new thread, ready for `graph.invoke(None, config)`.
+
+    Raises:
+        ValueError: If the source checkpoint does not exist or an override is
+            not an AgentState field.
+    """
+    overrides = overrides or {}
+    unknown_fields = set(overrides) - set(AgentState.__fields__)
+    if unknown_fields:
+        raise ValueError(f"Unknown AgentState fields in overrides: {unknown_fields}")
+
+    source_configurable: dict[str, Any] = {"thread_id": source_thread_id}
+    if source_thread_ts:
+        source_configurable["thread_ts"] = source_thread_ts
+    source = checkpointer.get_tuple({"configurable": source_configurable})
+    if source is None:
+        raise ValueError(
+            f"No checkpoint found for thread '{source_thread_id}'"
+            + (f" at '{source_thread_ts}'." if source_thread_ts else ".")
+        )
+
+    forked = copy_checkpoint(source.checkpoint)
+    fresh = empty_checkpoint()
+    forked["id"] = fresh["id"]
+    forked["ts"] = fresh["ts"]
+    if overrides:
+        validated = AgentState(**{**forked["channel_values"], **overrides})
+        next_version = max(forked["channel_versions"].values(), default=0) + 1
+        for field in overrides:
+            forked["channel_values"][field] = getattr(validated, field)
+            forked["channel_versions"][field] = next_version
+
+    new_thread_id = new_thread_id or str(uuid.uuid4())
+    source_ts = source.config["configurable"].get("thread_ts")
+    new_config = checkpointer.put(
+        {"configurable": {"thread_id": new_thread_id}},
+        forked,
+        {
+            **(source.metadata or {}),
+            "source": "fork",
+            "writes": overrides,
+            "forked_from": {"thread_id": source_thread_id, "thread_ts": source_ts},
+        },
+    )
+    logger.info(
+        "Forked thread %s from %s@%s (overrides: %s).",
+        new_thread_id,
+        source_thread_id,
+        source_ts,
+        sorted(overrides),
+    )
+    return new_config
+
+
 if __name__ == "__main__":  # pragma: no cover
+    configure_logging()
     try:
         checkpointer_instance = get_sqlite_checkpointer()
         print(f"Successfully obtained SqliteSaver instance: {checkpointer_instance}")
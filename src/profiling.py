@@ -0,0 +1,298 @@
+# src/profiling.py
+import cProfile
+import inspect
+import logging
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from src.config import PROJECT_ROOT
+from src.state import AgentState
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_ROOT = PROJECT_ROOT / "outputs/profiles"
+# Récursion et profondeur bornées lors de la reconstruction des piles
+_MAX_STACK_DEPTH = 64
+_IGNORED_ALLOCATION_FILES = (
+    __file__,
+    tracemalloc.__file__,
+    "<frozen importlib._bootstrap>",
+)
+
+
+def _frame_label(func: tuple[str, int, str]) -> str:
+    filename, lineno, name = func
+    if filename == "~":  # fonctions built-in (`<built-in method ...>`)
+        return name
+    return f"{Path(filename).stem}:{name}:{lineno}"
+
+
+def collapsed_stacks(stats: pstats.Stats, root: str) -> dict[str, float]:
+    """
+    Reconstruit des piles « repliées » (format flamegraph) depuis des pstats.
+
+    cProfile ne conserve que les arcs appelant → appelé : le temps de chaque
+    fonction est réparti entre ses appelants au prorata du temps cumulé de
+    chaque arc (même approximation que flameprof / gprof2dot). Retourne
+    `{"root;f1;f2": secondes}`.
+    """
+    entries = stats.stats  # type: ignore[attr-defined]
+    callees: dict[Any, list[tuple[Any, float]]] = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, (_, _, _, edge_ct) in callers.items():
+            callees.setdefault(caller, []).append((func, edge_ct))
+
+    stacks: Counter[str] = Counter()
+
+    def _walk(func: Any, path: tuple[str, ...], share: float, on_path: set) -> None:
+        _, _, tt, ct, _ = entries[func]
+        path = (*path, _frame_label(func))
+        if tt * share > 0:
+            stacks[";".join(path)] += tt * share
+        if len(path) >= _MAX_STACK_DEPTH or ct <= 0:
+            return
+        for callee, edge_ct in callees.get(func, ()):
+            if callee not in on_path and callee in entries:
+                _walk(callee, path, share * edge_ct / ct, on_path | {callee})
+
+    for func, (_, _, _, _, callers) in entries.items():
+        if not callers:
+            _walk(func, (root,), 1.0, {func})
+    return dict(stacks)
+
+
+class _NodeProfile:
+    """Mesures cumulées d'un nœud sur toutes ses exécutions."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.wall_s = 0.0
+        self.peak_traced_bytes = 0
+        self.stats: pstats.Stats | None = None
+        self.allocations: Counter[str] = Counter()
+        self.allocation_counts: Counter[str] = Counter()
+
+
+class NodeProfiler:
+    """
+    Profil CPU (cProfile) et mémoire (tracemalloc) par nœud.
+
+    Chaque exécution est profilée dans son thread ; les pstats et les
+    allocations (différence de snapshots tracemalloc, par ligne) sont
+    cumulés par nœud. Les exécutions concurrentes partagent tracemalloc :
+    leurs allocations se mélangent, les pstats restent séparés.
+    """
+
+    def __init__(self, output_dir: str | Path, top_n: int = 25):
+        """Prépare le répertoire des rapports."""
+        self.output_dir = Path(output_dir)
+        self.top_n = top_n
+        self._profiles: dict[str, _NodeProfile] = {}
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+
+    def start(self) -> None:
+        """Démarre tracemalloc (s'il ne l'est pas déjà)."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def stop(self) -> None:
+        """Arrête tracemalloc s'il a été démarré par ce profileur."""
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            [
+                tracemalloc.Filter(False, pattern)
+                for pattern in _IGNORED_ALLOCATION_FILES
+            ]
+        )
+
+    def profile_call(self, node_name: str, func: Any, *args: Any) -> Any:
+        """Exécute `func(*args)` sous cProfile et tracemalloc."""
+        tracing_memory = tracemalloc.is_tracing()
+        before = self._snapshot() if tracing_memory else None
+        if tracing_memory:
+            tracemalloc.reset_peak()
+        profile = cProfile.Profile()
+        started_at = time.perf_counter()
+        profile.enable()
+        try:
+            return func(*args)
+        finally:
+            profile.disable()
+            wall_s = time.perf_counter() - started_at
+            peak = tracemalloc.get_traced_memory()[1] if tracing_memory else 0
+            diffs = (
+                self._snapshot().compare_to(before, "lineno")
+                if before is not None
+                else []
+            )
+            self._record(node_name, profile, wall_s, peak, diffs)
+
+    def _record(
+        self,
+        node_name: str,
+        profile: cProfile.Profile,
+        wall_s: float,
+        peak: int,
+        diffs: list[tracemalloc.StatisticDiff],
+    ) -> None:
+        with self._lock:
+            node_profile = self._profiles.setdefault(node_name, _NodeProfile())
+            node_profile.calls += 1
+            node_profile.wall_s += wall_s
+            node_profile.peak_traced_bytes = max(node_profile.peak_traced_bytes, peak)
+            if node_profile.stats is None:
+                node_profile.stats = pstats.Stats(profile)
+            else:
+                node_profile.stats.add(profile)
+            for diff in diffs:
+                frame = diff.traceback[0]
+                key = f"{frame.filename}:{frame.lineno}"
+                node_profile.allocations[key] += diff.size_diff
+                node_profile.allocation_counts[key] += diff.count_diff
+
+    def write_reports(self) -> list[Path]:
+        """
+        Écrit les rapports et retourne leurs chemins.
+
+        Par nœud : `<nœud>.pstats` et `<nœud>.alloc.txt` ; pour l'ensemble :
+        `collapsed_stacks.txt` (flamegraph.pl, speedscope) et `summary.txt`.
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        written: list[Path] = []
+        collapsed: Counter[str] = Counter()
+        summary = [f"{'node':<36} {'calls':>6} {'wall_s':>10} {'peak_MiB':>10}"]
+        with self._lock:
+            profiles = dict(self._profiles)
+        for node_name, node_profile in sorted(profiles.items()):
+            safe_name = re.sub(r"[^\w.-]", "_", node_name)
+            if node_profile.stats is not None:
+                pstats_path = self.output_dir / f"{safe_name}.pstats"
+                node_profile.stats.dump_stats(pstats_path)
+                written.append(pstats_path)
+                collapsed.update(collapsed_stacks(node_profile.stats, node_name))
+            alloc_path = self.output_dir / f"{safe_name}.alloc.txt"
+            alloc_path.write_text(
+                self._allocation_report(node_name, node_profile), encoding="utf-8"
+            )
+            written.append(alloc_path)
+            summary.append(
+                f"{node_name:<36} {node_profile.calls:>6} "
+                f"{node_profile.wall_s:>10.3f} "
+                f"{node_profile.peak_traced_bytes / 2**20:>10.1f}"
+            )
+
+        collapsed_path = self.output_dir / "collapsed_stacks.txt"
+        # Poids en microsecondes : entiers attendus par flamegraph.pl
+        collapsed_path.write_text(
+            "".join(
+                f"{stack} {round(seconds * 1e6)}\n"
+                for stack, seconds in sorted(collapsed.items())
+                if round(seconds * 1e6) > 0
+            ),
+            encoding="utf-8",
+        )
+        summary_path = self.output_dir / "summary.txt"
+        summary_path.write_text("\n".join(summary) + "\n", encoding="utf-8")
+        written.extend([collapsed_path, summary_path])
+        logger.info("Profils écrits dans %s", self.output_dir)
+        return written
+
+    def _allocation_report(self, node_name: str, node_profile: _NodeProfile) -> str:
+        lines = [
+            f"# {node_name} : {node_profile.calls} exécution(s), pic tracemalloc "
+            f"{node_profile.peak_traced_bytes / 2**20:.1f} MiB",
+            f"# Top {self.top_n} des allocations nettes (KiB, blocs, ligne)",
+        ]
+        for key, size in node_profile.allocations.most_common(self.top_n):
+            if size <= 0:
+                break
+            lines.append(
+                f"{size / 1024:>12.1f} {node_profile.allocation_counts[key]:>9} {key}"
+            )
+        return "\n".join(lines) + "\n"
+
+
+class ProfiledNode:
+    """Enveloppe `node.run` pour profiler chaque exécution du nœud."""
+
+    def __init__(self, node: Any, node_name: str, profiler: NodeProfiler):
+        """Initialise l'enveloppe autour de `node.run`."""
+        self.node = node
+        self.node_name = node_name
+        self.profiler = profiler
+        self._accepts_config = "config" in inspect.signature(node.run).parameters
+
+    def __getattr__(self, name: str) -> Any:
+        """Délègue au nœud enveloppé (`planner_mode`, `stream_sections`...)."""
+        return getattr(self.node, name)
+
+    def run(
+        self, state: AgentState, config: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """Exécute le nœud sous le profileur."""
+        if self._accepts_config:
+            return self.profiler.profile_call(
+                self.node_name, self.node.run, state, config
+            )
+        return self.profiler.profile_call(self.node_name, self.node.run, state)
+
+
+_active_profiler: NodeProfiler | None = None
+
+
+def start_profiling(output_dir: str | Path | None = None) -> NodeProfiler:
+    """Active le profilage des nœuds construits ensuite (mode `--profile`)."""
+    global _active_profiler
+    if output_dir is None:
+        output_dir = DEFAULT_PROFILE_ROOT / datetime.now().strftime("%Y%m%d_%H%M%S")
+    _active_profiler = NodeProfiler(output_dir)
+    _active_profiler.start()
+    logger.info("Profilage activé : rapports dans %s", output_dir)
+    return _active_profiler
+
+
+def stop_profiling() -> list[Path]:
+    """Écrit les rapports du profileur actif et le désactive."""
+    global _active_profiler
+    if _active_profiler is None:
+        return []
+    profiler, _active_profiler = _active_profiler, None
+    try:
+        return profiler.write_reports()
+    finally:
+        profiler.stop()
+
+
+def profile_node(node: Any, node_name: str) -> Any:
+    """Applique `ProfiledNode` si le profilage est actif, sinon retourne le nœud."""
+    if _active_profiler is None:
+        return node
+    return ProfiledNode(node, node_name, _active_profiler)
+
+
+def add_profile_argument(parser: Any) -> None:
+    """Ajoute l'option `--profile [DIR]` commune aux scripts du pipeline."""
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="DIR",
+        help=(
+            "Profile chaque nœud (cProfile + tracemalloc) ; rapports dans DIR "
+            f"(défaut : {DEFAULT_PROFILE_ROOT}/<horodatage>)."
+        ),
+    )
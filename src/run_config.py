@@ -0,0 +1,7 @@
+# src/run_config.py
+from typing import Any
+
+
+def thread_id_from_config(config: dict[str, Any] | None) -> str | None:
+    """Extrait le `thread_id` LangGraph de la config passée à un nœud."""
+    return ((config or {}).get("configurable") or {}).get("thread_id")
@@ -0,0 +1,310 @@
+# src/speculative_drafting.py
+import json
+import logging
+import os
+import threading
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from src.config import settings
+from src.fingerprints import stable_fingerprint
+from src.outline_cache import PLAN_FIELDS
+from src.state import AgentState, SectionDetail, SectionStatus
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter si les prompts N5/N6/N7 changent : les brouillons spéculatifs
+# déjà stockés ne sont alors plus promus.
+SPECULATIVE_DRAFT_VERSION = "1"
+
+N6_NODE_NAME = "N6_SectionDraftingNode"
+
+
+def speculative_fingerprint(state: AgentState, section: SectionDetail) -> str:
+    """
+    Empreinte des entrées amont dont dépend le brouillon d'une section.
+
+    Toute modification du plan de la section (budget de longueur compris), du
+    persona, du modèle, des chunks du journal indexés par N2 (une ré-ingestion
+    au même chemin compte) ou de l'index de l'exemple de thèse change
+    l'empreinte et rend le brouillon spéculatif obsolète.
+    """
+    return stable_fingerprint(
+        SPECULATIVE_DRAFT_VERSION,
+        {field: getattr(section, field) for field in PLAN_FIELDS},
+        section.target_word_count,
+        state.user_persona,
+        state.llm_model_name or settings.llm_model_name,
+        state.journal_chunk_manifest_digest,
+        state.example_thesis_index_version,
+        state.max_reflection_attempts,
+    )
+
+
+class SpeculativeDraftStore:
+    """
+    Fichier JSON annexe (un par thread LangGraph) des brouillons spéculatifs.
+
+    Chaque entrée contient la section rédigée (N5/N6/N7) et l'empreinte des
+    entrées amont au moment de la rédaction.
+    """
+
+    def __init__(self, directory: str | None = None):
+        """Initialise le stockage dans le répertoire donné (ou celui des settings)."""
+        self.directory = Path(directory or settings.speculative_drafts_directory)
+        self._lock = threading.Lock()
+
+    def _path(self, thread_id: str) -> Path:
+        return self.directory / f"{thread_id}.json"
+
+    def _read(self, thread_id: str) -> dict[str, Any]:
+        path = self._path(thread_id)
+        if not path.is_file():
+            return {}
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Speculative drafts: fichier %s illisible: %s", path, e)
+            return {}
+
+    def _write(self, thread_id: str, entries: dict[str, Any]) -> None:
+        path = self._path(thread_id)
+        if not entries:
+            path.unlink(missing_ok=True)
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(entries, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def section_ids(self, thread_id: str) -> list[str]:
+        """Liste les sections ayant un brouillon spéculatif pour ce thread."""
+        with self._lock:
+            return list(self._read(thread_id))
+
+    def has_current(self, thread_id: str, section_id: str, fingerprint: str) -> bool:
+        """Indique si un brouillon à jour (même empreinte) existe déjà."""
+        with self._lock:
+            entry = self._read(thread_id).get(section_id)
+        return bool(entry and entry.get("fingerprint") == fingerprint)
+
+    def put(self, thread_id: str, section: SectionDetail, fingerprint: str) -> None:
+        """Enregistre le brouillon spéculatif d'une section."""
+        with self._lock:
+            entries = self._read(thread_id)
+            entries[section.id] = {
+                "fingerprint": fingerprint,
+                "created_at": datetime.now(UTC).isoformat(),
+                "section": json.loads(section.json()),
+            }
+            self._write(thread_id, entries)
+
+    def pop(
+        self, thread_id: str, section_id: str, fingerprint: str
+    ) -> SectionDetail | None:
+        """
+        Retire et retourne le brouillon d'une section s'il est encore valide.
+
+        Un brouillon dont l'empreinte ne correspond plus est supprimé.
+        """
+        with self._lock:
+            entries = self._read(thread_id)
+            entry = entries.pop(section_id, None)
+            if entry is None:
+                return None
+            self._write(thread_id, entries)
+        if entry.get("fingerprint") != fingerprint:
+            logger.info(
+                "Speculative drafts: brouillon de '%s' obsolète, ignoré.", section_id
+            )
+            return None
+        try:
+            return SectionDetail.parse_obj(entry["section"])
+        except Exception as e:  # noqa: BLE001
+            logger.warning(
+                "Speculative drafts: brouillon de '%s' illisible: %s", section_id, e
+            )
+            return None
+
+    def discard(self, thread_id: str) -> None:
+        """Supprime tous les brouillons spéculatifs d'un thread."""
+        with self._lock:
+            self._path(thread_id).unlink(missing_ok=True)
+
+
+class SpeculativeDrafter:
+    """
+    Pré-rédige en arrière-plan les prochaines sections PENDING (attente N8).
+
+    Les nœuds N5, N6 et (optionnellement) N7 sont exécutés sur une copie de
+    l'état, une section après l'autre dans un unique thread : au plus un appel
+    LLM spéculatif est en cours à tout instant. Le travail s'arrête après
+    `max_sections` sections, lorsque `time_budget_s` est épuisé, ou sur `cancel`
+    (appelé par N8 dès que la revue humaine reprend), qui abandonne la section
+    en cours entre deux étapes.
+    """
+
+    def __init__(
+        self,
+        context_node: Any,
+        drafting_node: Any,
+        critique_node: Any | None = None,
+        store: SpeculativeDraftStore | None = None,
+        max_sections: int | None = None,
+        time_budget_s: float | None = None,
+    ):
+        """Initialise le pré-rédacteur avec les nœuds du graphe à réutiliser."""
+        self.context_node = context_node
+        self.drafting_node = drafting_node
+        self.critique_node = critique_node
+        self.store = store or SpeculativeDraftStore()
+        self.max_sections = (
+            settings.speculative_max_sections if max_sections is None else max_sections
+        )
+        self.time_budget_s = (
+            settings.speculative_time_budget_s
+            if time_budget_s is None
+            else time_budget_s
+        )
+        self._workers: dict[str, tuple[threading.Thread, threading.Event]] = {}
+        self._workers_lock = threading.Lock()
+
+    def upcoming_sections(self, state: AgentState, thread_id: str) -> list[int]:
+        """Index des prochaines sections PENDING sans brouillon spéculatif à jour."""
+        candidates = []
+        start = state.current_section_index + 1
+        for index in range(start, len(state.thesis_outline)):
+            section = state.thesis_outline[index]
+            if section.status != SectionStatus.PENDING:
+                continue
+            fingerprint = speculative_fingerprint(state, section)
+            if self.store.has_current(thread_id, section.id, fingerprint):
+                continue
+            candidates.append(index)
+            if len(candidates) >= self.max_sections:
+                break
+        return candidates
+
+    def _apply(self, state: AgentState, updated_fields: dict[str, Any]) -> AgentState:
+        return state.copy(update=updated_fields)
+
+    def draft_section(
+        self,
+        state: AgentState,
+        index: int,
+        stop_event: threading.Event | None = None,
+    ) -> SectionDetail | None:
+        """
+        Exécute N5 -> N6 (-> N7/N6) pour une section sur une copie de l'état.
+
+        `stop_event` est vérifié avant chaque étape : une fois levé, le
+        brouillon partiel est abandonné (None).
+        """
+        section = state.thesis_outline[index]
+        work_state = state.copy(
+            update={
+                "thesis_outline": [s.copy(deep=True) for s in state.thesis_outline],
+                "current_section_id": section.id,
+                "current_section_index": index,
+            }
+        )
+        steps: list[Any] = [self.context_node, self.drafting_node]
+        if self.critique_node is not None:
+            steps.extend(
+                [self.critique_node, self.drafting_node]
+                * (work_state.max_reflection_attempts + 1)
+            )
+        for node in steps:
+            if stop_event is not None and stop_event.is_set():
+                logger.info(
+                    "Speculative drafting: '%s' abandonnée (revue humaine reprise).",
+                    section.title,
+                )
+                return None
+            fields = node.run(work_state)
+            work_state = self._apply(work_state, fields)
+            if (
+                node is self.critique_node
+                and fields.get("next_node_override") != N6_NODE_NAME
+            ):
+                break
+        drafted = work_state.get_section_by_id(section.id)
+        if drafted is None or drafted.status == SectionStatus.ERROR:
+            return None
+        if not (drafted.refined_draft or drafted.draft_v1):
+            return None
+        return drafted
+
+    def draft_ahead(
+        self,
+        state: AgentState,
+        thread_id: str,
+        stop_event: threading.Event | None = None,
+    ) -> list[str]:
+        """Pré-rédige les prochaines sections ; retourne les IDs stockés."""
+        started_at = time.perf_counter()
+        drafted_ids: list[str] = []
+        for index in self.upcoming_sections(state, thread_id):
+            if stop_event is not None and stop_event.is_set():
+                logger.info("Speculative drafting: annulé (revue humaine reprise).")
+                break
+            if time.perf_counter() - started_at >= self.time_budget_s:
+                logger.info("Speculative drafting: budget de temps épuisé.")
+                break
+            section = state.thesis_outline[index]
+            try:
+                drafted = self.draft_section(state, index, stop_event)
+            except Exception as e:  # noqa: BLE001
+                logger.warning(
+                    "Speculative drafting: échec pour '%s': %s", section.title, e
+                )
+                continue
+            if drafted is None or (stop_event is not None and stop_event.is_set()):
+                continue
+            self.store.put(thread_id, drafted, speculative_fingerprint(state, section))
+            drafted_ids.append(section.id)
+            logger.info("Speculative drafting: '%s' pré-rédigée.", section.title)
+        return drafted_ids
+
+    def start(self, state: AgentState, thread_id: str) -> threading.Thread | None:
+        """Lance `draft_ahead` en arrière-plan (un seul travail par thread)."""
+        with self._workers_lock:
+            worker = self._workers.get(thread_id)
+            if worker is not None and worker[0].is_alive():
+                return None
+            stop_event = threading.Event()
+            thread = threading.Thread(
+                target=self.draft_ahead,
+                args=(state, thread_id, stop_event),
+                name=f"speculative-{thread_id}",
+                daemon=True,
+            )
+            self._workers[thread_id] = (thread, stop_event)
+        thread.start()
+        return thread
+
+    def cancel(self, thread_id: str, timeout: float | None = None) -> None:
+        """
+        Arrête le travail spéculatif de ce thread et attend sa fin.
+
+        La section en cours est abandonnée à la fin de l'étape (N5, N6 ou N7)
+        en cours, et aucune autre n'est commencée. L'attente est bornée par
+        `timeout` (`settings.speculative_cancel_timeout_s` par défaut) pour ne
+        pas retarder la reprise du graphe derrière un appel LLM spéculatif.
+        """
+        with self._workers_lock:
+            worker = self._workers.pop(thread_id, None)
+        if worker is None:
+            return
+        thread, stop_event = worker
+        stop_event.set()
+        thread.join(
+            settings.speculative_cancel_timeout_s if timeout is None else timeout
+        )
+        if thread.is_alive():
+            logger.warning(
+                "Speculative drafting: %s termine son étape en cours en arrière-plan.",
+                thread_id,
+            )
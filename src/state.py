@@ -129,6 +129,22 @@ class SectionDetail(BaseModel):
     current_draft_for_critique: str | None = None
     reflection_history: list[CritiqueOutput] = Field(default_factory=list)
     reflection_attempts: int = 0
+    # Suivi de convergence et de budget de la boucle N6/N7
+    last_critiqued_draft: str | None = None
+    reflection_tokens_used: int = 0
+    reflection_time_spent_s: float = 0.0
+    reflection_stop_reason: str | None = None
+    # Termes de recherche nouveaux apportés par le retour humain (N4 -> N5)
+    feedback_search_terms: list[str] = Field(default_factory=list)
+    # Budget de longueur (voir src/length_budget.py) : cible en mots, plafond de
+    # génération N6 et pondération relative de la section
+    length_weight: float = 1.0
+    target_word_count: int | None = None
+    max_output_tokens: int | None = None
+    # Empreintes des entrées utilisées par N6 (voir src/invalidation.py)
+    input_fingerprints: dict[str, Any] = Field(default_factory=dict)
+    # Revue groupée N8 : horodatage (epoch) de mise en file d'attente
+    review_queued_at: float | None = None
 
 
 class AgentState(BaseModel):
@@ -152,6 +168,8 @@ class AgentState(BaseModel):
         "chef de projet IA (AIPO) dans une foncière immobilière."
     )
     example_thesis_text_content: str | None = None
+    example_thesis_index_path: str | None = None
+    example_thesis_index_version: str | None = None
 
     school_guidelines_raw_text: str | None = None
     school_guidelines_structured: dict[str, list[str]] | None = Field(
@@ -163,12 +181,22 @@ class AgentState(BaseModel):
     anonymization_map: dict[str, str] = Field(default_factory=dict)
     vector_store_initialized: bool = False
     processed_chunks_for_vector_store: list[dict[str, Any]] | None = None
+    # Compteurs de l'ingestion N2 (entrées, chunks, caractères, lots)
+    journal_ingestion_summary: dict[str, int] = Field(default_factory=dict)
+    # Empreinte du manifeste des chunks (chunk_id -> empreinte du contenu),
+    # stocké par N2 dans `<vector_store_path>/chunk_manifest.json`
+    journal_chunk_manifest_digest: str | None = None
 
     thesis_outline: list[SectionDetail] = Field(default_factory=list)
+    # Clé des entrées de planification (OutlineCache.make_key) du plan courant :
+    # N3 garde le plan déjà rédigé tant qu'elle ne change pas.
+    thesis_outline_plan_key: str | None = None
 
     current_section_id: str | None = None
     current_section_index: int = 0
     current_section_index_for_router: int = 0
+    # Nœud suivant décidé par les nœuds de routage (N4, N7)
+    next_node_override: str | None = None
 
     # Pour l'architecture Plan-and-Execute (future)
     # current_plan: Optional[List[Any]] = None # list of Pydantic models for steps
@@ -190,6 +218,13 @@ class AgentState(BaseModel):
     interrupt_payload: dict[str, Any] | None = Field(
         default=None, description="Payload for HITL interrupt by N8."
     )
+    batch_human_responses: list[dict[str, Any]] = Field(
+        default_factory=list,
+        description=(
+            "Batch HITL responses for N8: one dict per section with 'section_id', "
+            "'action' and 'feedback_text'."
+        ),
+    )
 
     def get_section_by_id(self, section_id: str) -> SectionDetail | None:
         """Retrieves a section from the outline by its ID."""
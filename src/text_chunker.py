@@ -0,0 +1,215 @@
+# src/text_chunker.py
+import re
+from collections import deque
+from collections.abc import Callable, Iterator
+
+# (texte, début, fin) -> nombre de tokens du modèle pour text[début:fin]
+TokenCounter = Callable[[str, int, int], int]
+
+# Fin de phrase (ponctuation finale, guillemets/parenthèses fermants, avec
+# l'espace insécable du français avant « », espaces) ou saut de paragraphe.
+_BOUNDARY_PATTERN = re.compile(
+    r"(?P<punct>[.!?…]+(?:[ \u00a0\u202f]?[»\"')\]])*)(?:\s+|$)|\n[^\S\n]*\n\s*",
+    re.UNICODE,
+)
+_WORD_PATTERN = re.compile(r"\S+")
+# Un mot français découpé par un WordPiece (bge-small) fait ≈ 1 token pour
+# 4 caractères ; chaque signe de ponctuation est un token.
+_TOKEN_PIECE_PATTERN = re.compile(r"\w{1,4}|[^\w\s]", re.UNICODE)
+# Abréviations après lesquelles un point ne termine pas la phrase
+FRENCH_ABBREVIATIONS = frozenset(
+    {
+        "m",
+        "mm",
+        "mme",
+        "mmes",
+        "mlle",
+        "mlles",
+        "dr",
+        "pr",
+        "me",
+        "st",
+        "ste",
+        "cf",
+        "ex",
+        "p",
+        "pp",
+        "vol",
+        "chap",
+        "fig",
+        "art",
+        "av",
+        "bd",
+        "env",
+        "n",
+        "no",
+        "réf",
+        "tél",
+        "coll",
+    }
+)
+# Un saut de paragraphe n'est préféré comme coupure que si le chunk est déjà
+# rempli au moins à cette fraction de `max_tokens`.
+MIN_PARAGRAPH_FILL = 0.5
+
+
+def estimate_model_tokens(text: str, start: int = 0, end: int | None = None) -> int:
+    """
+    Estimation (majorante) des tokens du modèle d'embedding pour text[start:end].
+
+    Compte les mots et la ponctuation sans copier le texte. Un tokenizer exact
+    peut être passé à `chunk_text` via `token_counter`.
+    """
+    end = len(text) if end is None else end
+    return sum(1 for _ in _TOKEN_PIECE_PATTERN.finditer(text, start, end))
+
+
+def _is_abbreviation(text: str, start: int, punct_start: int, next_start: int) -> bool:
+    """Vrai si le point en `punct_start` suit une abréviation (« M. », « cf. »)."""
+    if text[punct_start] != "." or text[punct_start + 1 : punct_start + 2] == ".":
+        return False
+    if next_start < len(text) and text[next_start].islower():
+        return True  # « etc. et », « p. ex. la » : la phrase continue
+    word_start = punct_start
+    while word_start > start and text[word_start - 1].isalpha():
+        word_start -= 1
+    word = text[word_start:punct_start]
+    return (len(word) == 1 and word.isupper()) or word.lower() in FRENCH_ABBREVIATIONS
+
+
+def iter_sentence_spans(text: str) -> Iterator[tuple[int, int, bool]]:
+    """
+    Découpe `text` en phrases en une passe : `(début, fin, fin_de_paragraphe)`.
+
+    Les bornes excluent les espaces de séparation ; text[début:fin] est la
+    phrase. Les points d'abréviation (« M. Dupont », « cf. annexe ») et les
+    nombres décimaux ne coupent pas la phrase.
+    """
+    start = len(text) - len(text.lstrip())
+    for boundary in _BOUNDARY_PATTERN.finditer(text, start):
+        if boundary.start() < start:
+            continue
+        if boundary.group("punct"):
+            end = boundary.end("punct")
+            paragraph_end = (
+                boundary.end() == len(text)
+                or text.count("\n", end, boundary.end()) >= 2
+            )
+            if not paragraph_end and _is_abbreviation(
+                text, start, boundary.start(), boundary.end()
+            ):
+                continue
+        else:
+            end = boundary.start()
+            while end > start and text[end - 1].isspace():
+                end -= 1
+            paragraph_end = True
+        if end > start:
+            yield start, end, paragraph_end
+        start = boundary.end()
+    end = len(text.rstrip())
+    if end > start:
+        yield start, end, True
+
+
+def _iter_units(
+    text: str, max_tokens: int, token_counter: TokenCounter
+) -> Iterator[tuple[int, int, int, bool]]:
+    """Phrases `(début, fin, tokens, fin_de_paragraphe)`, coupées si trop longues."""
+    for start, end, paragraph_end in iter_sentence_spans(text):
+        tokens = token_counter(text, start, end)
+        if tokens <= max_tokens:
+            yield start, end, tokens, paragraph_end
+            continue
+        # Phrase plus longue que la fenêtre du modèle : coupure entre les mots
+        piece_start, piece_end, piece_tokens = start, start, 0
+        for word in _WORD_PATTERN.finditer(text, start, end):
+            word_tokens = token_counter(text, word.start(), word.end())
+            if piece_tokens and piece_tokens + word_tokens > max_tokens:
+                yield piece_start, piece_end, piece_tokens, False
+                piece_start, piece_tokens = word.start(), 0
+            piece_end = word.end()
+            piece_tokens += word_tokens
+        yield piece_start, piece_end, piece_tokens, paragraph_end
+
+
+def _paragraph_cut(
+    window: deque[tuple[int, int, int, bool]],
+    window_tokens: int,
+    next_tokens: int,
+    max_tokens: int,
+) -> int | None:
+    """
+    Index de la dernière fin de paragraphe où couper la fenêtre, ou None.
+
+    La coupure doit laisser un chunk rempli à `MIN_PARAGRAPH_FILL` et un reste
+    qui tient, avec la phrase suivante, dans le chunk suivant.
+    """
+    cut, prefix_tokens = None, 0
+    for index, (_, _, tokens, paragraph_end) in enumerate(window):
+        prefix_tokens += tokens
+        if (
+            paragraph_end
+            and prefix_tokens >= max_tokens * MIN_PARAGRAPH_FILL
+            and window_tokens - prefix_tokens + next_tokens <= max_tokens
+        ):
+            cut = index
+    return cut
+
+
+def _keep_overlap(
+    window: deque[tuple[int, int, int, bool]], overlap_tokens: int
+) -> int:
+    """Garde les dernières phrases tenant dans `overlap_tokens` ; retourne le total."""
+    kept, kept_tokens = 0, 0
+    for _, _, tokens, _ in reversed(window):
+        if kept + 1 == len(window) or kept_tokens + tokens > overlap_tokens:
+            break
+        kept += 1
+        kept_tokens += tokens
+    while len(window) > kept:
+        window.popleft()
+    return kept_tokens
+
+
+def chunk_text(
+    text: str,
+    max_tokens: int,
+    overlap_tokens: int = 0,
+    token_counter: TokenCounter = estimate_model_tokens,
+) -> list[tuple[int, int]]:
+    """
+    Découpe `text` en chunks d'au plus `max_tokens` tokens du modèle.
+
+    Les chunks sont des phrases entières regroupées en une seule passe. La
+    coupure se fait de préférence à une fin de paragraphe (sans chevauchement),
+    sinon à une fin de phrase, le chunk suivant reprenant alors les dernières
+    phrases dans la limite de `overlap_tokens`. Seule une phrase plus longue
+    que `max_tokens` est coupée entre deux mots.
+
+    Returns:
+        Les offsets `(début, fin)` des chunks dans `text` (text[début:fin]).
+    """
+    chunks: list[tuple[int, int]] = []
+    window: deque[tuple[int, int, int, bool]] = deque()
+    window_tokens = 0
+
+    for unit in _iter_units(text, max_tokens, token_counter):
+        unit_tokens = unit[2]
+        if window and window_tokens + unit_tokens > max_tokens:
+            cut = _paragraph_cut(window, window_tokens, unit_tokens, max_tokens)
+            if cut is not None:
+                chunks.append((window[0][0], window[cut][1]))
+                for _ in range(cut + 1):
+                    window_tokens -= window.popleft()[2]
+            else:
+                chunks.append((window[0][0], window[-1][1]))
+                window_tokens = _keep_overlap(window, overlap_tokens)
+                while window and window_tokens + unit_tokens > max_tokens:
+                    window_tokens -= window.popleft()[2]
+        window.append(unit)
+        window_tokens += unit_tokens
+
+    if window:
+        chunks.append((window[0][0], window[-1][1]))
+    return chunks
@@ -17,6 +17,11 @@ from langchain_core.pydantic_v1 import (
 # Importer PrivateAttr
 from langchain_core.tools import BaseTool
 
+from src.cassette import with_embeddings_cassette
+from src.embedding_worker import worker_embeddings
+from src.tracing import traced_embeddings
+from src.warmup import warm_embeddings, warm_vector_store
+
 logger = logging.getLogger(__name__)
 
 
@@ -58,8 +63,13 @@ class JournalContextRetrieverTool(BaseTool):
     def _initialize_dependencies(self) -> bool:
         if self._embeddings_model is None:
             try:
-                self._embeddings_model = FastEmbedEmbeddings(
-                    model_name=self.embedding_model_name
+                self._embeddings_model = traced_embeddings(
+                    with_embeddings_cassette(
+                        lambda: worker_embeddings(self.embedding_model_name)
+                        or warm_embeddings(self.embedding_model_name)
+                        or FastEmbedEmbeddings(model_name=self.embedding_model_name),
+                        self.embedding_model_name,
+                    )
                 )
                 logger.info(
                     "Tool T1: FastEmbedEmbeddings initialized with model %s",
@@ -89,8 +99,11 @@ class JournalContextRetrieverTool(BaseTool):
                 )
                 return False
             try:
+                # Index préchargé par le warm-up s'il est encore à jour.
                 # Note: allow_dangerous_deserialization=True est important pour FAISS avec pickle
-                self._vector_store = FAISS.load_local(
+                self._vector_store = warm_vector_store(
+                    self.vector_store_path, self._embeddings_model
+                ) or FAISS.load_local(
                     self.vector_store_path,
                     self._embeddings_model,
                     allow_dangerous_deserialization=True,
@@ -0,0 +1,305 @@
+# src/tools/t2_example_thesis_retriever.py
+import bisect
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Any
+
+from langchain_community.embeddings import FastEmbedEmbeddings
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.pydantic_v1 import BaseModel, Field, PrivateAttr
+from langchain_core.tools import BaseTool
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from src.cassette import with_embeddings_cassette
+from src.embedding_worker import worker_embeddings
+from src.fingerprints import stable_fingerprint
+from src.tracing import traced_embeddings
+from src.warmup import warm_embeddings
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter si la stratégie de découpage change : l'index est alors reconstruit.
+EXAMPLE_CHUNKER_VERSION = "1"
+VERSION_FILE_NAME = "version.json"
+HEADING_PATTERN = re.compile(r"^#{1,6}\s+(.+?)\s*$", re.MULTILINE)
+EXAMPLE_SEPARATORS = ["\n## ", "\n### ", "\n#### ", "\n\n", "\n", ". ", " ", ""]
+
+
+def example_index_version(
+    example_text: str, embedding_model_name: str, chunk_size: int, chunk_overlap: int
+) -> str:
+    """Empreinte de l'index : texte de l'exemple, modèle d'embedding et découpage."""
+    return stable_fingerprint(
+        EXAMPLE_CHUNKER_VERSION,
+        example_text,
+        embedding_model_name,
+        chunk_size,
+        chunk_overlap,
+    )
+
+
+def read_example_index_version(index_path: str) -> str | None:
+    """Lit la version de l'index d'exemple sur disque (None si absent/incomplet)."""
+    path = Path(index_path)
+    if not (path / "index.faiss").exists() or not (path / "index.pkl").exists():
+        return None
+    try:
+        return json.loads((path / VERSION_FILE_NAME).read_text(encoding="utf-8"))[
+            "version"
+        ]
+    except Exception:  # noqa: BLE001
+        return None
+
+
+def chunk_example_thesis(
+    example_text: str, chunk_size: int, chunk_overlap: int
+) -> list[Document]:
+    """
+    Découpe l'exemple de thèse en passages, en privilégiant les titres Markdown.
+
+    Chaque passage porte dans ses métadonnées le dernier titre rencontré
+    (`heading`), son rang (`chunk_index`) et sa position (`start_index`).
+    """
+    splitter = RecursiveCharacterTextSplitter(
+        separators=EXAMPLE_SEPARATORS,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        add_start_index=True,
+    )
+    headings = [(m.start(), m.group(1)) for m in HEADING_PATTERN.finditer(example_text)]
+    heading_positions = [position for position, _ in headings]
+
+    documents = splitter.create_documents([example_text])
+    for chunk_index, document in enumerate(documents):
+        start_index = document.metadata.get("start_index", 0)
+        # Un passage qui commence par un titre est rattaché à ce titre.
+        heading_idx = bisect.bisect_right(heading_positions, start_index + 1) - 1
+        document.metadata.update(
+            {
+                "source_document": "example_thesis",
+                "chunk_index": chunk_index,
+                "chunk_id": f"example_chunk{chunk_index}",
+                "heading": headings[heading_idx][1] if heading_idx >= 0 else None,
+            }
+        )
+    return documents
+
+
+def build_example_thesis_index(
+    example_text: str,
+    index_path: str,
+    embedding_model_name: str,
+    chunk_size: int = 800,
+    chunk_overlap: int = 100,
+    force: bool = False,
+) -> str | None:
+    """
+    Construit (ou réutilise) l'index FAISS des passages de l'exemple de thèse.
+
+    L'index n'est reconstruit que si sa version (voir `example_index_version`)
+    diffère de celle enregistrée sur disque, ou si `force` est vrai.
+
+    Returns:
+        La version de l'index disponible, ou None en cas d'échec.
+    """
+    version = example_index_version(
+        example_text, embedding_model_name, chunk_size, chunk_overlap
+    )
+    if not force and read_example_index_version(index_path) == version:
+        logger.info("T2: Index de l'exemple à jour (version %s).", version[:12])
+        return version
+
+    documents = chunk_example_thesis(example_text, chunk_size, chunk_overlap)
+    if not documents:
+        logger.warning("T2: Exemple de thèse vide, index non construit.")
+        return None
+    try:
+        embeddings = traced_embeddings(
+            with_embeddings_cassette(
+                lambda: worker_embeddings(embedding_model_name)
+                or warm_embeddings(embedding_model_name)
+                or FastEmbedEmbeddings(model_name=embedding_model_name),
+                embedding_model_name,
+            )
+        )
+        db = FAISS.from_documents(documents, embeddings)
+        path = Path(index_path)
+        path.mkdir(parents=True, exist_ok=True)
+        db.save_local(folder_path=str(path))
+        (path / VERSION_FILE_NAME).write_text(
+            json.dumps(
+                {
+                    "version": version,
+                    "embedding_model_name": embedding_model_name,
+                    "chunk_size": chunk_size,
+                    "chunk_overlap": chunk_overlap,
+                    "chunk_count": len(documents),
+                }
+            ),
+            encoding="utf-8",
+        )
+    except Exception as e:  # noqa: BLE001
+        logger.error("T2: Échec construction index exemple: %s", e, exc_info=True)
+        return None
+    logger.info(
+        "T2: Index de l'exemple construit (%d passages) à %s.",
+        len(documents),
+        index_path,
+    )
+    return version
+
+
+def format_example_passages(excerpts: list[dict[str, Any]]) -> str:
+    """Formate des passages d'exemple pour un prompt, avec leur titre d'origine."""
+    blocks = []
+    for excerpt in excerpts:
+        heading = (excerpt.get("metadata") or {}).get("heading")
+        prefix = f"[{heading}]\n" if heading else ""
+        blocks.append(f"{prefix}{excerpt['text']}")
+    return "\n\n---\n\n".join(blocks)
+
+
+class ExampleThesisRetrieverArgs(BaseModel):
+    """Input arguments for ExampleThesisRetrieverTool."""
+
+    query: str = Field(description="Section ou partie à illustrer par un modèle.")
+    k_retrieval_count: int = Field(default=2, ge=1, le=10)
+
+
+class ExampleThesisRetrieverTool(BaseTool):
+    name: str = "example_thesis_retriever"
+    description: str = (
+        "Récupère les passages de l'exemple de thèse (Digi5) les plus proches "
+        "d'une section ou d'une partie, comme modèles de style et de structure."
+    )
+    args_schema: type[BaseModel] = ExampleThesisRetrieverArgs
+
+    index_path: str
+    embedding_model_name: str
+
+    _vector_store: FAISS | None = PrivateAttr(default=None)
+
+    def _load_store(self) -> bool:
+        if self._vector_store is not None:
+            return True
+        if read_example_index_version(self.index_path) is None:
+            logger.warning("Tool T2: Index de l'exemple absent à %s", self.index_path)
+            return False
+        try:
+            self._vector_store = FAISS.load_local(
+                self.index_path,
+                traced_embeddings(
+                    with_embeddings_cassette(
+                        lambda: worker_embeddings(self.embedding_model_name)
+                        or warm_embeddings(self.embedding_model_name)
+                        or FastEmbedEmbeddings(model_name=self.embedding_model_name),
+                        self.embedding_model_name,
+                    )
+                ),
+                allow_dangerous_deserialization=True,
+            )
+        except Exception as e:  # noqa: BLE001
+            logger.error(
+                "Tool T2: Erreur chargement index %s: %s",
+                self.index_path,
+                e,
+                exc_info=True,
+            )
+            return False
+        return True
+
+    def retrieve_many(
+        self, queries: list[str], k_per_query: int, max_passages: int
+    ) -> list[dict[str, Any]]:
+        """
+        Récupère les passages pour plusieurs requêtes, sans doublons.
+
+        Les passages sont renvoyés dans l'ordre du texte de l'exemple.
+        """
+        seen: dict[str, dict[str, Any]] = {}
+        for query in queries:
+            for excerpt in self._run(query=query, k_retrieval_count=k_per_query):
+                if "error" in excerpt:
+                    continue
+                chunk_id = excerpt["metadata"].get("chunk_id", excerpt["text"])
+                if chunk_id not in seen:
+                    seen[chunk_id] = excerpt
+        best = sorted(seen.values(), key=lambda e: e["score"])[:max_passages]
+        return sorted(best, key=lambda e: e["metadata"].get("chunk_index", 0))
+
+    def _run(self, query: str, k_retrieval_count: int = 2) -> list[dict[str, Any]]:
+        if not self._load_store():
+            return [{"error": "Index de l'exemple de thèse non disponible."}]
+        try:
+            results = self._vector_store.similarity_search_with_score(
+                query, k=k_retrieval_count
+            )
+        except Exception as e:  # noqa: BLE001
+            logger.error("Tool T2: Erreur recherche pour '%s': %s", query, e)
+            return [{"error": "Erreur lors de la recherche.", "details": str(e)}]
+        logger.debug("Tool T2: %d passages pour '%s'", len(results), query)
+        return [
+            {"text": doc.page_content, "metadata": doc.metadata, "score": float(score)}
+            for doc, score in results
+        ]
+
+    async def _arun(
+        self, query: str, k_retrieval_count: int = 2
+    ) -> list[dict[str, Any]]:
+        return self._run(query=query, k_retrieval_count=k_retrieval_count)
+
+
+_RETRIEVERS: dict[tuple[str, str, str], ExampleThesisRetrieverTool] = {}
+
+
+def get_example_thesis_retriever(
+    index_path: str | None,
+    embedding_model_name: str | None,
+    expected_version: str | None = None,
+) -> ExampleThesisRetrieverTool | None:
+    """
+    Retourne un outil T2 partagé pour l'index donné, ou None s'il est absent.
+
+    L'outil (et donc l'index chargé en mémoire) est réutilisé entre les appels
+    tant que la version de l'index sur disque ne change pas. Si
+    `expected_version` est fourni, un index d'une autre version est ignoré.
+    """
+    if not index_path or not embedding_model_name:
+        return None
+    version = read_example_index_version(index_path)
+    if version is None or (expected_version and version != expected_version):
+        return None
+    key = (index_path, version, embedding_model_name)
+    if key not in _RETRIEVERS:
+        _RETRIEVERS[key] = ExampleThesisRetrieverTool(
+            index_path=index_path, embedding_model_name=embedding_model_name
+        )
+    return _RETRIEVERS[key]
+
+
+def retrieve_example_passages(
+    index_path: str | None,
+    index_version: str | None,
+    embedding_model_name: str | None,
+    queries: list[str],
+    k_per_query: int,
+    max_passages: int,
+) -> str | None:
+    """
+    Retourne les passages d'exemple formatés pour les requêtes données.
+
+    Retourne None si l'index n'est pas disponible ou si aucun passage n'est
+    trouvé, pour que l'appelant puisse se rabattre sur un autre contenu.
+    """
+    if not index_version:
+        return None
+    retriever = get_example_thesis_retriever(
+        index_path, embedding_model_name, expected_version=index_version
+    )
+    if retriever is None or not queries:
+        return None
+    excerpts = retriever.retrieve_many(queries, k_per_query, max_passages)
+    return format_example_passages(excerpts) if excerpts else None
@@ -0,0 +1,305 @@
+# src/tracing.py
+import inspect
+import json
+import logging
+import os
+import resource
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.embeddings import Embeddings
+from langchain_core.outputs import LLMResult
+from langchain_core.tracers.context import register_configure_hook
+from langgraph.serde.jsonplus import JsonPlusSerializer
+
+from src.config import settings
+from src.run_config import thread_id_from_config
+from src.state import AgentState
+
+logger = logging.getLogger(__name__)
+
+_serializer = JsonPlusSerializer()
+
+
+def current_rss_bytes() -> int:
+    """Mémoire résidente du processus (Linux : /proc, sinon pic `ru_maxrss`)."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class JsonlTraceSink:
+    """Écrit chaque span comme une ligne JSON dans un fichier local."""
+
+    def __init__(self, path: str):
+        """Initialise le sink (le fichier est créé à la première écriture)."""
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def emit(self, spans: list[dict[str, Any]]) -> None:
+        """Ajoute les spans d'une exécution de nœud au fichier."""
+        lines = "".join(
+            json.dumps(span, ensure_ascii=False, default=str) + "\n" for span in spans
+        )
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(lines)
+
+
+class OpenTelemetryTraceSink:
+    """
+    Exporte les spans via l'API OpenTelemetry (dépendance optionnelle).
+
+    Le fournisseur et l'exportateur (OTLP, console...) sont configurés par
+    l'application, p. ex. via `opentelemetry-instrument`.
+    """
+
+    def __init__(self):
+        """Récupère le tracer OpenTelemetry ; ImportError si le paquet manque."""
+        try:
+            from opentelemetry import trace
+        except ImportError as e:
+            raise ImportError(
+                "tracing_exporter='otel' requiert le paquet `opentelemetry-sdk`."
+            ) from e
+        self._trace = trace
+        self._tracer = trace.get_tracer("agent_vf")
+
+    def _start_span(self, span: dict[str, Any], context: Any = None) -> Any:
+        start_ns = int(span["start_unix_s"] * 1e9)
+        attributes = {
+            key: value
+            for key, value in span.items()
+            if isinstance(value, str | int | float | bool) and key != "name"
+        }
+        otel_span = self._tracer.start_span(
+            span["name"], context=context, start_time=start_ns, attributes=attributes
+        )
+        otel_span.end(end_time=start_ns + int(span["wall_s"] * 1e9))
+        return otel_span
+
+    def emit(self, spans: list[dict[str, Any]]) -> None:
+        """Crée a posteriori le span du nœud puis ses spans enfants."""
+        node_span, *children = spans
+        parent = self._trace.set_span_in_context(self._start_span(node_span))
+        for child in children:
+            self._start_span(child, parent)
+
+
+class _SpanContext:
+    """Span de nœud en cours : collecte les spans enfants (LLM, embeddings)."""
+
+    def __init__(self, span_id: str, base: dict[str, Any]):
+        self.span_id = span_id
+        self.base = base
+        self.children: list[dict[str, Any]] = []
+        self.llm_starts: dict[UUID, float] = {}
+        self._lock = threading.Lock()
+
+    def add_child(self, name: str, started_at: float, **attributes: Any) -> None:
+        wall_s = time.perf_counter() - started_at
+        child = {
+            **self.base,
+            "span_id": uuid.uuid4().hex,
+            "parent_id": self.span_id,
+            "name": name,
+            "start_unix_s": time.time() - wall_s,
+            "wall_s": wall_s,
+            **attributes,
+        }
+        with self._lock:
+            self.children.append(child)
+
+
+_current_span: ContextVar[_SpanContext | None] = ContextVar(
+    "agent_vf_current_span", default=None
+)
+
+
+class LLMSpanHandler(BaseCallbackHandler):
+    """Callback LangChain : un span enfant par appel LLM (tokens Ollama)."""
+
+    def __init__(self, span: _SpanContext):
+        """Attache le handler au span de nœud courant."""
+        self.span = span
+
+    def on_chat_model_start(
+        self, serialized: dict[str, Any], messages: Any, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        """Note l'heure de début de l'appel."""
+        self.span.llm_starts[run_id] = time.perf_counter()
+
+    def on_llm_start(
+        self, serialized: dict[str, Any], prompts: Any, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        """Note l'heure de début de l'appel (modèles non-chat)."""
+        self.span.llm_starts[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        """Émet le span enfant avec les compteurs de tokens d'Ollama."""
+        started_at = self.span.llm_starts.pop(run_id, time.perf_counter())
+        info: dict[str, Any] = {}
+        if response.generations and response.generations[0]:
+            info = response.generations[0][0].generation_info or {}
+        self.span.add_child(
+            "llm",
+            started_at,
+            model=info.get("model"),
+            prompt_tokens=info.get("prompt_eval_count"),
+            completion_tokens=info.get("eval_count"),
+        )
+
+
+_llm_span_handler: ContextVar[LLMSpanHandler | None] = ContextVar(
+    "agent_vf_llm_span_handler", default=None
+)
+register_configure_hook(_llm_span_handler, inheritable=True)
+
+
+class TracedEmbeddings(Embeddings):
+    """Embeddings comptés comme spans enfants du nœud en cours."""
+
+    def __init__(self, embeddings: Embeddings):
+        """Enveloppe les embeddings donnés."""
+        self.embeddings = embeddings
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Embeddings d'un lot de documents (span `embedding`)."""
+        started_at = time.perf_counter()
+        vectors = self.embeddings.embed_documents(texts)
+        span = _current_span.get()
+        if span is not None:
+            span.add_child("embedding", started_at, texts=len(texts))
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        """Embedding d'une requête (span `embedding`)."""
+        started_at = time.perf_counter()
+        vector = self.embeddings.embed_query(text)
+        span = _current_span.get()
+        if span is not None:
+            span.add_child("embedding", started_at, texts=1)
+        return vector
+
+
+class TracedNode:
+    """
+    Enveloppe `node.run` et émet un span structuré par exécution.
+
+    Le span contient le nœud, le `thread_id`, la section courante, les temps
+    réel et CPU (thread), la variation de RSS et la taille sérialisée des
+    écritures du nœud dans le checkpoint. Les appels LLM (tokens) et
+    d'embedding effectués pendant l'exécution sont émis comme spans enfants.
+    """
+
+    def __init__(self, node: Any, node_name: str, sink: Any):
+        """Initialise l'enveloppe autour de `node.run`."""
+        self.node = node
+        self.node_name = node_name
+        self.sink = sink
+        self._accepts_config = "config" in inspect.signature(node.run).parameters
+
+    def run(
+        self, state: AgentState, config: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """Exécute le nœud et émet ses spans."""
+        span = _SpanContext(
+            uuid.uuid4().hex,
+            {"thread_id": thread_id_from_config(config), "node": self.node_name},
+        )
+        span_token = _current_span.set(span)
+        handler_token = _llm_span_handler.set(LLMSpanHandler(span))
+        start_unix_s = time.time()
+        started_at = time.perf_counter()
+        cpu_started_at = time.thread_time()
+        rss_before = current_rss_bytes()
+        status, error, result = "ok", None, {}
+        try:
+            result = (
+                self.node.run(state, config)
+                if self._accepts_config
+                else self.node.run(state)
+            )
+            return result
+        except Exception as e:
+            status, error = "error", repr(e)
+            raise
+        finally:
+            _llm_span_handler.reset(handler_token)
+            _current_span.reset(span_token)
+            node_span = {
+                **span.base,
+                "span_id": span.span_id,
+                "parent_id": None,
+                "name": self.node_name,
+                "section_id": (result or {}).get(
+                    "current_section_id", state.current_section_id
+                ),
+                "start_unix_s": start_unix_s,
+                "start_time": datetime.fromtimestamp(start_unix_s, UTC).isoformat(),
+                "wall_s": time.perf_counter() - started_at,
+                "cpu_s": time.thread_time() - cpu_started_at,
+                "rss_delta_bytes": current_rss_bytes() - rss_before,
+                "checkpoint_bytes": self._checkpoint_bytes(result),
+                "llm_calls": sum(1 for c in span.children if c["name"] == "llm"),
+                "status": status,
+                "error": error,
+            }
+            self._emit([node_span, *span.children])
+
+    @staticmethod
+    def _checkpoint_bytes(result: dict[str, Any] | None) -> int | None:
+        if not result:
+            return 0
+        try:
+            return len(_serializer.dumps(result))
+        except Exception:  # noqa: BLE001
+            return None
+
+    def _emit(self, spans: list[dict[str, Any]]) -> None:
+        # Le tracing ne doit jamais faire échouer le graphe
+        try:
+            self.sink.emit(spans)
+        except Exception as e:  # noqa: BLE001
+            logger.warning(
+                "Tracing: échec d'émission des spans de %s: %s", spans[0]["name"], e
+            )
+
+
+_sink: Any | None = None
+_sink_lock = threading.Lock()
+
+
+def get_trace_sink() -> Any | None:
+    """Sink configuré par les settings (None si le tracing est désactivé)."""
+    global _sink
+    if not settings.tracing_enabled:
+        return None
+    with _sink_lock:
+        if _sink is None:
+            if settings.tracing_exporter == "otel":
+                _sink = OpenTelemetryTraceSink()
+            else:
+                _sink = JsonlTraceSink(settings.tracing_path)
+        return _sink
+
+
+def trace_node(node: Any, node_name: str) -> Any:
+    """Applique `TracedNode` si le tracing est activé, sinon retourne le nœud."""
+    sink = get_trace_sink()
+    return node if sink is None else TracedNode(node, node_name, sink)
+
+
+def traced_embeddings(embeddings: Embeddings) -> Embeddings:
+    """Enveloppe des embeddings pour le tracing (inchangés si désactivé)."""
+    return embeddings if not settings.tracing_enabled else TracedEmbeddings(embeddings)
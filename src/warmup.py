@@ -0,0 +1,272 @@
+# src/warmup.py
+import copy
+import inspect
+import json
+import logging
+import threading
+import time
+import urllib.request
+from collections.abc import Callable
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from pathlib import Path
+from typing import Any
+
+from src.config import settings
+from src.embedding_worker import worker_embeddings
+from src.node_memoization import path_fingerprint
+from src.state import AgentState
+
+logger = logging.getLogger(__name__)
+
+
+def _default_embeddings_factory(model_name: str) -> Any:
+    from langchain_community.embeddings import FastEmbedEmbeddings
+
+    # Avec un worker d'embedding actif, rien à charger dans ce processus
+    return worker_embeddings(model_name) or FastEmbedEmbeddings(model_name=model_name)
+
+
+def _default_vector_store_loader(path: str, embeddings: Any) -> Any:
+    from langchain_community.vectorstores import FAISS
+
+    return FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True)
+
+
+def preload_ollama_model(
+    base_url: str, model_name: str, keep_alive: str, timeout_s: float
+) -> None:
+    """Demande à Ollama de charger `model_name` en mémoire (requête sans prompt)."""
+    payload = json.dumps(
+        {"model": model_name, "keep_alive": keep_alive, "stream": False}
+    ).encode("utf-8")
+    request = urllib.request.Request(  # noqa: S310 (URL issue des settings)
+        f"{base_url.rstrip('/')}/api/generate",
+        data=payload,
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=timeout_s) as response:  # noqa: S310
+        response.read()
+
+
+class Warmup:
+    """
+    Chargements à froid lancés en arrière-plan au démarrage d'un thread (N0).
+
+    Trois tâches s'exécutent pendant N0-N2 : chargement du modèle d'embedding
+    partagé, puis de l'index FAISS existant (qui en dépend), et préchargement
+    du modèle Ollama avec `keep_alive`. Les nœuds attendent la tâche dont ils
+    ont besoin (`embeddings`, `vector_store`) au lieu de payer le chargement ;
+    en cas d'échec ou de délai dépassé, ils chargent eux-mêmes comme avant.
+    """
+
+    def __init__(
+        self,
+        embedding_model_name: str | None,
+        vector_store_path: str | None = None,
+        llm_model_name: str | None = None,
+        ollama_base_url: str | None = None,
+        keep_alive: str = "30m",
+        wait_timeout_s: float = 120.0,
+        embeddings_factory: Callable[[str], Any] = _default_embeddings_factory,
+        vector_store_loader: Callable[[str, Any], Any] = _default_vector_store_loader,
+    ):
+        """Prépare les tâches ; rien n'est chargé avant `start`."""
+        self.embedding_model_name = embedding_model_name
+        self.vector_store_path = vector_store_path
+        self.llm_model_name = llm_model_name
+        self.ollama_base_url = ollama_base_url
+        self.keep_alive = keep_alive
+        self.wait_timeout_s = wait_timeout_s
+        self.embeddings_factory = embeddings_factory
+        self.vector_store_loader = vector_store_loader
+        self._embeddings: Future = Future()
+        self._vector_store: Future = Future()
+        self._ollama: Future = Future()
+        self._vector_store_fingerprint: Any = None
+        self.durations_s: dict[str, float] = {}
+
+    def start(self) -> "Warmup":
+        """Lance les tâches dans des threads démons."""
+        threading.Thread(
+            target=self._load_embeddings_then_store,
+            name="warmup-embeddings",
+            daemon=True,
+        ).start()
+        if self.llm_model_name and self.ollama_base_url:
+            threading.Thread(
+                target=self._run,
+                args=("ollama", self._ollama, self._preload_ollama),
+                name="warmup-ollama",
+                daemon=True,
+            ).start()
+        else:
+            self._ollama.set_result(None)
+        return self
+
+    def _run(self, name: str, future: Future, task: Callable[[], Any]) -> None:
+        started_at = time.perf_counter()
+        try:
+            result = task()
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Warm-up %s: échec (%s), chargement à la demande.", name, e)
+            future.set_exception(e)
+            return
+        self.durations_s[name] = time.perf_counter() - started_at
+        logger.info("Warm-up %s: prêt en %.2fs", name, self.durations_s[name])
+        future.set_result(result)
+
+    def _load_embeddings_then_store(self) -> None:
+        if not self.embedding_model_name:
+            self._embeddings.set_result(None)
+            self._vector_store.set_result(None)
+            return
+        self._run(
+            "embeddings",
+            self._embeddings,
+            lambda: self.embeddings_factory(self.embedding_model_name),
+        )
+        self._run("vector_store", self._vector_store, self._load_vector_store)
+
+    def _load_vector_store(self) -> Any:
+        path = self.vector_store_path
+        if not path or not (Path(path) / "index.faiss").is_file():
+            return None
+        embeddings = self._embeddings.result()
+        self._vector_store_fingerprint = path_fingerprint(path)
+        return self.vector_store_loader(path, embeddings)
+
+    def _preload_ollama(self) -> None:
+        preload_ollama_model(
+            self.ollama_base_url,
+            self.llm_model_name,
+            self.keep_alive,
+            timeout_s=self.wait_timeout_s,
+        )
+
+    def _wait(self, future: Future) -> Any:
+        try:
+            return future.result(timeout=self.wait_timeout_s)
+        except FutureTimeoutError:
+            logger.warning("Warm-up: délai d'attente dépassé, chargement à la demande.")
+            return None
+        except Exception:  # noqa: BLE001
+            # Échec déjà journalisé par la tâche : l'appelant charge lui-même
+            return None
+
+    def embeddings(self, model_name: str) -> Any | None:
+        """Modèle d'embedding préchargé (attend la fin du chargement), ou None."""
+        if model_name != self.embedding_model_name:
+            return None
+        return self._wait(self._embeddings)
+
+    def vector_store(self, path: str, embeddings: Any) -> Any | None:
+        """
+        Index FAISS préchargé pour `path`, ou None.
+
+        L'index n'est rendu que si ses fichiers n'ont pas changé depuis le
+        chargement (N2 a pu le reconstruire entre-temps). La copie retournée
+        partage l'index mais interroge avec les `embeddings` de l'appelant.
+        """
+        if (
+            not self.vector_store_path
+            or Path(path).resolve() != Path(self.vector_store_path).resolve()
+        ):
+            return None
+        store = self._wait(self._vector_store)
+        if store is None or path_fingerprint(path) != self._vector_store_fingerprint:
+            return None
+        store = copy.copy(store)
+        store.embedding_function = embeddings
+        return store
+
+
+_active_warmup: Warmup | None = None
+_active_warmup_key: tuple[Any, ...] | None = None
+_active_warmup_lock = threading.Lock()
+
+
+def start_warmup(state: AgentState | None = None) -> Warmup | None:
+    """
+    Lance le warm-up pour les modèles et l'index du thread (None si désactivé).
+
+    Les valeurs de `state` priment sur les settings, comme dans N0. Un
+    warm-up déjà lancé pour les mêmes modèles et le même index est réutilisé.
+    """
+    global _active_warmup, _active_warmup_key
+    if not settings.warmup_enabled:
+        return None
+    state = state or AgentState()
+    # En rejeu de cassette, ni le modèle d'embedding ni Ollama ne sont utilisés
+    replaying = settings.cassette_mode == "replay"
+    key = (
+        None
+        if replaying
+        else state.embedding_model_name or settings.embedding_model_name,
+        state.vector_store_path or settings.vector_store_directory,
+        None if replaying else state.llm_model_name or settings.llm_model_name,
+    )
+    with _active_warmup_lock:
+        if _active_warmup is not None and _active_warmup_key == key:
+            return _active_warmup
+        embedding_model_name, vector_store_path, llm_model_name = key
+        _active_warmup = Warmup(
+            embedding_model_name=embedding_model_name,
+            vector_store_path=vector_store_path,
+            llm_model_name=llm_model_name,
+            ollama_base_url=settings.ollama_base_url,
+            keep_alive=settings.warmup_ollama_keep_alive,
+            wait_timeout_s=settings.warmup_wait_timeout_s,
+        ).start()
+        _active_warmup_key = key
+    logger.info("Warm-up lancé en arrière-plan.")
+    return _active_warmup
+
+
+class WarmupOnRun:
+    """
+    Enveloppe le nœud d'entrée du graphe (N0) pour lancer le warm-up.
+
+    Le warm-up ne démarre que lorsqu'un thread démarre réellement : construire
+    le graphe, ou le reprendre pour répondre à une interruption N8, ne charge
+    ni fastembed, ni l'index FAISS, ni le modèle Ollama.
+    """
+
+    def __init__(self, node: Any):
+        """Initialise l'enveloppe autour de `node.run`."""
+        self.node = node
+        self._accepts_config = "config" in inspect.signature(node.run).parameters
+
+    def __getattr__(self, name: str) -> Any:
+        """Délègue au nœud enveloppé."""
+        return getattr(self.node, name)
+
+    def run(
+        self, state: AgentState, config: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """Lance le warm-up du thread puis exécute le nœud."""
+        start_warmup(state)
+        if self._accepts_config:
+            return self.node.run(state, config)
+        return self.node.run(state)
+
+
+def warmup_on_run(node: Any) -> Any:
+    """Applique `WarmupOnRun` si le warm-up est activé, sinon retourne le nœud."""
+    if not settings.warmup_enabled:
+        return node
+    return WarmupOnRun(node)
+
+
+def warm_embeddings(model_name: str) -> Any | None:
+    """Modèle d'embedding du warm-up actif, ou None (l'appelant le construit)."""
+    if _active_warmup is None:
+        return None
+    return _active_warmup.embeddings(model_name)
+
+
+def warm_vector_store(path: str, embeddings: Any) -> Any | None:
+    """Index FAISS du warm-up actif, ou None (l'appelant le charge)."""
+    if _active_warmup is None:
+        return None
+    return _active_warmup.vector_store(path, embeddings)
@@ -1,4 +1,5 @@
 # tests/nodes/test_n2_rag_parts.py
+import json
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -6,6 +7,7 @@ import pytest
 from langchain_core.documents import Document
 
 from src.config import settings
+from src.fingerprints import stable_fingerprint
 from src.nodes.n2_journal_ingestor_anonymizer import (
     N2JournalIngestorAnonymizerNode,
     _load_raw_journal_entries_from_files,
@@ -285,3 +287,86 @@ def test_save_or_update_faiss_store_embedding_init_error(
         [Document(page_content="test")], str(temp_vector_store_dir), "bad_model", True
     )
     assert success is False
+
+
+@patch("src.nodes.n2_journal_ingestor_anonymizer.FAISS")
+@patch("src.nodes.n2_journal_ingestor_anonymizer.FastEmbedEmbeddings")
+def test_save_or_update_faiss_store_indexes_generator_in_batches(
+    mock_fastembed: MagicMock,
+    mock_faiss: MagicMock,
+    n2_node_instance: N2JournalIngestorAnonymizerNode,
+    temp_vector_store_dir: Path,
+):
+    """Les chunks d'un générateur sont indexés lot par lot."""
+    docs = [Document(page_content=f"chunk {i}") for i in range(5)]
+    mock_faiss_db_instance = mock_faiss.from_documents.return_value
+
+    success = n2_node_instance._save_or_update_faiss_store(
+        (doc for doc in docs),
+        str(temp_vector_store_dir),
+        DEFAULT_EMBEDDING_MODEL_FOR_N2_TEST,
+        True,
+        batch_size=2,
+    )
+
+    assert success is True
+    mock_faiss.from_documents.assert_called_once_with(
+        docs[:2], mock_fastembed.return_value
+    )
+    assert [c.args[0] for c in mock_faiss_db_instance.add_documents.call_args_list] == [
+        docs[2:4],
+        docs[4:],
+    ]
+    mock_faiss_db_instance.save_local.assert_called_once()
+
+
+@patch("src.nodes.n2_journal_ingestor_anonymizer.FastEmbedEmbeddings")
+def test_run_streams_journal_into_index_with_summary_state(
+    mock_fastembed: MagicMock,
+    n2_node_instance: N2JournalIngestorAnonymizerNode,
+    temp_journal_dir: Path,
+    temp_vector_store_dir: Path,
+    monkeypatch,
+):
+    """run() indexe tout le journal et ne garde que des résumés dans l'état."""
+    from langchain_community.vectorstores import FAISS
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+
+    from src.state import AgentState
+
+    embeddings = DeterministicFakeEmbedding(size=8)
+    mock_fastembed.return_value = embeddings
+    monkeypatch.setattr(settings, "n2_index_batch_size", 3)
+    for day in range(1, 5):
+        create_dummy_file(
+            temp_journal_dir / f"2024-01-0{day}.txt",
+            " ".join(f"Phrase {n} du jour {day} chez ACME." for n in range(12)),
+        )
+
+    result = n2_node_instance.run(
+        AgentState(
+            journal_path=str(temp_journal_dir),
+            vector_store_path=str(temp_vector_store_dir),
+            embedding_model_name=DEFAULT_EMBEDDING_MODEL_FOR_N2_TEST,
+            recreate_vector_store=True,
+            anonymization_map={"ACME": "[ENTREPRISE]"},
+        )
+    )
+
+    summary = result["journal_ingestion_summary"]
+    manifest_file = temp_vector_store_dir / "chunk_manifest.json"
+    manifest = json.loads(manifest_file.read_text(encoding="utf-8"))
+    assert result["vector_store_initialized"] is True
+    assert summary["entries"] == 4
+    assert summary["chunks"] == len(manifest) > 4
+    assert summary["batches"] == -(-summary["chunks"] // 3)
+    assert result["journal_chunk_manifest_digest"] == stable_fingerprint(manifest)
+    assert result["processed_chunks_for_vector_store"] is None
+    assert result["raw_journal_entries"] == []
+
+    store = FAISS.load_local(
+        str(temp_vector_store_dir), embeddings, allow_dangerous_deserialization=True
+    )
+    contents = [doc.page_content for doc in store.docstore._dict.values()]
+    assert len(contents) == summary["chunks"]
+    assert all("ACME" not in text for text in contents)
@@ -1,5 +1,7 @@
 # tests/nodes/test_n3_thesis_outline_planner.py
+import json
 import logging
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -10,6 +12,7 @@ from src.nodes.n3_thesis_outline_planner import (
     PlannedSectionDetailForLLM,
     PlannedThesisOutlineForLLM,
 )
+from src.outline_cache import OutlineCache
 from src.state import AgentState, SectionDetail, SectionStatus
 
 logging.basicConfig(level=logging.INFO)
@@ -730,6 +733,220 @@ class TestN3ThesisOutlinePlannerNode(unittest.TestCase):
         assert len(updated_state_dict["thesis_outline"]) == 1
         assert updated_state_dict["thesis_outline"][0].status == SectionStatus.ERROR
 
+    @patch("src.nodes.n3_thesis_outline_planner.ChatOllama")
+    def test_outline_cache_serves_plan_without_llm_call(
+        self, mock_chat_ollama_class: MagicMock
+    ):
+        """Teste que le second appel avec les mêmes entrées est servi par le cache."""
+        mock_llm_instance = mock_chat_ollama_class.return_value
+        mock_llm_instance.with_structured_output.side_effect = NotImplementedError
+        mock_llm_instance.invoke.return_value = AIMessage(
+            content=REALISTIC_MOCK_LLM_OUTPUT.json()
+        )
+        with tempfile.TemporaryDirectory() as cache_dir:
+            planner_node_for_test = N3ThesisOutlinePlannerNode(
+                llm_model_name="mock_cache_test",
+                outline_cache=OutlineCache(cache_dir),
+            )
+            first_result = planner_node_for_test.run(self.initial_state)
+            second_result = planner_node_for_test.run(self.initial_state)
+
+            assert mock_llm_instance.invoke.call_count == 1
+            assert [s.id for s in second_result["thesis_outline"]] == [
+                s.id for s in first_result["thesis_outline"]
+            ]
+            assert "cache" in second_result["current_operation_message"]
+
+            changed_state = self.initial_state.copy(
+                update={"user_persona": "Un autre persona."}
+            )
+            planner_node_for_test.run(changed_state)
+            assert mock_llm_instance.invoke.call_count == 2
+
+    @patch("src.nodes.n3_thesis_outline_planner.retrieve_example_passages")
+    @patch("src.nodes.n3_thesis_outline_planner.ChatOllama")
+    def test_prompt_uses_indexed_example_passages_instead_of_full_text(
+        self,
+        mock_chat_ollama_class: MagicMock,
+        mock_retrieve_example_passages: MagicMock,
+    ):
+        """Teste que seuls les passages T2 pertinents sont envoyés si l'index existe."""
+        mock_retrieve_example_passages.return_value = "[1.1. L'entreprise]\nPassage."
+        state_with_index = self.initial_state.copy(
+            update={
+                "example_thesis_index_path": "data/processed/example_index",
+                "example_thesis_index_version": "v1",
+            }
+        )
+        planner_node_for_test = N3ThesisOutlinePlannerNode(
+            llm_model_name="mock_example_index_test"
+        )
+
+        prompt = planner_node_for_test._build_prompt_input(state_with_index)
+
+        assert "[1.1. L'entreprise]\nPassage." in prompt
+        assert "Gecina est une grande foncière" not in prompt
+        queries = mock_retrieve_example_passages.call_args.args[3]
+        assert len(queries) == len(self.initial_state.school_guidelines_structured)
+
+        mock_retrieve_example_passages.return_value = None
+        prompt = planner_node_for_test._build_prompt_input(state_with_index)
+        assert "Gecina est une grande foncière" in prompt
+
+    @patch("src.nodes.n3_thesis_outline_planner.ChatOllama")
+    def test_streaming_mode_yields_sections_as_objects_close(
+        self, mock_chat_ollama_class: MagicMock
+    ):
+        """Teste le mode streaming: chaque section est produite dès sa fermeture."""
+        mock_llm_instance = mock_chat_ollama_class.return_value
+        full_json = REALISTIC_MOCK_LLM_OUTPUT.json()
+        chunks = [
+            AIMessage(content=full_json[i : i + 50])
+            for i in range(0, len(full_json), 50)
+        ]
+        consumed_chunks: list[int] = []
+
+        def stream_side_effect(_prompt):
+            for i, chunk in enumerate(chunks):
+                consumed_chunks.append(i)
+                yield chunk
+
+        mock_llm_instance.stream.side_effect = stream_side_effect
+
+        planner_node_for_test = N3ThesisOutlinePlannerNode(
+            llm_model_name="mock_stream_test", planner_mode="streaming"
+        )
+        section_iterator = planner_node_for_test.stream_sections(self.initial_state)
+        first_section = next(section_iterator)
+        assert first_section.id == REALISTIC_MOCK_PLANNED_SECTIONS[0].id
+        assert first_section.status == SectionStatus.PENDING
+        assert len(consumed_chunks) < len(chunks)
+
+        updated_state_dict = planner_node_for_test.run(self.initial_state)
+        outline = updated_state_dict["thesis_outline"]
+        assert [s.id for s in outline] == [
+            s.id for s in REALISTIC_MOCK_PLANNED_SECTIONS
+        ]
+        assert updated_state_dict.get("error_message") is None
+        mock_llm_instance.invoke.assert_not_called()
+
+    @patch("src.nodes.n3_thesis_outline_planner.ChatOllama")
+    def test_streaming_mode_skips_invalid_objects(
+        self, mock_chat_ollama_class: MagicMock
+    ):
+        """Teste que le streaming ignore une section invalide sans perdre les autres."""
+        mock_llm_instance = mock_chat_ollama_class.return_value
+        valid_section = REALISTIC_MOCK_PLANNED_SECTIONS[0].json()
+        stream_content = f'{{"outline": [{{"title": "Incomplete"}}, {valid_section}]}}'
+        mock_llm_instance.stream.return_value = iter(
+            [AIMessage(content=stream_content)]
+        )
+
+        planner_node_for_test = N3ThesisOutlinePlannerNode(
+            llm_model_name="mock_stream_invalid", planner_mode="streaming"
+        )
+        updated_state_dict = planner_node_for_test.run(self.initial_state)
+        assert len(updated_state_dict["thesis_outline"]) == 1
+        assert updated_state_dict["thesis_outline"][0].status == SectionStatus.PENDING
+
+    @patch("src.nodes.n3_thesis_outline_planner.ChatOllama")
+    def test_streaming_mode_does_not_cache_outline_with_dropped_sections(
+        self, mock_chat_ollama_class: MagicMock
+    ):
+        """Teste qu'un plan streamé incomplet est signalé et n'est pas caché."""
+        mock_llm_instance = mock_chat_ollama_class.return_value
+        valid_section = REALISTIC_MOCK_PLANNED_SECTIONS[0].json()
+        stream_content = (
+            f'{{"outline": [{valid_section}, {{"id": "1.2.", "title": "Incomplete"}}]}}'
+        )
+        mock_llm_instance.stream.side_effect = lambda _prompt: iter(
+            [AIMessage(content=stream_content)]
+        )
+        with tempfile.TemporaryDirectory() as cache_dir:
+            planner_node_for_test = N3ThesisOutlinePlannerNode(
+                llm_model_name="mock_stream_cache",
+                planner_mode="streaming",
+                outline_cache=OutlineCache(cache_dir),
+            )
+            first_result = planner_node_for_test.run(self.initial_state)
+            second_result = planner_node_for_test.run(self.initial_state)
+
+        assert "1.2." in first_result["error_details"]
+        assert len(first_result["thesis_outline"]) == 1
+        assert mock_llm_instance.stream.call_count == 2
+        assert "cache" not in second_result["current_operation_message"]
+
+    @patch("src.nodes.n3_thesis_outline_planner.ChatOllama")
+    def test_two_phase_mode_expands_parts_and_retries_only_failing_part(
+        self, mock_chat_ollama_class: MagicMock
+    ):
+        """Teste le mode deux phases: parties, puis sous-sections par partie."""
+        parts = [s for s in REALISTIC_MOCK_PLANNED_SECTIONS if s.level == 1][:2]
+        subsection = REALISTIC_MOCK_PLANNED_SECTIONS[0].copy(
+            update={"id": f"{parts[1].id}1.", "title": "Sous-section", "level": 2}
+        )
+        calls_per_part: dict[str, int] = {}
+
+        def invoke_side_effect(prompt):
+            if "Phase 1" in prompt:
+                return AIMessage(
+                    content=PlannedThesisOutlineForLLM(outline=parts).json()
+                )
+            part_id = parts[0].id if f"- id : {parts[0].id}" in prompt else parts[1].id
+            calls_per_part[part_id] = calls_per_part.get(part_id, 0) + 1
+            if part_id == parts[1].id and calls_per_part[part_id] == 1:
+                return AIMessage(content='{"outline": [{"title": "Incomplet"}]}')
+            children = [subsection] if part_id == parts[1].id else []
+            return AIMessage(
+                content=PlannedThesisOutlineForLLM(outline=children).json()
+            )
+
+        mock_llm_instance = mock_chat_ollama_class.return_value
+        mock_llm_instance.invoke.side_effect = invoke_side_effect
+
+        planner_node_for_test = N3ThesisOutlinePlannerNode(
+            llm_model_name="mock_two_phase", planner_mode="two_phase"
+        )
+        updated_state_dict = planner_node_for_test.run(self.initial_state)
+
+        outline = updated_state_dict["thesis_outline"]
+        assert [s.id for s in outline] == [parts[0].id, parts[1].id, subsection.id]
+        assert calls_per_part == {parts[0].id: 1, parts[1].id: 2}
+        assert updated_state_dict.get("error_message") is None
+        assert updated_state_dict.get("error_details") is None
+
+    @patch("src.nodes.n3_thesis_outline_planner.ChatOllama")
+    def test_constrained_mode_repairs_json_and_retries_only_invalid_section(
+        self, mock_chat_ollama_class: MagicMock
+    ):
+        """Teste le mode contraint: schéma passé à Ollama, réparation ciblée."""
+        valid_sections = [s.dict() for s in REALISTIC_MOCK_PLANNED_SECTIONS[:2]]
+        truncated_output = json.dumps(
+            {"outline": [valid_sections[0], {"id": "0.2.", "title": "Sommaire"}]}
+        )[:-3]
+        mock_llm_instance = mock_chat_ollama_class.return_value
+        mock_llm_instance.invoke.side_effect = [
+            AIMessage(content=truncated_output),
+            AIMessage(content=json.dumps(valid_sections[1])),
+        ]
+
+        planner_node_for_test = N3ThesisOutlinePlannerNode(
+            llm_model_name="mock_constrained", planner_mode="constrained"
+        )
+        updated_state_dict = planner_node_for_test.run(self.initial_state)
+
+        outline = updated_state_dict["thesis_outline"]
+        assert [s.id for s in outline] == ["0.1.", "0.2."]
+        assert outline[1].title == REALISTIC_MOCK_PLANNED_SECTIONS[1].title
+        assert updated_state_dict.get("error_message") is None
+        assert mock_llm_instance.invoke.call_count == 2
+        outline_format = mock_llm_instance.invoke.call_args_list[0].kwargs["format"]
+        assert "outline" in outline_format["properties"]
+        assert "definitions" not in outline_format
+        section_call = mock_llm_instance.invoke.call_args_list[1]
+        assert "0.2." in section_call.args[0]
+        assert "title" in section_call.kwargs["format"]["properties"]
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main(argv=["first-arg-is-ignored"], exit=False)
@@ -244,3 +244,39 @@ class TestSectionProcessorRouter:
             "final state."
         )
         assert log_text in caplog.text
+
+    def _section_with_feedback(self, feedback_text: str) -> SectionDetail:
+        return SectionDetail(
+            id="1",
+            title="S1",
+            level=1,
+            description_objectives="D1",
+            original_requirements_summary="R1",
+            status=SectionStatus.HUMAN_REVIEW_PENDING,
+            student_experience_keywords=["migration cloud"],
+            retrieved_journal_excerpts=[
+                {"text": "Migration cloud du CRM pilotée avec l'équipe data."}
+            ],
+            anonymized_context_for_llm="Migration cloud du CRM.",
+            human_review_feedback=HumanReviewFeedback(
+                modification_requested=True, feedback_text=feedback_text
+            ),
+        )
+
+    def test_style_feedback_with_cached_context_routes_to_drafting(self, router_node):
+        """Teste qu'un retour de forme réutilise le contexte déjà récupéré (N6)."""
+        section = self._section_with_feedback("Reformulez, c'est trop long.")
+        state = AgentState(thesis_outline=[section], current_section_index_for_router=0)
+        result = router_node.run(state)
+
+        assert result["next_node_override"] == "N6_SectionDraftingNode"
+        assert result["thesis_outline"][0].feedback_search_terms == []
+
+    def test_feedback_with_new_terms_routes_to_retrieval(self, router_node):
+        """Teste qu'un retour citant un nouveau sujet relance N5 sur ce sujet."""
+        section = self._section_with_feedback("Parlez aussi du budget du CRM.")
+        state = AgentState(thesis_outline=[section], current_section_index_for_router=0)
+        result = router_node.run(state)
+
+        assert result["next_node_override"] == "N5_ContextRetrievalNode"
+        assert result["thesis_outline"][0].feedback_search_terms == ["budget"]
@@ -10,6 +10,9 @@ from src.config import settings
 from src.nodes.n6_section_drafting import N6SectionDraftingNode
 from src.state import (
     AgentState,
+    CritiqueOutput,
+    HumanReviewFeedback,
+    IdentifiedPoint,
     SectionDetail,
     SectionStatus,
 )
@@ -115,6 +118,22 @@ class TestN6SectionDraftingNode(unittest.TestCase):
                 == "Contenu rédigé pour l'introduction."
             )
 
+    @patch("src.nodes.n6_section_drafting.ChatOllama")
+    def test_run_applies_section_length_budget(self, mock_chat_ollama):
+        """Test the section word target reaches the prompt and caps num_predict."""
+        mock_llm_instance = mock_chat_ollama.return_value
+        mock_llm_instance.invoke.return_value = AIMessage(content="Texte court.")
+        self.node.llm = mock_llm_instance
+        section = self.state.get_section_by_id(self.section_id_1)
+        section.target_word_count = 450
+        section.max_output_tokens = 940
+
+        self.node.run(self.state)
+
+        args, kwargs = mock_llm_instance.invoke.call_args
+        assert kwargs == {"num_predict": 940}
+        assert "Visez environ 450 mots" in args[0].to_string()
+
     @patch("src.nodes.n6_section_drafting.ChatOllama")
     def test_run_handles_no_journal_context(self, mock_chat_ollama):
         """Test drafting when anonymized_context_for_llm is None or empty."""
@@ -156,6 +175,131 @@ class TestN6SectionDraftingNode(unittest.TestCase):
                 == "Contenu rédigé sans contexte journal spécifique."
             )
 
+    @patch("src.nodes.n6_section_drafting.retrieve_example_passages")
+    @patch("src.nodes.n6_section_drafting.ChatOllama")
+    def test_run_includes_example_passages_for_section(
+        self, mock_chat_ollama, mock_retrieve_example_passages
+    ):
+        """Test that only the example passages retrieved for the section are sent."""
+        mock_retrieve_example_passages.return_value = "[1.1. L'entreprise]\nPassage."
+        self.state.example_thesis_index_path = "data/processed/example_index"
+        self.state.example_thesis_index_version = "v1"
+        mock_llm_instance = mock_chat_ollama.return_value
+        mock_llm_instance.invoke.return_value = AIMessage(content="Brouillon.")
+        self.node.llm = mock_llm_instance
+
+        self.node.run(self.state)
+
+        args, _ = mock_llm_instance.invoke.call_args
+        assert "[1.1. L'entreprise]\nPassage." in args[0].to_string()
+        call_args, _ = mock_retrieve_example_passages.call_args
+        assert call_args[:2] == ("data/processed/example_index", "v1")
+        assert call_args[3] == ["1. Introduction Test. Objectifs de l'introduction."]
+
+    def _set_up_revision(self, excerpt: str | None) -> None:
+        section = self.state.get_section_by_id(self.section_id_1)
+        section.current_draft_for_critique = (
+            "Premier paragraphe correct.\n\n"
+            "Deuxième paragraphe avec une affirmation vague.\n\n"
+            "Troisième paragraphe correct."
+        )
+        section.critique_v1 = CritiqueOutput(
+            overall_assessment_score=3,
+            overall_assessment_summary="À préciser.",
+            identified_flaws=[
+                IdentifiedPoint(
+                    point_description="Affirmation non étayée.",
+                    specific_excerpt_from_draft=excerpt,
+                    suggested_improvement="Illustrer avec le journal.",
+                )
+            ],
+            final_recommendation="REVISION_NEEDED",
+        )
+        section.status = SectionStatus.SELF_CRITIQUE_COMPLETED
+
+    @patch("src.nodes.n6_section_drafting.ChatOllama")
+    def test_run_revises_only_paragraphs_targeted_by_critique(self, mock_chat_ollama):
+        """Test paragraph-level revision splices the regenerated paragraph back."""
+        self._set_up_revision("une affirmation vague")
+        mock_llm_instance = mock_chat_ollama.return_value
+        mock_llm_instance.invoke.return_value = AIMessage(
+            content="Deuxième paragraphe illustré par le projet Alpha."
+        )
+        self.node.llm = mock_llm_instance
+
+        with patch.object(settings, "n6_revision_mode", "paragraph"):
+            updated_state_fields = self.node.run(self.state)
+
+        mock_llm_instance.invoke.assert_called_once()
+        args, _ = mock_llm_instance.invoke.call_args
+        assert "Deuxième paragraphe avec une affirmation vague." in args[0].to_string()
+        revised = updated_state_fields["thesis_outline"][0].refined_draft
+        assert revised == (
+            "Premier paragraphe correct.\n\n"
+            "Deuxième paragraphe illustré par le projet Alpha.\n\n"
+            "Troisième paragraphe correct."
+        )
+
+    @patch("src.nodes.n6_section_drafting.ChatOllama")
+    def test_run_falls_back_to_full_rewrite_for_unlocated_critique(
+        self, mock_chat_ollama
+    ):
+        """Test a critique without usable excerpt triggers a full rewrite."""
+        self._set_up_revision(None)
+        mock_llm_instance = mock_chat_ollama.return_value
+        mock_llm_instance.invoke.return_value = AIMessage(content="Réécriture.")
+        self.node.llm = mock_llm_instance
+
+        with patch.object(settings, "n6_revision_mode", "paragraph"):
+            updated_state_fields = self.node.run(self.state)
+
+        mock_llm_instance.invoke.assert_called_once()
+        args, _ = mock_llm_instance.invoke.call_args
+        assert "--- DÉBUT CRITIQUE ---" in args[0].to_string()
+        assert updated_state_fields["thesis_outline"][0].refined_draft == "Réécriture."
+
+    @patch("src.nodes.n6_section_drafting.time.perf_counter")
+    @patch("src.nodes.n6_section_drafting.ChatOllama")
+    def test_run_adds_revision_time_to_reflection_budget(
+        self, mock_chat_ollama, mock_perf_counter
+    ):
+        """Test a critique-driven revision counts towards the reflection time."""
+        self._set_up_revision(None)
+        self.state.get_section_by_id(self.section_id_1).reflection_time_spent_s = 2.0
+        mock_perf_counter.side_effect = [10.0, 13.5]
+        mock_llm_instance = mock_chat_ollama.return_value
+        mock_llm_instance.invoke.return_value = AIMessage(content="Réécriture.")
+        self.node.llm = mock_llm_instance
+
+        updated_state_fields = self.node.run(self.state)
+
+        section = updated_state_fields["thesis_outline"][0]
+        assert section.reflection_time_spent_s == 5.5
+
+    @patch("src.nodes.n6_section_drafting.ChatOllama")
+    def test_run_applies_human_feedback_to_previous_draft(self, mock_chat_ollama):
+        """Test an N8 modification request revises the previous draft in one call."""
+        section = self.state.get_section_by_id(self.section_id_1)
+        section.refined_draft = "Version relue par l'étudiant."
+        section.status = SectionStatus.MODIFICATION_REQUESTED
+        section.human_review_feedback = HumanReviewFeedback(
+            modification_requested=True, feedback_text="Raccourcissez la conclusion."
+        )
+        mock_llm_instance = mock_chat_ollama.return_value
+        mock_llm_instance.invoke.return_value = AIMessage(content="Version modifiée.")
+        self.node.llm = mock_llm_instance
+
+        updated_state_fields = self.node.run(self.state)
+
+        mock_llm_instance.invoke.assert_called_once()
+        args, _ = mock_llm_instance.invoke.call_args
+        prompt_text = args[0].to_string()
+        assert "Version relue par l'étudiant." in prompt_text
+        assert "Raccourcissez la conclusion." in prompt_text
+        updated_section = updated_state_fields["thesis_outline"][0]
+        assert updated_section.current_draft_for_critique == "Version modifiée."
+        assert updated_section.human_review_feedback.modification_requested is False
+
     @patch("src.nodes.n6_section_drafting.ChatOllama")
     def test_run_handles_llm_invocation_error(self, mock_chat_ollama):
         """Test N6 handles exceptions during LLM call."""
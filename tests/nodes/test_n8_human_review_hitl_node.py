@@ -1,6 +1,7 @@
 # tests/nodes/test_n8_human_review_hitl_node.py
 import logging
 import unittest
+from unittest.mock import patch
 
 from src.config import settings
 
@@ -243,3 +244,73 @@ class TestN8HumanReviewHITLNode(unittest.TestCase):
         assert (
             updated_fields.get("last_successful_node") == "N8HumanReviewHITLNode_Error"
         )
+
+    def _batch_state(self) -> AgentState:
+        """Deux sections rédigées et une section encore à rédiger."""
+        outline = [s.copy(deep=True) for s in self.current_state.thesis_outline]
+        outline.append(
+            SectionDetail(
+                id="section_3_id_n8",
+                title="3. Section à rédiger",
+                level=1,
+                description_objectives="Obj N8-3",
+                original_requirements_summary="Req N8-3",
+            )
+        )
+        return self.current_state.copy(update={"thesis_outline": outline})
+
+    def test_batch_mode_queues_then_emits_one_payload(self):
+        """N8 (revue groupée): file d'attente puis un seul payload multi-sections."""
+        state = self._batch_state()
+        with patch.object(settings, "n8_batch_review_size", 2):
+            first = self.node.run(state)
+            assert first["interrupt_payload"] is None
+            assert first["current_section_index_for_router"] == 1
+            assert first["thesis_outline"][0].status == (
+                SectionStatus.HUMAN_REVIEW_PENDING
+            )
+
+            state = state.copy(
+                update={
+                    "thesis_outline": first["thesis_outline"],
+                    "current_section_id": "section_2_id_n8",
+                    "current_section_index": 1,
+                }
+            )
+            second = self.node.run(state)
+
+        payload = second["interrupt_payload"]
+        assert [s["section_id"] for s in payload["sections"]] == [
+            self.section_id_1,
+            "section_2_id_n8",
+        ]
+        assert second["last_successful_node"] == "N8HumanReviewHITLNode_Interrupted"
+
+    def test_batch_mode_processes_all_responses_in_one_resume(self):
+        """N8 (revue groupée): une reprise applique une réponse par section."""
+        state = self._batch_state()
+        for section in state.thesis_outline[:2]:
+            section.status = SectionStatus.HUMAN_REVIEW_PENDING
+            section.review_queued_at = 1.0
+        state.current_section_id = "section_2_id_n8"
+        state.current_section_index = 1
+        state.batch_human_responses = [
+            {"section_id": self.section_id_1, "action": "approve_section"},
+            {
+                "section_id": "section_2_id_n8",
+                "action": "modify_section",
+                "feedback_text": "Ajoutez une conclusion.",
+            },
+        ]
+
+        with patch.object(settings, "n8_batch_review_size", 2):
+            updated_fields = self.node.run(state)
+
+        approved, modified = updated_fields["thesis_outline"][:2]
+        assert approved.status == SectionStatus.CONTENT_APPROVED
+        assert approved.final_content == self.initial_draft_content
+        assert modified.status == SectionStatus.MODIFICATION_REQUESTED
+        assert modified.human_review_feedback.feedback_text == "Ajoutez une conclusion."
+        assert updated_fields["current_section_index_for_router"] == 1
+        assert updated_fields["batch_human_responses"] == []
+        assert updated_fields["interrupt_payload"] is None
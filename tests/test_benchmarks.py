@@ -0,0 +1,51 @@
+# tests/test_benchmarks.py
+from benchmarks.corpus import generate_journal_corpus
+from benchmarks.run_benchmarks import compare_to_baseline, run_suite
+from src.nodes.n2_journal_ingestor_anonymizer import DATE_IN_FILENAME_PATTERN
+
+
+def test_corpus_files_are_dated_and_deterministic(tmp_path):
+    first = generate_journal_corpus(str(tmp_path / "a"), 10, docx_ratio=0.5)
+    second = generate_journal_corpus(str(tmp_path / "b"), 10, docx_ratio=0.5)
+
+    assert [p.name for p in first] == [p.name for p in second]
+    assert {p.suffix for p in first} == {".txt", ".docx"}
+    assert all(DATE_IN_FILENAME_PATTERN.match(p.name) for p in first)
+    txt_files = [p for p in first if p.suffix == ".txt"]
+    assert txt_files[0].read_text(encoding="utf-8") == (
+        tmp_path / "b" / txt_files[0].name
+    ).read_text(encoding="utf-8")
+
+
+def test_run_suite_reports_every_benchmark():
+    report = run_suite("small", repeat=1)
+
+    assert set(report["results"]) == {
+        "n2_load",
+        "n2_anonymize",
+        "n2_chunk",
+        "n2_embed",
+        "n2_index",
+        "t1_query",
+        "n4_route",
+        "checkpoint_write",
+    }
+    assert report["results"]["checkpoint_write"]["size_bytes"] > 0
+
+
+def test_compare_to_baseline_flags_regressions():
+    baseline = {"results": {"n4_route": {"median_s": 1.0}, "old": {"median_s": 1.0}}}
+    report = {"results": {"n4_route": {"median_s": 1.5}, "t1_query": {"median_s": 1}}}
+
+    comparison = compare_to_baseline(report, baseline, tolerance=0.2)
+
+    assert comparison == [
+        {
+            "benchmark": "n4_route",
+            "metric": "median_s",
+            "baseline": 1.0,
+            "current": 1.5,
+            "ratio": 1.5,
+            "regression": True,
+        }
+    ]
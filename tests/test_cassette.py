@@ -0,0 +1,90 @@
+# tests/test_cassette.py
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from src.cassette import (
+    Cassette,
+    CassetteChatModel,
+    CassetteEmbeddings,
+    CassetteMissError,
+    with_chat_cassette,
+)
+from src.config import settings
+
+
+class _FakeLLM:
+    model = "fake"
+    format = None
+    temperature = 0.1
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, prompt, config=None, **kwargs):
+        self.calls += 1
+        return AIMessage(content=f"Réponse {self.calls} à {prompt}")
+
+    def stream(self, prompt, config=None, **kwargs):
+        self.calls += 1
+        for token in ("Bon", "jour"):
+            yield AIMessageChunk(content=token)
+
+
+class _FakeEmbeddings:
+    def embed_documents(self, texts):
+        return [[float(len(t)), 0.5] for t in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 0.25]
+
+
+def test_chat_calls_replay_in_recorded_order(tmp_path):
+    path = str(tmp_path / "run.jsonl.gz")
+    recorder = CassetteChatModel(_FakeLLM(), Cassette(path, "record"))
+    first = recorder.invoke("Plan ?", num_predict=10).content
+    second = recorder.invoke("Plan ?", num_predict=10).content
+    streamed = [c.content for c in recorder.stream("Section ?")]
+
+    llm = _FakeLLM()
+    player = CassetteChatModel(llm, Cassette(path, "replay", latency="zero"))
+
+    assert player.invoke("Plan ?", num_predict=10).content == first
+    assert player.invoke("Plan ?", num_predict=10).content == second
+    assert [c.content for c in player.stream("Section ?")] == streamed
+    assert llm.calls == 0
+    with pytest.raises(CassetteMissError):
+        player.invoke("Plan ?", num_predict=20)
+
+
+def test_rerecording_replaces_previous_session(tmp_path):
+    path = str(tmp_path / "run.jsonl.gz")
+    old_llm = _FakeLLM()
+    old_llm.calls = 10
+    CassetteChatModel(old_llm, Cassette(path, "record")).invoke("Plan ?")
+    recorder = CassetteChatModel(_FakeLLM(), Cassette(path, "record"))
+    recorded = [recorder.invoke("Plan ?").content for _ in range(2)]
+
+    player = CassetteChatModel(_FakeLLM(), Cassette(path, "replay", latency="zero"))
+
+    assert [player.invoke("Plan ?").content for _ in range(2)] == recorded
+
+
+def test_embeddings_replay_without_building_the_model(tmp_path):
+    path = str(tmp_path / "embed.jsonl.gz")
+    recorder = CassetteEmbeddings(_FakeEmbeddings, "bge", Cassette(path, "record"))
+    documents = recorder.embed_documents(["un", "deux"])
+    query = recorder.embed_query("trois")
+
+    def _no_model():
+        raise AssertionError("Le modèle ne doit pas être construit en rejeu.")
+
+    player = CassetteEmbeddings(_no_model, "bge", Cassette(path, "replay", "zero"))
+
+    assert player.embed_documents(["un", "deux"]) == documents
+    assert player.embed_query("trois") == query
+
+
+def test_cassette_off_returns_model_unchanged(monkeypatch):
+    monkeypatch.setattr(settings, "cassette_mode", "off")
+    llm = _FakeLLM()
+    assert with_chat_cassette(llm) is llm
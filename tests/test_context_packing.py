@@ -0,0 +1,87 @@
+# tests/test_context_packing.py
+from src.context_packing import (
+    estimate_tokens,
+    format_packed_context,
+    merge_adjacent_chunks,
+    pack_context,
+    strip_overlap,
+)
+
+OVERLAP = "partagé entre les deux chunks voisins du journal. "
+
+
+def _excerpt(text, source, chunk_index, score, date="2024-01-10"):
+    return {
+        "text": text,
+        "score": score,
+        "metadata": {
+            "source_document": source,
+            "journal_date": date,
+            "chunk_index": chunk_index,
+            "chunk_id": f"{source}_chunk{chunk_index}",
+        },
+    }
+
+
+def test_strip_overlap_removes_shared_span_only():
+    previous = "Début du premier chunk, texte " + OVERLAP
+    following = OVERLAP + "suite propre au second chunk."
+    assert strip_overlap(previous, following, 300) == "suite propre au second chunk."
+    assert strip_overlap("abc", "xyz suite", 300) == "xyz suite"
+
+
+def test_merge_adjacent_chunks_merges_runs_per_source():
+    excerpts = [
+        _excerpt(OVERLAP + "Chunk 2 de A.", "a.txt", 2, 0.4),
+        _excerpt("Chunk 1 de A, " + OVERLAP, "a.txt", 1, 0.2),
+        _excerpt("Chunk 5 de A.", "a.txt", 5, 0.3),
+        _excerpt("Chunk 1 de B.", "b.txt", 1, 0.1),
+    ]
+    blocks = merge_adjacent_chunks(excerpts, max_overlap=300)
+
+    assert len(blocks) == 3
+    merged = next(b for b in blocks if b["metadata"]["chunk_indices"] == [1, 2])
+    assert merged["text"] == "Chunk 1 de A, " + OVERLAP + "Chunk 2 de A."
+    assert merged["score"] == 0.2
+
+
+def test_pack_context_applies_cutoff_budget_and_diversity():
+    duplicate_text = "Migration Power Automate pour la direction générale. " * 4
+    excerpts = [
+        _excerpt(duplicate_text, "a.txt", 1, 0.1, date="2024-02-01"),
+        _excerpt(duplicate_text + "Bis.", "b.txt", 7, 0.12, date="2024-02-02"),
+        _excerpt(
+            "Atelier RH sur le prompt engineering.", "c.txt", 0, 0.3, "2024-01-05"
+        ),
+        _excerpt("Extrait hors sujet.", "d.txt", 0, 5.0),
+    ]
+    budget = estimate_tokens(duplicate_text) + estimate_tokens(excerpts[2]["text"])
+
+    packed = pack_context(excerpts, token_budget=budget, score_cutoff=1.0)
+
+    texts = [b["text"] for b in packed]
+    assert "Extrait hors sujet." not in texts
+    assert texts == [excerpts[2]["text"], duplicate_text]
+    assert format_packed_context(packed).count("---") == 1
+
+
+def test_pack_context_truncates_single_oversized_block():
+    packed = pack_context([_excerpt("x" * 400, "a.txt", 0, 0.1)], token_budget=10)
+    assert len(packed) == 1
+    assert len(packed[0]["text"]) == 40
+    assert pack_context([{"error": "T1"}], token_budget=10) == []
+
+
+def test_merge_adjacent_chunks_uses_chunker_offsets():
+    entry = "Première phrase du jour. Phrase commune aux deux chunks. Fin du jour."
+    first, second = (
+        _excerpt(entry[:56], "a.txt", 0, 0.3),
+        _excerpt(entry[25:], "a.txt", 1, 0.2),
+    )
+    first["metadata"].update(start_offset=0, end_offset=56)
+    second["metadata"].update(start_offset=25, end_offset=len(entry))
+
+    (block,) = merge_adjacent_chunks([second, first], max_overlap=300)
+
+    assert block["text"] == entry
+    assert block["metadata"]["end_offset"] == len(entry)
@@ -0,0 +1,115 @@
+# tests/test_embedding_worker.py
+import os
+import stat
+import threading
+
+import pytest
+
+from src.config import settings
+from src.embedding_worker import (
+    EmbeddingWorker,
+    EmbeddingWorkerError,
+    WorkerEmbeddings,
+    authkey_path,
+    worker_embeddings,
+)
+
+
+class _FakeModel:
+    def __init__(self):
+        self.document_calls = 0
+
+    def embed_documents(self, texts):
+        self.document_calls += 1
+        return [[float(len(t)), 1.0] for t in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 0.0]
+
+
+@pytest.fixture()
+def worker(tmp_path):
+    model = _FakeModel()
+    worker = EmbeddingWorker(
+        "bge",
+        str(tmp_path / "embed.sock"),
+        max_batch_size=64,
+        max_wait_ms=100,
+        model_factory=lambda name: model,
+    )
+    threading.Thread(target=worker.serve_forever, daemon=True).start()
+    assert worker.ready.wait(5)
+    worker.model = model
+    yield worker
+    worker.shutdown()
+
+
+def test_concurrent_clients_share_micro_batches(worker):
+    client = WorkerEmbeddings("bge", worker.socket_path)
+    results: dict[int, list] = {}
+
+    def _embed(index):
+        results[index] = client.embed_documents([f"texte {index}", "x" * index])
+
+    threads = [threading.Thread(target=_embed, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {
+        i: [[float(len(f"texte {i}")), 1.0], [float(i), 1.0]] for i in range(4)
+    }
+    assert client.embed_query("abc") == [3.0, 0.0]
+    assert worker.stats["texts"] == 8
+    assert worker.model.document_calls < 4
+
+
+def test_other_model_is_refused(worker):
+    with pytest.raises(EmbeddingWorkerError):
+        WorkerEmbeddings("autre", worker.socket_path).embed_query("abc")
+
+
+def test_socket_and_authkey_are_private(worker):
+    key_file = authkey_path(worker.socket_path)
+
+    assert stat.S_IMODE(os.stat(worker.socket_path).st_mode) == 0o600
+    assert stat.S_IMODE(key_file.stat().st_mode) == 0o600
+    assert len(key_file.read_bytes()) == 32
+
+
+def test_client_with_wrong_authkey_is_refused(worker):
+    key_file = authkey_path(worker.socket_path)
+    authkey = key_file.read_bytes()
+    key_file.write_bytes(b"mauvaise cle")
+    intruder = WorkerEmbeddings("bge", worker.socket_path, fallback_factory=_FakeModel)
+
+    assert intruder.embed_query("abcd") == [4.0, 0.0]
+    assert worker.stats["requests"] == 0
+
+    key_file.write_bytes(authkey)
+    assert WorkerEmbeddings("bge", worker.socket_path).embed_query("abc") == [3.0, 0.0]
+
+
+def test_falls_back_to_local_model_when_worker_is_down(tmp_path):
+    client = WorkerEmbeddings(
+        "bge", str(tmp_path / "absent.sock"), fallback_factory=_FakeModel
+    )
+
+    assert client.embed_documents(["abcd"]) == [[4.0, 1.0]]
+
+
+def test_worker_embeddings_requires_a_listening_socket(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "embedding_worker_enabled", True)
+    monkeypatch.setattr(settings, "embedding_worker_socket", str(tmp_path / "a.sock"))
+
+    assert worker_embeddings("bge") is None
+
+
+def test_worker_embeddings_requires_the_authkey(monkeypatch, worker):
+    monkeypatch.setattr(settings, "embedding_worker_enabled", True)
+    monkeypatch.setattr(settings, "embedding_worker_socket", worker.socket_path)
+    assert isinstance(worker_embeddings("bge"), WorkerEmbeddings)
+
+    authkey_path(worker.socket_path).unlink()
+    assert worker_embeddings("bge") is None
@@ -0,0 +1,67 @@
+# tests/test_fake_ollama_server.py
+import json
+import threading
+
+import pytest
+from langchain_community.chat_models import ChatOllama
+
+from benchmarks.fake_ollama_server import FakeOllamaConfig, start_fake_ollama_server
+from src.json_utils import inline_json_schema_refs
+from src.nodes.n3_thesis_outline_planner import PlannedThesisOutlineForLLM
+from src.state import CritiqueOutput
+
+
+@pytest.fixture()
+def fake_server():
+    server, _ = start_fake_ollama_server(
+        FakeOllamaConfig(
+            time_to_first_token_s=0.0,
+            tokens_per_s=0,
+            max_concurrency=1,
+            draft_tokens=40,
+        )
+    )
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_streams_text_draft_within_num_predict(fake_server):
+    llm = ChatOllama(model="fake", base_url=fake_server.base_url)
+
+    chunks = [chunk.content for chunk in llm.stream("Rédigez la section.")]
+    capped = llm.invoke("Rédigez la section.", num_predict=10)
+
+    assert len(chunks) > 10
+    assert len("".join(chunks).split()) == 40
+    assert len(capped.content.split()) == 10
+
+
+def test_json_outputs_validate_against_planner_and_critique_models(fake_server):
+    llm = ChatOllama(model="fake", base_url=fake_server.base_url, format="json")
+
+    outline = PlannedThesisOutlineForLLM.parse_raw(llm.invoke("Plan ?").content)
+    part = json.loads(llm.invoke("Phase 2\n- id : 3.\n").content)
+    critique_schema = inline_json_schema_refs(CritiqueOutput.schema())
+    critique = CritiqueOutput.parse_raw(
+        llm.invoke("Critiquez.", format=critique_schema).content
+    )
+
+    assert [s.id for s in outline.outline][:3] == ["1.", "1.1.", "1.2."]
+    assert [s["id"] for s in part["outline"]] == ["3.1.", "3.2."]
+    assert critique.overall_assessment_score == 5
+
+
+def test_concurrency_limit_queues_requests(fake_server):
+    fake_server.config.time_to_first_token_s = 0.05
+    llm = ChatOllama(model="fake", base_url=fake_server.base_url)
+    workers = [threading.Thread(target=llm.invoke, args=("Bonjour",)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    stats = fake_server.snapshot()
+    assert stats["requests"] == 3
+    assert stats["max_active"] == 1
+    assert stats["max_queue_wait_s"] > 0
@@ -0,0 +1,46 @@
+# tests/test_feedback_terms.py
+from src.feedback_terms import extract_new_search_terms
+from src.state import SectionDetail
+
+
+def _section() -> SectionDetail:
+    return SectionDetail(
+        id="2.1.",
+        title="Projet Power Automate",
+        level=2,
+        description_objectives="Décrire le projet.",
+        original_requirements_summary="Compétences RNCP.",
+        student_experience_keywords=["Power Automate", "factures"],
+        retrieved_journal_excerpts=[
+            {"text": "Automatisation OCR des factures avec AI Builder.", "metadata": {}}
+        ],
+        current_draft_for_critique="Le projet a réduit le temps de saisie.",
+    )
+
+
+def test_style_only_feedback_has_no_new_terms():
+    feedback = "Reformulez le deuxième paragraphe, trop long, et précisez le projet."
+    assert extract_new_search_terms(feedback, _section()) == []
+    assert extract_new_search_terms("Clarifiez le style.", _section()) == []
+    assert extract_new_search_terms(None, _section()) == []
+
+
+def test_editing_and_politeness_words_are_not_search_terms():
+    for feedback in (
+        "Merci de reformuler plus clairement cette partie, trop longue.",
+        "Style trop lourd, simplifie les phrases et corrige les fautes.",
+        "Très bien. Allégez l'introduction et évitez les répétitions, svp.",
+    ):
+        assert extract_new_search_terms(feedback, _section()) == [], feedback
+
+
+def test_acronyms_and_proper_nouns_are_search_terms():
+    feedback = "Citez SAP et le rôle de Salesforce dans la migration."
+    terms = extract_new_search_terms(feedback, _section())
+    assert terms == ["SAP", "rôle", "Salesforce", "migration"]
+
+
+def test_feedback_with_unknown_topics_yields_terms():
+    feedback = 'Ajoutez le budget et parlez du "comité de pilotage" et de l\'OCR.'
+    terms = extract_new_search_terms(feedback, _section())
+    assert terms == ["comité de pilotage", "budget"]
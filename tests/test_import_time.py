@@ -0,0 +1,55 @@
+# tests/test_import_time.py
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+# Budget volontairement large (machines de CI lentes) : les commandes courtes
+# (afficher les settings, lire un checkpoint) doivent démarrer bien en deçà.
+IMPORT_TIME_BUDGET_S = 1.0
+HEAVY_MODULES = (
+    "langchain_community.chat_models",
+    "langchain_community.vectorstores",
+    "langchain_community.document_loaders",
+    "fastembed",
+    "faiss",
+    "pypdf",
+    "unstructured",
+    "src.nodes",
+)
+
+
+def _import_in_subprocess(code: str) -> dict:
+    script = (
+        "import json, sys, time\n"
+        "started_at = time.perf_counter()\n"
+        f"{code}\n"
+        "elapsed = time.perf_counter() - started_at\n"
+        f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "print(json.dumps({'elapsed': elapsed, 'heavy': heavy}))\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", script],  # noqa: S603
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("module", ["src.config", "src.persistence"])
+def test_short_commands_import_within_budget(module):
+    result = _import_in_subprocess(f"import {module}")
+    assert result["heavy"] == []
+    assert result["elapsed"] < IMPORT_TIME_BUDGET_S
+
+
+def test_building_the_graph_defers_node_imports():
+    result = _import_in_subprocess(
+        "from src.graph_assembler import create_graph\ncreate_graph(':memory:')"
+    )
+    assert result["heavy"] == []
@@ -0,0 +1,153 @@
+# tests/test_invalidation.py
+from unittest.mock import patch
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.invalidation import (
+    content_hash,
+    invalidate_stale_sections,
+    save_chunk_manifest,
+    section_input_fingerprints,
+)
+from src.nodes.n2_journal_ingestor_anonymizer import N2JournalIngestorAnonymizerNode
+from src.nodes.n3_thesis_outline_planner import N3ThesisOutlinePlannerNode
+from src.nodes.n4_section_processor_router import N4SectionProcessorRouter
+from src.outline_cache import OutlineCache
+from src.state import AgentState, SectionDetail, SectionStatus
+
+
+def _drafted_section(section_id: str, chunk_id: str, text: str) -> SectionDetail:
+    return SectionDetail(
+        id=section_id,
+        title=f"Section {section_id}",
+        level=1,
+        description_objectives="Objectifs.",
+        original_requirements_summary="Exigences.",
+        retrieved_journal_excerpts=[{"text": text, "metadata": {"chunk_id": chunk_id}}],
+        draft_v1=f"Brouillon {section_id}.",
+        final_content=f"Brouillon {section_id}.",
+        status=SectionStatus.CONTENT_APPROVED,
+    )
+
+
+MANIFEST = {
+    "j1_chunk0": content_hash("Migration cloud."),
+    "j2_chunk0": content_hash("Atelier RGPD."),
+}
+
+
+def _state(store_dir) -> AgentState:
+    state = AgentState(
+        user_persona="Persona A",
+        school_guidelines_structured={"structure": ["Intro"]},
+        vector_store_path=str(store_dir),
+        journal_chunk_manifest_digest=save_chunk_manifest(str(store_dir), MANIFEST),
+        thesis_outline=[
+            _drafted_section("1", "j1_chunk0", "Migration cloud."),
+            _drafted_section("2", "j2_chunk0", "Atelier RGPD."),
+        ],
+        current_section_index_for_router=2,
+    )
+    for section in state.thesis_outline:
+        section.input_fingerprints = section_input_fingerprints(state, section)
+    return state
+
+
+def _reingest(state: AgentState, chunk_id: str, text: str) -> AgentState:
+    manifest = {**MANIFEST, chunk_id: content_hash(text)}
+    digest = save_chunk_manifest(state.vector_store_path, manifest)
+    return state.copy(update={"journal_chunk_manifest_digest": digest})
+
+
+def test_unchanged_inputs_invalidate_nothing(tmp_path):
+    outline, invalidated = invalidate_stale_sections(_state(tmp_path))
+    assert invalidated == {}
+    assert [s.status for s in outline] == [SectionStatus.CONTENT_APPROVED] * 2
+
+
+def test_changed_journal_chunk_resets_only_the_section_using_it(tmp_path):
+    state = _reingest(_state(tmp_path), "j2_chunk0", "Atelier RGPD revu.")
+
+    outline, invalidated = invalidate_stale_sections(state)
+
+    assert invalidated == {"2": ["chunks"]}
+    assert outline[0].status == SectionStatus.CONTENT_APPROVED
+    assert outline[1].status == SectionStatus.PENDING
+    assert outline[1].draft_v1 is None
+    assert outline[1].final_content is None
+    assert outline[1].input_fingerprints == {}
+    assert outline[1].title == "Section 2"
+
+
+def test_persona_change_invalidates_all_drafted_sections(tmp_path):
+    state = _state(tmp_path).copy(update={"user_persona": "Persona B"})
+    _, invalidated = invalidate_stale_sections(state)
+    assert invalidated == {"1": ["persona"], "2": ["persona"]}
+
+
+def test_router_redrafts_invalidated_section(tmp_path):
+    state = _reingest(_state(tmp_path), "j1_chunk0", "Migration on-premise.")
+
+    result = N4SectionProcessorRouter().run(state)
+
+    assert result["next_node_override"] == "N5_ContextRetrievalNode"
+    assert result["current_section_id"] == "1"
+    assert result["thesis_outline"][0].status == SectionStatus.PENDING
+
+
+@patch("src.nodes.n3_thesis_outline_planner.ChatOllama")
+@patch("src.nodes.n2_journal_ingestor_anonymizer.FastEmbedEmbeddings")
+def test_journal_update_redrafts_only_sections_using_changed_chunks(
+    mock_fastembed, mock_chat_ollama, tmp_path
+):
+    mock_fastembed.return_value = DeterministicFakeEmbedding(size=8)
+    journal_dir = tmp_path / "journal"
+    journal_dir.mkdir()
+    (journal_dir / "2024-01-01.txt").write_text("Migration cloud.", encoding="utf-8")
+    (journal_dir / "2024-01-02.txt").write_text("Atelier RGPD.", encoding="utf-8")
+    n2 = N2JournalIngestorAnonymizerNode()
+    n3 = N3ThesisOutlinePlannerNode(llm_model_name="mock_resume")
+    state = AgentState(
+        journal_path=str(journal_dir),
+        vector_store_path=str(tmp_path / "store"),
+        embedding_model_name="fake",
+        recreate_vector_store=True,
+        user_persona="Persona A",
+        school_guidelines_structured={"structure": ["Intro"]},
+    )
+    state = state.copy(update=n2.run(state))
+
+    # Premier passage terminé : plan rédigé par N3 puis N5-N8
+    state = state.copy(
+        update={
+            "thesis_outline": [
+                _drafted_section("1", "2024-01-01.txt_chunk0", "Migration cloud."),
+                _drafted_section("2", "2024-01-02.txt_chunk0", "Atelier RGPD."),
+            ],
+            "thesis_outline_plan_key": OutlineCache.make_key(
+                state.school_guidelines_structured,
+                state.user_persona,
+                state.example_thesis_text_content,
+                "mock_resume",
+            ),
+            "current_section_index_for_router": 2,
+        }
+    )
+    for section in state.thesis_outline:
+        section.input_fingerprints = section_input_fingerprints(state, section)
+    assert all(section.input_fingerprints["chunks"] for section in state.thesis_outline)
+
+    # Reprise du thread après mise à jour d'un fichier du journal : N2 -> N3 -> N4
+    (journal_dir / "2024-01-02.txt").write_text("Atelier RGPD revu.", encoding="utf-8")
+    state = state.copy(update=n2.run(state))
+    n3_result = n3.run(state)
+    state = state.copy(update=n3_result)
+    result = N4SectionProcessorRouter().run(state)
+
+    assert "thesis_outline" not in n3_result
+    mock_chat_ollama.return_value.invoke.assert_not_called()
+    assert result["next_node_override"] == "N5_ContextRetrievalNode"
+    assert result["current_section_id"] == "2"
+    assert result["thesis_outline"][0].status == SectionStatus.CONTENT_APPROVED
+    assert result["thesis_outline"][0].final_content == "Brouillon 1."
+    assert result["thesis_outline"][1].status == SectionStatus.PENDING
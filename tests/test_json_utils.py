@@ -0,0 +1,78 @@
+# tests/test_json_utils.py
+import json
+
+from src.json_utils import (
+    IncrementalJsonArrayParser,
+    inline_json_schema_refs,
+    iter_stream_objects,
+    loads_lenient,
+    repair_json,
+)
+
+OUTLINE_JSON = json.dumps(
+    {
+        "outline": [
+            {"id": "1.", "title": "Intro {avec accolades}", "keywords": ["a", "b"]},
+            {"id": "1.1.", "title": 'Titre "échappé" ]', "nested": {"x": [1, 2]}},
+        ],
+        "notes": [{"id": "ignored"}],
+    },
+    ensure_ascii=False,
+)
+
+
+def _chunked(text: str, size: int) -> list[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def test_parser_emits_each_object_when_it_closes():
+    parser = IncrementalJsonArrayParser()
+    emitted_at_chunk: list[tuple[int, str]] = []
+    for i, chunk in enumerate(_chunked(OUTLINE_JSON, 7)):
+        for obj in parser.feed(chunk):
+            emitted_at_chunk.append((i, obj))
+
+    assert [json.loads(obj)["id"] for _, obj in emitted_at_chunk] == ["1.", "1.1."]
+    first_close = OUTLINE_JSON.index('"b"]}') + len('"b"]}')
+    assert emitted_at_chunk[0][0] == (first_close - 1) // 7
+    assert json.loads(emitted_at_chunk[1][1])["nested"] == {"x": [1, 2]}
+    assert parser.objects_emitted == 2
+
+
+def test_parser_accepts_legacy_root_key_and_root_array():
+    legacy = '{"planned_thesis_outline": [{"id": "2."}]}'
+    assert [json.loads(o)["id"] for o in iter_stream_objects(_chunked(legacy, 3))] == [
+        "2."
+    ]
+    root_array = '[{"id": "3."}, {"id": "4."}]'
+    assert len(list(iter_stream_objects([root_array]))) == 2
+
+
+def test_parser_ignores_incomplete_trailing_object():
+    truncated = '{"outline": [{"id": "1."}, {"id": "2.", "title": "Coup'
+    assert len(list(iter_stream_objects(_chunked(truncated, 5)))) == 1
+
+
+def test_repair_json_closes_truncated_output_and_strips_trailing_commas():
+    truncated = '```json\n{"outline": [{"id": "1.", "keywords": ["a",],}, {"id": "2'
+    assert loads_lenient(truncated) == {
+        "outline": [{"id": "1.", "keywords": ["a"]}, {"id": "2"}]
+    }
+    assert json.loads(repair_json('Voici le plan : {"a": ')) == {"a": None}
+
+
+def test_inline_json_schema_refs_removes_definitions():
+    schema = {
+        "type": "object",
+        "properties": {
+            "items": {"type": "array", "items": {"$ref": "#/definitions/S"}}
+        },
+        "definitions": {
+            "S": {"type": "object", "properties": {"id": {"type": "string"}}}
+        },
+    }
+    inlined = inline_json_schema_refs(schema)
+    assert "definitions" not in inlined
+    assert inlined["properties"]["items"]["items"]["properties"]["id"] == {
+        "type": "string"
+    }
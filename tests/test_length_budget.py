@@ -0,0 +1,65 @@
+# tests/test_length_budget.py
+from src.length_budget import (
+    MIN_TARGET_WORDS,
+    allocate_length_budget,
+    format_length_report,
+    length_report,
+    max_output_tokens_for,
+)
+from src.state import SectionDetail
+
+
+def _section(section_id: str, level: int, **kwargs) -> SectionDetail:
+    return SectionDetail(
+        id=section_id,
+        title=f"Section {section_id}",
+        level=level,
+        description_objectives="Objectifs.",
+        original_requirements_summary="Exigences.",
+        **kwargs,
+    )
+
+
+def _outline() -> list[SectionDetail]:
+    return [
+        _section("1", 1),
+        _section("1.1", 2),
+        _section("1.2", 2, length_weight=2.0),
+        _section("2", 1),
+    ]
+
+
+def test_allocation_splits_pages_by_level_and_weight():
+    budgeted = allocate_length_budget(
+        _outline(), min_pages=10, words_per_page=300, headroom=0.3
+    )
+    targets = [s.target_word_count for s in budgeted]
+
+    # Chapeau (1) < sous-section (1.1) < sous-section pondérée x2 (1.2).
+    assert targets[0] < targets[1] < targets[2]
+    assert targets[2] == 2 * targets[1]
+    assert abs(sum(targets) - 3000) <= len(targets)
+    assert budgeted[1].max_output_tokens == max_output_tokens_for(targets[1], 0.3)
+
+
+def test_allocation_without_min_pages_leaves_outline_unchanged():
+    outline = _outline()
+    assert allocate_length_budget(outline, None, 300, 0.3) is outline
+    assert outline[0].target_word_count is None
+
+
+def test_small_budget_respects_minimum_target():
+    budgeted = allocate_length_budget(_outline(), 1, 100, 0.3)
+    assert all(s.target_word_count >= MIN_TARGET_WORDS for s in budgeted)
+
+
+def test_length_report_compares_projected_and_actual():
+    outline = allocate_length_budget(_outline(), 10, 300, 0.3)
+    outline[1].draft_v1 = " ".join(["mot"] * 400)
+
+    report = length_report(outline)
+
+    assert report[1]["actual_words"] == 400
+    assert report[1]["ratio"] == round(400 / outline[1].target_word_count, 2)
+    assert report[0]["ratio"] is None
+    assert "TOTAL" in format_length_report(report)
@@ -0,0 +1,102 @@
+# tests/test_node_memoization.py
+from typing import Any
+
+from src.config import settings
+from src.node_memoization import MemoizedNode, memoize_node
+from src.state import AgentState
+
+
+class _CountingNode:
+    """Simule N2 : lit le journal et écrit dans le vector store."""
+
+    def __init__(self, error: bool = False):
+        self.calls = 0
+        self.error = error
+
+    def run(self, state: AgentState) -> dict[str, Any]:
+        self.calls += 1
+        if self.error:
+            return {"error_message": "échec", "last_successful_node": "N2_Error"}
+        with open(f"{state.vector_store_path}/index.faiss", "w") as f:
+            f.write(f"run {self.calls}")
+        return {"vector_store_initialized": True, "last_successful_node": "N2"}
+
+
+def _memoized(node: _CountingNode, tmp_path) -> MemoizedNode:
+    return MemoizedNode(
+        node,
+        "N2_Test",
+        input_fields=("journal_path", "embedding_model_name"),
+        input_path_fields=("journal_path",),
+        output_path_fields=("vector_store_path",),
+        memo_directory=str(tmp_path / "memo"),
+    )
+
+
+def _state(tmp_path) -> AgentState:
+    journal_dir = tmp_path / "journal"
+    journal_dir.mkdir(exist_ok=True)
+    entry = journal_dir / "2024-01-01.txt"
+    if not entry.exists():
+        entry.write_text("Migration cloud.", encoding="utf-8")
+    store_dir = tmp_path / "store"
+    store_dir.mkdir(exist_ok=True)
+    return AgentState(
+        journal_path=str(journal_dir),
+        vector_store_path=str(store_dir),
+        embedding_model_name="bge-small",
+    )
+
+
+def test_second_run_replays_stored_delta(tmp_path):
+    node = _CountingNode()
+    memoized = _memoized(node, tmp_path)
+
+    first = memoized.run(_state(tmp_path))
+    second = memoized.run(_state(tmp_path))
+
+    assert node.calls == 1
+    assert second == first
+    assert first == {"vector_store_initialized": True, "last_successful_node": "N2"}
+
+
+def test_changed_input_file_or_field_reruns_node(tmp_path):
+    node = _CountingNode()
+    memoized = _memoized(node, tmp_path)
+    memoized.run(_state(tmp_path))
+
+    memoized.run(_state(tmp_path).copy(update={"embedding_model_name": "other"}))
+    assert node.calls == 2
+
+    state = _state(tmp_path)
+    (tmp_path / "journal" / "2024-01-02.txt").write_text("RGPD.", encoding="utf-8")
+    memoized.run(state)
+    assert node.calls == 3
+
+
+def test_modified_output_store_invalidates_entry(tmp_path):
+    node = _CountingNode()
+    memoized = _memoized(node, tmp_path)
+    memoized.run(_state(tmp_path))
+
+    (tmp_path / "store" / "index.faiss").unlink()
+    memoized.run(_state(tmp_path))
+
+    assert node.calls == 2
+
+
+def test_error_outputs_are_not_memoized(tmp_path):
+    node = _CountingNode(error=True)
+    memoized = _memoized(node, tmp_path)
+
+    memoized.run(_state(tmp_path))
+    memoized.run(_state(tmp_path))
+
+    assert node.calls == 2
+
+
+def test_memoize_node_respects_per_node_opt_out(monkeypatch):
+    node = _CountingNode()
+    monkeypatch.setattr(settings, "node_memoization_disabled_nodes", ["N2_Test"])
+    assert memoize_node(node, "N2_Test", input_fields=()) is node
+    assert isinstance(memoize_node(node, "N1_Test", input_fields=()), MemoizedNode)
@@ -0,0 +1,59 @@
+# tests/test_outline_cache.py
+from src.outline_cache import OutlineCache
+from src.state import SectionDetail, SectionStatus
+
+
+def _outline() -> list[SectionDetail]:
+    return [
+        SectionDetail(
+            id="1.",
+            title="Introduction",
+            level=1,
+            description_objectives="Présenter le contexte.",
+            original_requirements_summary="Introduction générale.",
+            student_experience_keywords=["contexte"],
+            status=SectionStatus.DRAFT_GENERATED,
+            draft_v1="Brouillon à ne pas mettre en cache.",
+        )
+    ]
+
+
+def test_make_key_is_stable_and_sensitive_to_inputs():
+    guidelines = {"structure": ["Intro", "Conclusion"], "format": ["Arial"]}
+    reordered = {"format": ["Arial"], "structure": ["Intro", "Conclusion"]}
+    key = OutlineCache.make_key(guidelines, "persona", "exemple", "model-a")
+
+    assert key == OutlineCache.make_key(reordered, "persona", "exemple", "model-a")
+    assert key != OutlineCache.make_key(guidelines, "persona", "exemple", "model-b")
+    assert key != OutlineCache.make_key(guidelines, "autre", "exemple", "model-a")
+
+
+def test_put_get_keeps_only_plan_fields(tmp_path):
+    cache = OutlineCache(str(tmp_path))
+    cache.put("k1", _outline(), metadata={"llm_model_name": "model-a"})
+
+    cached = cache.get("k1")
+    assert cached is not None
+    assert cached[0].title == "Introduction"
+    assert cached[0].student_experience_keywords == ["contexte"]
+    assert cached[0].status == SectionStatus.PENDING
+    assert cached[0].draft_v1 is None
+    assert cache.get("absent") is None
+
+
+def test_invalidate_and_clear(tmp_path):
+    cache = OutlineCache(str(tmp_path))
+    cache.put("k1", _outline())
+    cache.put("k2", _outline())
+
+    assert cache.invalidate("k1") is True
+    assert cache.invalidate("k1") is False
+    assert cache.keys() == ["k2"]
+    assert cache.clear() == 1
+    assert cache.get("k2") is None
+
+
+def test_corrupted_entry_is_ignored(tmp_path):
+    cache = OutlineCache(str(tmp_path))
+    (tmp_path / "bad.json").write_text("{pas du json", encoding="utf-8")
+    assert cache.get("bad") is None
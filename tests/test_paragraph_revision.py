@@ -0,0 +1,58 @@
+# tests/test_paragraph_revision.py
+from src.paragraph_revision import (
+    find_paragraph_for_excerpt,
+    join_paragraphs,
+    plan_paragraph_revisions,
+    split_paragraphs,
+)
+from src.state import CritiqueOutput, IdentifiedPoint
+
+DRAFT = (
+    "L'alternance s'est déroulée au sein d'une foncière immobilière.\n\n"
+    "Le projet Power Automate a automatisé la saisie des factures.\n   \n"
+    "Les ateliers RH ont introduit le prompt engineering aux équipes."
+)
+
+
+def _point(description, excerpt=None):
+    return IdentifiedPoint(
+        point_description=description,
+        specific_excerpt_from_draft=excerpt,
+        suggested_improvement="Préciser.",
+    )
+
+
+def _critique(**kwargs):
+    return CritiqueOutput(
+        overall_assessment_score=3,
+        overall_assessment_summary="Correct.",
+        final_recommendation="REVISION_NEEDED",
+        **kwargs,
+    )
+
+
+def test_split_and_join_paragraphs_round_trip():
+    paragraphs = split_paragraphs(DRAFT)
+    assert len(paragraphs) == 3
+    assert split_paragraphs(join_paragraphs(paragraphs)) == paragraphs
+
+
+def test_find_paragraph_for_excerpt_tolerates_rewording():
+    paragraphs = split_paragraphs(DRAFT)
+    assert find_paragraph_for_excerpt(paragraphs, "Power  Automate a automatisé") == 1
+    assert find_paragraph_for_excerpt(paragraphs, "ateliers RH ont introduit") == 2
+    assert find_paragraph_for_excerpt(paragraphs, "texte absent du brouillon") is None
+
+
+def test_plan_targets_only_cited_paragraphs():
+    paragraphs = split_paragraphs(DRAFT)
+    critique = _critique(
+        identified_flaws=[_point("Imprécis", "projet Power Automate a automatisé")],
+        missing_information=[_point("Impact des ateliers RH sur les équipes")],
+        superfluous_content=[_point("Général", None)],
+    )
+
+    plan, unlocated = plan_paragraph_revisions(paragraphs, critique)
+
+    assert sorted(plan) == [1, 2]
+    assert [p.point_description for p in unlocated] == ["Général"]
@@ -6,9 +6,11 @@ import unittest
 
 import pytest  # Ajout pour pytest.raises
 from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.graph import END, StateGraph
 
 from src.config import settings as global_settings
-from src.persistence import get_sqlite_checkpointer
+from src.persistence import fork_thread, get_sqlite_checkpointer
+from src.state import AgentState
 
 
 class TestPersistence(unittest.TestCase):
@@ -75,5 +77,57 @@ class TestPersistence(unittest.TestCase):
         global_settings.persistence_db_path = original_path
 
 
+def _two_step_app(checkpointer: SqliteSaver):
+    """Graphe minimal interrompu avant l'étape de rédaction."""
+    graph = StateGraph(AgentState)
+    graph.add_node("prepare", lambda state: {"vector_store_path": "vs/shared"})
+    graph.add_node(
+        "draft", lambda state: {"error_message": f"drafted as {state.user_persona}"}
+    )
+    graph.set_entry_point("prepare")
+    graph.add_edge("prepare", "draft")
+    graph.add_edge("draft", END)
+    return graph.compile(checkpointer=checkpointer, interrupt_before=["draft"])
+
+
+class TestForkThread(unittest.TestCase):
+    """Tests pour fork_thread (copie sur écriture d'un checkpoint)."""
+
+    def setUp(self):
+        """Prépare un thread source interrompu avant la rédaction."""
+        self.checkpointer = SqliteSaver.from_conn_string(":memory:")
+        self.app = _two_step_app(self.checkpointer)
+        self.source_config = {"configurable": {"thread_id": "source"}}
+        self.app.invoke(AgentState(user_persona="Persona A").dict(), self.source_config)
+
+    def test_fork_applies_overrides_and_shares_prepared_state(self):
+        """Le fork reprend au même point avec seuls les champs surchargés."""
+        fork_config = fork_thread(
+            self.checkpointer,
+            "source",
+            overrides={"user_persona": "Persona B"},
+            new_thread_id="variant",
+        )
+
+        assert fork_config["configurable"]["thread_id"] == "variant"
+        fork_state = self.app.get_state(fork_config)
+        assert fork_state.next == ("draft",)
+        assert fork_state.values["user_persona"] == "Persona B"
+        assert fork_state.values["vector_store_path"] == "vs/shared"
+
+        result = self.app.invoke(None, fork_config)
+        assert result["error_message"] == "drafted as Persona B"
+        source_state = self.app.get_state(self.source_config)
+        assert source_state.values["user_persona"] == "Persona A"
+        assert source_state.next == ("draft",)
+
+    def test_fork_rejects_unknown_fields_and_missing_source(self):
+        """Les champs inconnus et les threads inexistants lèvent ValueError."""
+        with pytest.raises(ValueError, match="Unknown AgentState fields"):
+            fork_thread(self.checkpointer, "source", overrides={"nope": 1})
+        with pytest.raises(ValueError, match="No checkpoint found"):
+            fork_thread(self.checkpointer, "missing")
+
+
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
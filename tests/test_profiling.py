@@ -0,0 +1,56 @@
+# tests/test_profiling.py
+import pstats
+
+from src.profiling import (
+    NodeProfiler,
+    profile_node,
+    start_profiling,
+    stop_profiling,
+)
+from src.state import AgentState
+
+
+class _AllocatingNode:
+    planner_mode = "single"
+
+    def _build_chunks(self, count: int) -> list[str]:
+        return [f"chunk {i} " * 20 for i in range(count)]
+
+    def run(self, state: AgentState) -> dict:
+        self.chunks = self._build_chunks(5000)
+        return {"current_operation_message": f"{len(self.chunks)} chunks"}
+
+
+def test_profile_mode_writes_per_node_reports(tmp_path):
+    profiler = start_profiling(tmp_path)
+    node = profile_node(_AllocatingNode(), "N2_JournalIngestorAnonymizerNode")
+
+    assert node.planner_mode == "single"
+    for _ in range(2):
+        assert node.run(AgentState())["current_operation_message"] == "5000 chunks"
+    written = stop_profiling()
+
+    assert isinstance(profiler, NodeProfiler)
+    names = {path.name for path in written}
+    assert {
+        "N2_JournalIngestorAnonymizerNode.pstats",
+        "N2_JournalIngestorAnonymizerNode.alloc.txt",
+        "collapsed_stacks.txt",
+        "summary.txt",
+    } <= names
+    stats = pstats.Stats(str(tmp_path / "N2_JournalIngestorAnonymizerNode.pstats"))
+    assert any(func[2] == "_build_chunks" for func in stats.stats)
+    alloc = (tmp_path / "N2_JournalIngestorAnonymizerNode.alloc.txt").read_text()
+    assert "2 exécution(s)" in alloc
+    assert "test_profiling.py" in alloc
+    stacks = (tmp_path / "collapsed_stacks.txt").read_text().splitlines()
+    assert any(
+        line.startswith("N2_JournalIngestorAnonymizerNode;") and "_build_chunks" in line
+        for line in stacks
+    )
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in stacks)
+
+
+def test_profile_node_is_identity_when_profiling_is_off():
+    node = _AllocatingNode()
+    assert profile_node(node, "N2_JournalIngestorAnonymizerNode") is node
@@ -0,0 +1,215 @@
+# tests/test_speculative_drafting.py
+import threading
+import time
+from typing import Any
+
+from src.config import settings
+from src.nodes.n4_section_processor_router import N4SectionProcessorRouter
+from src.nodes.n8_human_review_hitl_node import N8HumanReviewHITLNode
+from src.speculative_drafting import (
+    SpeculativeDrafter,
+    SpeculativeDraftStore,
+    speculative_fingerprint,
+)
+from src.state import AgentState, SectionDetail, SectionStatus
+
+CONFIG = {"configurable": {"thread_id": "thread-1"}}
+
+
+def _section(section_id: str, status: SectionStatus) -> SectionDetail:
+    return SectionDetail(
+        id=section_id,
+        title=f"Section {section_id}",
+        level=1,
+        description_objectives=f"Objectifs {section_id}",
+        original_requirements_summary=f"Exigences {section_id}",
+        status=status,
+    )
+
+
+def _state() -> AgentState:
+    return AgentState(
+        thesis_outline=[
+            _section("1", SectionStatus.HUMAN_REVIEW_PENDING),
+            _section("2", SectionStatus.PENDING),
+            _section("3", SectionStatus.PENDING),
+            _section("4", SectionStatus.PENDING),
+        ],
+        current_section_id="1",
+        current_section_index=0,
+        current_section_index_for_router=1,
+    )
+
+
+class _FakeNode:
+    """Met à jour la section courante comme le ferait N5 ou N6."""
+
+    def __init__(self, **section_updates: Any):
+        self.section_updates = section_updates
+        self.calls: list[str] = []
+
+    def run(self, state: AgentState) -> dict[str, Any]:
+        self.calls.append(state.current_section_id)
+        outline = [s.copy(deep=True) for s in state.thesis_outline]
+        for section in outline:
+            if section.id == state.current_section_id:
+                for field, value in self.section_updates.items():
+                    setattr(section, field, value)
+        return {"thesis_outline": outline}
+
+
+def _drafter(store: SpeculativeDraftStore, max_sections: int = 2):
+    context_node = _FakeNode(anonymized_context_for_llm="Contexte.")
+    drafting_node = _FakeNode(
+        draft_v1="Brouillon spéculatif.", status=SectionStatus.DRAFT_GENERATED
+    )
+    return SpeculativeDrafter(
+        context_node, drafting_node, store=store, max_sections=max_sections
+    )
+
+
+def test_draft_ahead_stores_next_pending_sections_within_budget(tmp_path):
+    store = SpeculativeDraftStore(str(tmp_path))
+    drafter = _drafter(store, max_sections=2)
+
+    assert drafter.draft_ahead(_state(), "thread-1") == ["2", "3"]
+    assert store.section_ids("thread-1") == ["2", "3"]
+    assert drafter.drafting_node.calls == ["2", "3"]
+    # Déjà pré-rédigées : seule la section suivante reste candidate.
+    assert drafter.upcoming_sections(_state(), "thread-1") == [3]
+
+
+def test_router_promotes_valid_speculative_draft(tmp_path):
+    store = SpeculativeDraftStore(str(tmp_path))
+    _drafter(store).draft_ahead(_state(), "thread-1")
+    router = N4SectionProcessorRouter(speculative_store=store)
+
+    result = router.run(_state(), CONFIG)
+
+    assert result["current_section_id"] == "2"
+    assert result["next_node_override"] == "N7_SelfCritiqueNode"
+    promoted = result["thesis_outline"][1]
+    assert promoted.draft_v1 == "Brouillon spéculatif."
+    assert promoted.status == SectionStatus.DRAFT_GENERATED
+    assert store.section_ids("thread-1") == ["3"]
+
+
+def test_router_discards_draft_invalidated_upstream(tmp_path):
+    store = SpeculativeDraftStore(str(tmp_path))
+    _drafter(store).draft_ahead(_state(), "thread-1")
+    router = N4SectionProcessorRouter(speculative_store=store)
+    state = _state()
+    state.thesis_outline[1].description_objectives = "Objectifs révisés par N3."
+
+    result = router.run(state, CONFIG)
+
+    assert result["next_node_override"] == "N5_ContextRetrievalNode"
+    assert "thesis_outline" not in result
+    assert "2" not in store.section_ids("thread-1")
+
+
+def test_fingerprint_depends_on_persona_and_plan():
+    state = _state()
+    section = state.thesis_outline[1]
+    fingerprint = speculative_fingerprint(state, section)
+
+    assert fingerprint == speculative_fingerprint(_state(), _state().thesis_outline[1])
+    assert fingerprint != speculative_fingerprint(
+        state.copy(update={"user_persona": "Autre persona"}), section
+    )
+
+
+def test_fingerprint_depends_on_ingested_journal_chunks():
+    state = _state().copy(update={"journal_chunk_manifest_digest": "h1"})
+    section = state.thesis_outline[1]
+    reingested = state.copy(update={"journal_chunk_manifest_digest": "h2"})
+
+    assert speculative_fingerprint(state, section) != speculative_fingerprint(
+        reingested, section
+    )
+
+
+def test_router_promotes_draft_for_earlier_pending_section(tmp_path):
+    store = SpeculativeDraftStore(str(tmp_path))
+    _drafter(store).draft_ahead(_state(), "thread-1")
+    router = N4SectionProcessorRouter(speculative_store=store)
+    state = _state()
+    for section in state.thesis_outline[2:]:
+        section.status = SectionStatus.CONTENT_APPROVED
+    state.current_section_index_for_router = 3
+
+    result = router.run(state, CONFIG)
+
+    assert result["current_section_id"] == "2"
+    assert result["next_node_override"] == "N7_SelfCritiqueNode"
+    assert result["thesis_outline"][1].draft_v1 == "Brouillon spéculatif."
+
+
+class _BlockingDraftingNode(_FakeNode):
+    """N6 factice qui attend `release` avant de rendre son brouillon."""
+
+    def __init__(self):
+        super().__init__(draft_v1="Brouillon.", status=SectionStatus.DRAFT_GENERATED)
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def run(self, state: AgentState) -> dict[str, Any]:
+        self.entered.set()
+        self.release.wait(5)
+        return super().run(state)
+
+
+def test_cancel_discards_in_flight_section_and_starts_no_other(tmp_path):
+    store = SpeculativeDraftStore(str(tmp_path))
+    drafting_node = _BlockingDraftingNode()
+    critique_node = _FakeNode(critique_v1="Critique.")
+    drafter = SpeculativeDrafter(
+        _FakeNode(), drafting_node, critique_node, store=store, max_sections=3
+    )
+    worker = drafter.start(_state(), "thread-1")
+    assert drafting_node.entered.wait(5)
+
+    threading.Timer(0.1, drafting_node.release.set).start()
+    drafter.cancel("thread-1", timeout=5)
+
+    assert not worker.is_alive()
+    assert drafting_node.calls == ["2"]
+    assert critique_node.calls == []
+    assert store.section_ids("thread-1") == []
+
+
+def test_cancel_does_not_wait_for_a_slow_speculative_step(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "speculative_cancel_timeout_s", 0.05)
+    store = SpeculativeDraftStore(str(tmp_path))
+    drafting_node = _BlockingDraftingNode()
+    drafter = SpeculativeDrafter(_FakeNode(), drafting_node, store=store)
+    worker = drafter.start(_state(), "thread-1")
+    assert drafting_node.entered.wait(5)
+
+    started_at = time.perf_counter()
+    drafter.cancel("thread-1")
+
+    assert time.perf_counter() - started_at < 1
+    assert worker.is_alive()
+    drafting_node.release.set()
+    worker.join(5)
+    assert store.section_ids("thread-1") == []
+
+
+def test_n8_cancels_speculative_drafting_when_review_resumes(tmp_path):
+    class _RecordingDrafter(SpeculativeDrafter):
+        cancelled: list[str] = []
+
+        def cancel(self, thread_id: str, timeout: float | None = None) -> None:
+            self.cancelled.append(thread_id)
+
+    drafter = _RecordingDrafter(
+        _FakeNode(), _FakeNode(), store=SpeculativeDraftStore(str(tmp_path))
+    )
+    state = _state()
+    state.thesis_outline[0].temporary_human_response = {"action": "approve_section"}
+
+    result = N8HumanReviewHITLNode(speculative_drafter=drafter).run(state, CONFIG)
+
+    assert drafter.cancelled == ["thread-1"]
+    assert result["thesis_outline"][0].status == SectionStatus.CONTENT_APPROVED
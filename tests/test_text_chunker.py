@@ -0,0 +1,59 @@
+# tests/test_text_chunker.py
+from src.text_chunker import chunk_text, estimate_model_tokens, iter_sentence_spans
+
+
+def _word_count(text, start, end):
+    return len(text[start:end].split())
+
+
+def test_sentence_spans_respect_french_abbreviations_and_paragraphs():
+    text = (
+        "  M. Dupont valide le lot 2.5 du projet, cf. annexe. Et ensuite ?\n\n"
+        "Nouveau paragraphe, etc. et la suite. « Fin. »"
+    )
+    spans = [
+        (text[s:e], paragraph_end) for s, e, paragraph_end in iter_sentence_spans(text)
+    ]
+
+    assert spans == [
+        ("M. Dupont valide le lot 2.5 du projet, cf. annexe.", False),
+        ("Et ensuite ?", True),
+        ("Nouveau paragraphe, etc. et la suite.", False),
+        ("« Fin. »", True),
+    ]
+
+
+def test_chunks_are_offsets_within_token_budget_with_sentence_overlap():
+    text = " ".join(f"Phrase numéro {n} du journal." for n in range(40))
+    chunks = chunk_text(
+        text, max_tokens=20, overlap_tokens=5, token_counter=_word_count
+    )
+
+    assert chunks[0][0] == 0
+    assert chunks[-1][1] == len(text)
+    for (start, end), (next_start, _) in zip(chunks, chunks[1:]):
+        assert _word_count(text, start, end) <= 20
+        assert text[start:end].endswith(".")
+        # La dernière phrase du chunk est reprise au début du suivant
+        assert next_start < end
+        assert text[next_start:end].startswith("Phrase numéro")
+
+
+def test_chunks_prefer_paragraph_breaks_and_split_oversized_sentences():
+    paragraph = "Une phrase courte du paragraphe. " * 4
+    text = f"{paragraph.strip()}\n\n{paragraph.strip()}\n\n" + "mot " * 50
+    chunks = chunk_text(
+        text, max_tokens=30, overlap_tokens=5, token_counter=_word_count
+    )
+
+    texts = [text[start:end] for start, end in chunks]
+    assert texts[0] == paragraph.strip()
+    assert texts[1] == paragraph.strip()
+    assert all(_word_count(text, start, end) <= 30 for start, end in chunks)
+    assert " ".join(texts[2:]).split() == ["mot"] * 50
+
+
+def test_estimate_model_tokens_counts_word_pieces_without_copy():
+    text = "xx Développement, le projet. yy"
+    assert estimate_model_tokens(text, 3, 28) == 4 + 1 + 1 + 2 + 1
+    assert estimate_model_tokens("") == 0
@@ -0,0 +1,110 @@
+# tests/test_tracing.py
+import json
+
+import pytest
+from langchain_community.chat_models import ChatOllama
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from benchmarks.fake_ollama_server import FakeOllamaConfig, start_fake_ollama_server
+from src.config import settings
+from src.nodes.n3_thesis_outline_planner import N3ThesisOutlinePlannerNode
+from src.state import AgentState
+from src.tracing import JsonlTraceSink, TracedEmbeddings, TracedNode
+
+
+class _DraftingNode:
+    def __init__(self, llm, embeddings):
+        self.llm = llm
+        self.embeddings = embeddings
+
+    def run(self, state: AgentState) -> dict:
+        self.embeddings.embed_query(state.current_section_id)
+        draft = self.llm.invoke("Rédigez la section.").content
+        return {"current_section_draft": draft, "current_section_id": "1.2."}
+
+
+class _FailingNode:
+    def run(self, state: AgentState, config=None) -> dict:
+        raise RuntimeError("boom")
+
+
+@pytest.fixture()
+def fake_server():
+    server, _ = start_fake_ollama_server(
+        FakeOllamaConfig(time_to_first_token_s=0.0, tokens_per_s=0, draft_tokens=12)
+    )
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _spans(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_node_span_with_llm_and_embedding_children(fake_server, tmp_path):
+    path = tmp_path / "spans.jsonl"
+    node = _DraftingNode(
+        ChatOllama(model="fake", base_url=fake_server.base_url),
+        TracedEmbeddings(DeterministicFakeEmbedding(size=8)),
+    )
+    traced = TracedNode(node, "N6_SectionDraftingNode", JsonlTraceSink(str(path)))
+
+    result = traced.run(
+        AgentState(current_section_id="1.1."),
+        {"configurable": {"thread_id": "thread-1"}},
+    )
+
+    node_span, *children = _spans(path)
+    assert result["current_section_id"] == "1.2."
+    assert node_span["name"] == "N6_SectionDraftingNode"
+    assert node_span["thread_id"] == "thread-1"
+    assert node_span["section_id"] == "1.2."
+    assert node_span["status"] == "ok"
+    assert node_span["llm_calls"] == 1
+    assert node_span["checkpoint_bytes"] > len(result["current_section_draft"])
+    assert node_span["wall_s"] >= node_span["cpu_s"] >= 0
+    assert isinstance(node_span["rss_delta_bytes"], int)
+    by_name = {child["name"]: child for child in children}
+    assert by_name["embedding"]["texts"] == 1
+    assert by_name["llm"]["completion_tokens"] == 12
+    assert by_name["llm"]["prompt_tokens"] > 0
+    assert {child["parent_id"] for child in children} == {node_span["span_id"]}
+
+
+def test_failing_node_emits_error_span(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    traced = TracedNode(
+        _FailingNode(), "N7_SelfCritiqueNode", JsonlTraceSink(str(path))
+    )
+
+    with pytest.raises(RuntimeError):
+        traced.run(AgentState(current_section_id="2.1."))
+
+    (span,) = _spans(path)
+    assert span["status"] == "error"
+    assert span["section_id"] == "2.1."
+    assert span["thread_id"] is None
+
+
+def test_llm_calls_from_n3_expansion_threads_are_counted(
+    fake_server, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(settings, "ollama_base_url", fake_server.base_url)
+    monkeypatch.setattr(settings, "n3_expansion_concurrency", 2)
+    path = tmp_path / "spans.jsonl"
+    node = N3ThesisOutlinePlannerNode(llm_model_name="fake", planner_mode="two_phase")
+    traced = TracedNode(node, "N3_ThesisOutlinePlannerNode", JsonlTraceSink(str(path)))
+
+    result = traced.run(
+        AgentState(
+            school_guidelines_structured={"attendus": ["Analyse réflexive."]},
+            user_persona="Alternant chef de projet.",
+        )
+    )
+
+    node_span, *children = _spans(path)
+    parts = [s for s in result["thesis_outline"] if s.level == 1]
+    # Phase 1 + une expansion par partie, même depuis les threads du pool
+    assert node_span["llm_calls"] == 1 + len(parts) > 2
+    assert sum(child["name"] == "llm" for child in children) == node_span["llm_calls"]
@@ -0,0 +1,130 @@
+# tests/test_warmup.py
+import threading
+
+import pytest
+
+from benchmarks.fake_ollama_server import FakeOllamaConfig, start_fake_ollama_server
+from src import warmup as warmup_module
+from src.state import AgentState
+from src.warmup import Warmup, WarmupOnRun
+
+
+class _FakeStore:
+    def __init__(self, path, embeddings):
+        self.path = path
+        self.embedding_function = embeddings
+
+
+def _vector_store_dir(tmp_path):
+    path = tmp_path / "vector_store"
+    path.mkdir()
+    (path / "index.faiss").write_bytes(b"index")
+    (path / "index.pkl").write_bytes(b"docstore")
+    return path
+
+
+def test_nodes_wait_for_background_loads(tmp_path):
+    release = threading.Event()
+    loads = []
+
+    def _embeddings_factory(model_name):
+        release.wait(5)
+        loads.append(model_name)
+        return f"embedder:{model_name}"
+
+    path = _vector_store_dir(tmp_path)
+    warmup = Warmup(
+        "bge",
+        vector_store_path=str(path),
+        embeddings_factory=_embeddings_factory,
+        vector_store_loader=_FakeStore,
+        wait_timeout_s=5,
+    ).start()
+    threading.Timer(0.05, release.set).start()
+
+    assert warmup.embeddings("bge") == "embedder:bge"
+    assert warmup.embeddings("bge") == "embedder:bge"
+    assert warmup.embeddings("autre-modèle") is None
+    store = warmup.vector_store(str(path), "traced-embedder")
+    assert store.path == str(path)
+    assert store.embedding_function == "traced-embedder"
+    assert loads == ["bge"]
+
+
+def test_rebuilt_vector_store_is_not_served(tmp_path):
+    path = _vector_store_dir(tmp_path)
+    warmup = Warmup(
+        "bge",
+        vector_store_path=str(path),
+        embeddings_factory=lambda name: name,
+        vector_store_loader=_FakeStore,
+    ).start()
+    assert warmup.vector_store(str(path), "e") is not None
+
+    (path / "index.faiss").write_bytes(b"index reconstruit par N2")
+
+    assert warmup.vector_store(str(path), "e") is None
+
+
+def test_failed_load_falls_back_to_caller():
+    def _failing_factory(model_name):
+        raise RuntimeError("modèle introuvable")
+
+    warmup = Warmup("bge", embeddings_factory=_failing_factory).start()
+
+    assert warmup.embeddings("bge") is None
+
+
+@pytest.fixture()
+def fake_server():
+    server, _ = start_fake_ollama_server(FakeOllamaConfig(time_to_first_token_s=0.0))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_ollama_model_is_preloaded_with_keep_alive(fake_server):
+    warmup = Warmup(
+        None,
+        llm_model_name="gemma",
+        ollama_base_url=fake_server.base_url,
+        keep_alive="1h",
+    ).start()
+
+    assert warmup._wait(warmup._ollama) is None
+    assert "ollama" in warmup.durations_s
+    assert fake_server.snapshot()["preloads"] == 1
+
+
+class _RecordingWarmup:
+    created: list[dict] = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        _RecordingWarmup.created.append(kwargs)
+
+    def start(self):
+        return self
+
+
+class _EntryNode:
+    def run(self, state: AgentState) -> dict:
+        return {"current_operation_message": "N0 done"}
+
+
+def test_warmup_starts_when_a_thread_runs_n0_with_state_models(monkeypatch):
+    _RecordingWarmup.created = []
+    monkeypatch.setattr(warmup_module, "Warmup", _RecordingWarmup)
+    monkeypatch.setattr(warmup_module, "_active_warmup", None)
+    monkeypatch.setattr(warmup_module, "_active_warmup_key", None)
+    node = WarmupOnRun(_EntryNode())
+    assert _RecordingWarmup.created == []
+
+    state = AgentState(llm_model_name="mistral:7b", vector_store_path="vs")
+    result = node.run(state, {"configurable": {"thread_id": "t"}})
+    node.run(state)
+
+    assert result == {"current_operation_message": "N0 done"}
+    (kwargs,) = _RecordingWarmup.created
+    assert kwargs["llm_model_name"] == "mistral:7b"
+    assert kwargs["vector_store_path"] == "vs"
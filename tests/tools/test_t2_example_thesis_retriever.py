@@ -0,0 +1,107 @@
+# tests/tools/test_t2_example_thesis_retriever.py
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from langchain_community.embeddings import DeterministicFakeEmbedding
+
+from src.tools.t2_example_thesis_retriever import (
+    build_example_thesis_index,
+    chunk_example_thesis,
+    get_example_thesis_retriever,
+    read_example_index_version,
+    retrieve_example_passages,
+)
+
+EXAMPLE_TEXT = """## INTRODUCTION GÉNÉRALE
+La mission s'inscrit dans un contexte de transformation numérique.
+
+## CHAPITRE 1 : PRÉSENTATION DE L'ENTREPRISE
+### 1.1. L'entreprise
+Gecina est une grande foncière. Sa stratégie de développement durable.
+
+### 1.2. Ma mission
+J'étais AIPO et j'ai travaillé sur le prompt engineering pour les RH.
+
+## CONCLUSION GÉNÉRALE
+Bilan des compétences acquises et perspectives professionnelles.
+"""
+MODEL_NAME = "fake-embedding-model"
+
+
+@pytest.fixture()
+def fake_embeddings():
+    with patch(
+        "src.tools.t2_example_thesis_retriever.FastEmbedEmbeddings",
+        side_effect=lambda model_name: DeterministicFakeEmbedding(size=16),
+    ) as mock_cls:
+        yield mock_cls
+
+
+def test_chunk_example_thesis_tracks_headings():
+    documents = chunk_example_thesis(EXAMPLE_TEXT, chunk_size=120, chunk_overlap=0)
+
+    assert len(documents) > 1
+    assert [d.metadata["chunk_index"] for d in documents] == list(range(len(documents)))
+    headings = [d.metadata["heading"] for d in documents]
+    assert headings[0] == "INTRODUCTION GÉNÉRALE"
+    assert "1.2. Ma mission" in headings
+    mission_chunk = next(d for d in documents if "AIPO" in d.page_content)
+    assert mission_chunk.metadata["heading"] == "1.2. Ma mission"
+
+
+def test_build_index_is_reused_until_inputs_change(fake_embeddings, tmp_path: Path):
+    index_path = str(tmp_path / "example_index")
+
+    version = build_example_thesis_index(
+        EXAMPLE_TEXT, index_path, MODEL_NAME, chunk_size=120, chunk_overlap=0
+    )
+    assert version is not None
+    assert read_example_index_version(index_path) == version
+    assert fake_embeddings.call_count == 1
+
+    same_version = build_example_thesis_index(
+        EXAMPLE_TEXT, index_path, MODEL_NAME, chunk_size=120, chunk_overlap=0
+    )
+    assert same_version == version
+    assert fake_embeddings.call_count == 1
+
+    new_version = build_example_thesis_index(
+        EXAMPLE_TEXT + "\nAnnexe.", index_path, MODEL_NAME, chunk_size=120
+    )
+    assert new_version != version
+    assert fake_embeddings.call_count == 2
+
+
+def test_retrieve_example_passages(fake_embeddings, tmp_path: Path):
+    index_path = str(tmp_path / "example_index")
+    version = build_example_thesis_index(
+        EXAMPLE_TEXT, index_path, MODEL_NAME, chunk_size=120, chunk_overlap=0
+    )
+
+    passages = retrieve_example_passages(
+        index_path,
+        version,
+        MODEL_NAME,
+        ["Ma mission", "Conclusion"],
+        k_per_query=2,
+        max_passages=3,
+    )
+    assert passages is not None
+    assert passages.count("---") == 2
+    assert get_example_thesis_retriever(
+        index_path, MODEL_NAME
+    ) is get_example_thesis_retriever(index_path, MODEL_NAME)
+
+    assert (
+        retrieve_example_passages(
+            index_path, "autre-version", MODEL_NAME, ["Ma mission"], 2, 3
+        )
+        is None
+    )
+    assert (
+        retrieve_example_passages(
+            str(tmp_path / "absent"), version, MODEL_NAME, ["Ma mission"], 2, 3
+        )
+        is None
+    )